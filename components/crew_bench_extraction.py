@@ -2,11 +2,42 @@ import cv2
 import sys
 import os
 
-from components.utils import AnalysisConfig, get_row_boundaries, load_and_preprocess_image, get_header_positions
-from components.hero_extraction import calculate_crew_slots, calculate_bench_slots
-from components.image_processing import create_all_slots_masks, load_template_masks, analyze_all_masks
-
-def detect_star_level(thresh, x_center, y_bottom, slot_width=56, star_area_height=18):
+from components.utils import AnalysisConfig, get_row_boundaries, load_and_preprocess_image, get_header_positions, region_fingerprint
+from components.image_processing import create_slot_mask, is_mask_empty, compare_mask_to_templates, get_hero_template_bank
+from components.layout_plan import LayoutPlan, STAR_AREA_HEIGHT
+from components.debug_trace import DebugTrace, trace_for
+
+class SlotResultCache:
+    """Remembers the last result of every crew/bench slot, keyed by a fingerprint of its pixels."""
+    def __init__(self):
+        self.entries = {}  # (kind, row_num, slot_idx) -> (fingerprint, is_empty, result)
+        self.reused = 0
+        self.identified = 0
+
+    def start_frame(self):
+        self.reused = 0
+        self.identified = 0
+
+    def lookup(self, key, fingerprint):
+        """Return (is_empty, result copy) if the slot is unchanged since it was last identified, else None."""
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != fingerprint:
+            return None
+        self.reused += 1
+        return entry[1], (dict(entry[2]) if entry[2] is not None else None)
+
+    def store(self, key, fingerprint, result):
+        """Store a freshly identified slot; a result of None marks an empty slot."""
+        self.identified += 1
+        self.entries[key] = (fingerprint, result is None, dict(result) if result is not None else None)
+
+    def get_frame_stats(self):
+        return {"reused": self.reused, "identified": self.identified}
+
+# Global instance so slot results survive across frames
+shared_slot_cache = SlotResultCache()
+
+def detect_star_level(thresh, x_center, y_bottom, slot_width=56, star_area_height=STAR_AREA_HEIGHT):
     """Detect star level by counting white pixels in the star area below hero icon."""
     # Calculate star area coordinates
     x_start = x_center - slot_width // 2
@@ -16,7 +47,10 @@ def detect_star_level(thresh, x_center, y_bottom, slot_width=56, star_area_heigh
     
     # Extract star area from binary image
     star_area = thresh[y_start:y_end, x_start:x_end]
-    
+    return star_level_from_area(star_area)
+
+def star_level_from_area(star_area):
+    """Determine the star level from the binary star area below a hero icon."""
     # Count white pixels (value 255 in binary image)
     white_pixel_count = cv2.countNonZero(star_area)
     total_pixels = star_area.shape[0] * star_area.shape[1]
@@ -37,6 +71,7 @@ def detect_star_level(thresh, x_center, y_bottom, slot_width=56, star_area_heigh
 
 def add_star_levels_to_results(thresh, crew_results, bench_results, crew_slots_by_row, bench_slots_by_row, debug=False):
     """Add star level information to hero analysis results."""
+    trace = DebugTrace(debug)
     
     # Process crew slots
     for row_num, crew_slots in crew_slots_by_row.items():
@@ -46,9 +81,7 @@ def add_star_levels_to_results(thresh, crew_results, bench_results, crew_slots_b
                     star_level = detect_star_level(thresh, slot['x_center'], slot['y_end'])
                     crew_results[row_num][i]['star_level'] = star_level
                     
-                    if debug:
-                        hero_name = crew_results[row_num][i].get('hero_name', 'Unknown')
-                        print(f"Row {row_num}, Crew slot {i}: {hero_name} - {star_level} stars")
+                    trace.log("Row %s, Crew slot %s: %s - %s stars", row_num, i, crew_results[row_num][i].get('hero_name', 'Unknown'), star_level)
     
     # Process bench slots
     for row_num, bench_slots in bench_slots_by_row.items():
@@ -58,9 +91,7 @@ def add_star_levels_to_results(thresh, crew_results, bench_results, crew_slots_b
                     star_level = detect_star_level(thresh, slot['x_center'], slot['y_end'])
                     bench_results[row_num][i]['star_level'] = star_level
                     
-                    if debug:
-                        hero_name = bench_results[row_num][i].get('hero_name', 'Unknown')
-                        print(f"Row {row_num}, Bench slot {i}: {hero_name} - {star_level} stars")
+                    trace.log("Row %s, Bench slot %s: %s - %s stars", row_num, i, bench_results[row_num][i].get('hero_name', 'Unknown'), star_level)
     
     return crew_results, bench_results
 
@@ -82,73 +113,97 @@ def is_filled_slot(slot):
     
     return True
 
-def extract_crew_and_bench_from_scoreboard(image, thresh, header_positions, config):
-    """Extract crew and bench data (heroes and star levels) from scoreboard."""
+def collect_row_slots(image, thresh, kind, row_num, slots, cache, pending, trace=None):
+    """
+    Build the results for one row, reusing cached results for unchanged slots.
+    
+    Changed slots are masked and appended to `pending` for batched identification.
+    Like analyze_all_masks, the row stops at the first empty slot.
+    """
+    trace = trace if trace is not None else DebugTrace()
+    row_results = []
+    for slot_idx, slot in enumerate(slots):
+        key = (kind, row_num, slot_idx)
+        slot_image = image[slot['slice']]
+        star_area = thresh[slot['star_slice']]
+        fingerprint = region_fingerprint(slot_image, star_area)
+
+        cached = cache.lookup(key, fingerprint)
+        if cached is None:
+            mask = None if slot_image.size == 0 else create_slot_mask(slot_image)
+            if is_mask_empty(mask):
+                cache.store(key, fingerprint, None)
+                cached = (True, None)
+            else:
+                result = {"hero_name": None, "confidence": 0.0}
+                row_results.append(result)
+                pending.append({"key": key, "fingerprint": fingerprint, "slot": slot, "mask": mask, "result": result})
+                continue
+
+        is_empty, result = cached
+        if is_empty:
+            trace.log("%s Row %s, Slot %s: Empty slot detected - skipping remaining slots in row", kind, row_num, slot_idx)
+            remaining_slots = len(slots) - slot_idx
+            row_results.extend([{"hero_name": None, "confidence": 0.0}] * remaining_slots)
+            break
+        row_results.append(result)
+    return row_results
+
+def extract_crew_and_bench_from_scoreboard(image, thresh, header_positions, config, slot_cache=None, layout=None, rows=None):
+    """Extract crew and bench data (heroes and star levels) from scoreboard (or only the row numbers in `rows`)."""
     # Get header positions for crew and bench
     crew_start_x = header_positions.get("CREW")
     crew_end_x = header_positions.get("UNDERLORD")
     bench_start_x = header_positions.get("BENCH")
 
+    trace = trace_for(config)
     if not crew_start_x and not bench_start_x:
-        if config.debug:
-            print("Neither crew nor bench columns detected, returning empty data" + "source: crew_bench_extraction.py" + " line 92")
+        trace.log("Neither crew nor bench columns detected, returning empty data")
         return {}, {}
 
-    if config.debug:
-        print("\n=== EXTRACTING CREW AND BENCH DATA ===" + "source: crew_bench_extraction.py" + " line 96")
-        print("Calculating slot positions...")
-
-    # Step 1: Calculate slot positions
-    row_boundaries = get_row_boundaries()
-    crew_slots_by_row = {}
-    bench_slots_by_row = {}
-
-    for row_num, row_boundary in enumerate(row_boundaries):
-        if crew_start_x is not None and crew_end_x is not None:
-            crew_slots = calculate_crew_slots(crew_start_x, crew_end_x, row_boundary)
-            crew_slots_by_row[row_num] = crew_slots
-        if bench_start_x is not None:
-            bench_slots = calculate_bench_slots(bench_start_x, image.shape[1], row_boundary)
-            bench_slots_by_row[row_num] = bench_slots
-
-    if config.debug:
-        print(f"Crew slots by row: {[(row, len(slots)) for row, slots in crew_slots_by_row.items()]}")
-        print(f"Bench slots by row: {[(row, len(slots)) for row, slots in bench_slots_by_row.items()]}")
-
-    # Step 2: Create slot masks
-    if config.debug:
-        print("Creating slot masks...")
-
-    crew_masks_by_row, bench_masks_by_row = create_all_slots_masks(image, crew_slots_by_row, bench_slots_by_row)
-
-    if config.debug:
-        for row_num in crew_masks_by_row:
-            crew_masks = crew_masks_by_row[row_num]
-            print(f"Row {row_num}: {len(crew_masks)} crew masks created")
-        for row_num in bench_masks_by_row:
-            bench_masks = bench_masks_by_row[row_num]
-            print(f"Row {row_num}: {len(bench_masks)} bench masks created")
-
-    # Step 3: Analyze heroes
-    if config.debug:
-        print("Loading template masks...")
-
-    template_masks = load_template_masks("assets/templates/hero_templates/masks", debug=config.debug)
-
-    if config.debug:
-        print("Analyzing masks for hero identification...")
-
-    # Only analyze if slots exist
-    crew_results, bench_results = {}, {}
-    if crew_slots_by_row:
-        crew_results, _ = analyze_all_masks(crew_masks_by_row, {}, template_masks, debug=config.debug)
-    if bench_slots_by_row:
-        _, bench_results = analyze_all_masks({}, bench_masks_by_row, template_masks, debug=config.debug)
-
-    # Step 4: Add star level detection
-    if config.debug:
-        print("Detecting star levels...")
-    crew_results, bench_results = add_star_levels_to_results(thresh, crew_results, bench_results, crew_slots_by_row, bench_slots_by_row, debug=config.debug)
+    trace.started("crew_bench_extraction.py")
+    trace.log("Calculating slot positions...")
+
+    # Step 1: Slot positions come precompiled from the layout plan
+    if layout is None:
+        layout = LayoutPlan(header_positions, image.shape[1])
+    crew_slots_by_row = layout.crew_slots.slots_by_row if layout.crew_slots is not None else {}
+    bench_slots_by_row = layout.bench_slots.slots_by_row if layout.bench_slots is not None else {}
+
+    if trace.enabled:
+        trace.log("Crew slots by row: %s", [(row, len(slots)) for row, slots in crew_slots_by_row.items()])
+        trace.log("Bench slots by row: %s", [(row, len(slots)) for row, slots in bench_slots_by_row.items()])
+
+    # Step 2-4: Mask, identify and star-rate only the slots whose pixels changed
+    trace.log("Loading hero template bank...")
+
+    hero_bank = get_hero_template_bank("assets/templates/hero_templates/masks", debug=config.debug)
+    cache = slot_cache if slot_cache is not None else shared_slot_cache
+    cache.start_frame()
+
+    trace.log("Analyzing changed slots for hero identification...")
+
+    crew_results, bench_results, pending = {}, {}, []
+    for kind, slots_by_row, results in (("Crew", crew_slots_by_row, crew_results), ("Bench", bench_slots_by_row, bench_results)):
+        for row_num, slots in slots_by_row.items():
+            if rows is not None and row_num not in rows:
+                continue
+            results[row_num] = collect_row_slots(image, thresh, kind, row_num, slots, cache, pending, trace=trace)
+
+    # Crew and bench slots that changed are scored together in one batch
+    batched = [entry for entry in pending if entry["mask"].shape == hero_bank.shape]
+    for entry, (hero_name, confidence) in zip(batched, hero_bank.identify([entry["mask"] for entry in batched])):
+        entry["result"]["hero_name"] = hero_name
+        entry["result"]["confidence"] = confidence
+    for entry in pending:
+        if entry["mask"].shape != hero_bank.shape:
+            entry["result"]["hero_name"], entry["result"]["confidence"] = compare_mask_to_templates(entry["mask"], hero_bank.template_masks)
+        entry["result"]["star_level"] = star_level_from_area(thresh[entry["slot"]['star_slice']])
+        cache.store(entry["key"], entry["fingerprint"], entry["result"])
+        trace.log("%s Row %s, Slot %s: %s (%.3f) - %s stars", *entry['key'], entry['result']['hero_name'] or 'No match',
+                  entry['result']['confidence'], entry['result']['star_level'])
+
+    trace.log("Slots reused: %s, re-identified: %s", cache.reused, cache.identified)
 
     # Step 5: Filter out empty slots
     for row_num in crew_results:
@@ -156,11 +211,9 @@ def extract_crew_and_bench_from_scoreboard(image, thresh, header_positions, conf
     for row_num in bench_results:
         bench_results[row_num] = [slot for slot in bench_results[row_num] if is_filled_slot(slot)]
 
-    if config.debug:
-        total_crew = sum(len(slots) for slots in crew_results.values())
-        total_bench = sum(len(slots) for slots in bench_results.values())
-        print(f"Final results: {total_crew} crew units, {total_bench} bench units")
-        print("##################"+"crew_bench_extraction.py" + " FINISHED ##################")
+    if trace.enabled:
+        trace.log("Final results: %s crew units, %s bench units", sum(len(slots) for slots in crew_results.values()), sum(len(slots) for slots in bench_results.values()))
+    trace.finished("crew_bench_extraction.py")
 
     return crew_results, bench_results
 
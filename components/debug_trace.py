@@ -0,0 +1,36 @@
+BANNER = "#" * 91
+
+
+class DebugTrace:
+    """
+    Debug output of an extractor, built only while debugging is on.
+
+    log() takes a %-style message and its arguments and formats them only when enabled,
+    so hot paths can trace unconditionally. crops() copies debug image regions only when
+    enabled and returns None otherwise. Anything costlier to prepare is guarded by `enabled`.
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+
+    def log(self, message, *args):
+        if self.enabled:
+            print(message % args if args else message)
+
+    def started(self, source):
+        if self.enabled:
+            print(f"{BANNER} {source} - STARTED ")
+
+    def finished(self, source):
+        if self.enabled:
+            print(f"{BANNER} {source} - FINISHED")
+
+    def crops(self, image, rois):
+        """Copies of image[roi] for every named ROI, or None when disabled (the image may be a reused buffer)."""
+        if not self.enabled:
+            return None
+        return {name: image[roi].copy() for name, roi in rois.items()}
+
+
+def trace_for(config):
+    """The trace of an extraction run with this config."""
+    return DebugTrace(getattr(config, 'debug', False))
@@ -0,0 +1,65 @@
+import cv2
+import threading
+
+
+class FrameContext:
+    """Per-frame preprocessing cache shared by all extractors.
+
+    Grayscale, fixed-threshold binaries and Otsu binaries are computed lazily the first
+    time any component asks for them and reused for the rest of the frame. Fixed
+    thresholds are per-pixel, so a crop of the full-frame binary is identical to
+    binarizing the crop itself. Otsu depends on the histogram, so it is memoized per
+    region.
+    """
+
+    def __init__(self, image):
+        self.image = image
+        self._cache = {}
+        self._lock = threading.RLock()  # re-entrant: binary() and otsu() call gray() while holding it
+        self.conversions = {}  # conversion name -> times actually computed
+        self.reuses = {}       # conversion name -> times served from the cache
+
+    def _get(self, key, name, compute):
+        with self._lock:
+            if key in self._cache:
+                self.reuses[name] = self.reuses.get(name, 0) + 1
+                return self._cache[key]
+            value = compute()
+            self._cache[key] = value
+            self.conversions[name] = self.conversions.get(name, 0) + 1
+            return value
+
+    def gray(self):
+        """Full-frame grayscale."""
+        def compute():
+            if len(self.image.shape) == 3:
+                return cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+            return self.image
+        return self._get(("gray",), "gray", compute)
+
+    def binary(self, threshold):
+        """Full-frame binary of the grayscale image at a fixed threshold (e.g. 100 or 127)."""
+        def compute():
+            _, binary = cv2.threshold(self.gray(), threshold, 255, cv2.THRESH_BINARY)
+            return binary
+        return self._get(("binary", threshold), f"binary_{threshold}", compute)
+
+    def otsu(self, roi=None):
+        """Otsu binary of the whole frame, or of one region given as a (row_slice, column_slice) ROI."""
+        def compute():
+            gray = self.gray() if roi is None else self.gray()[roi]
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            return binary
+        key = ("otsu",) if roi is None else ("otsu", _roi_key(roi))
+        return self._get(key, "otsu" if roi is None else "otsu_region", compute)
+
+    def memo(self, key, compute):
+        """Memoize any other per-frame derived array under a caller-chosen key."""
+        return self._get(("memo", key), str(key[0]) if isinstance(key, tuple) else str(key), compute)
+
+    def get_stats(self):
+        return {"conversions": dict(self.conversions), "reuses": dict(self.reuses)}
+
+
+def _roi_key(roi):
+    return tuple((s.start, s.stop, s.step) for s in roi)
@@ -0,0 +1,74 @@
+import cv2
+
+from components.utils import get_row_boundaries, HEADER_Y_START, HEADER_Y_END
+
+# Regions watched by the live loop, as (row_slice, column_slice) ROIs of the grayscale frame
+SCOREBOARD_ROW_HEIGHT = 80
+HEADER_STRIP_ROI = (slice(HEADER_Y_START, HEADER_Y_END), slice(None))
+SCOREBOARD_ROW_ROIS = [(slice(row_y, row_y + SCOREBOARD_ROW_HEIGHT), slice(None)) for row_y in get_row_boundaries()]
+
+GATE_DOWNSAMPLE = 4
+GATE_THRESHOLD = 8  # max gray difference of a downsampled pixel that still counts as unchanged
+
+
+class FrameGate:
+    """
+    Tells the live loop which regions of a frame changed since they were last extracted.
+
+    Each region is reduced to an area-averaged thumbnail (GATE_DOWNSAMPLE x smaller), and
+    compared against the thumbnail kept from the last time it was extracted, so slow drift
+    still adds up to a change. Averaging instead of sampling keeps a single changed digit
+    visible: a 2px stroke still moves its block average well past the threshold.
+
+    A changed region's thumbnail is only kept once the caller commits it after a successful
+    extraction; if the extraction fails, the region still counts as changed on the next frame.
+    """
+    def __init__(self, downsample=GATE_DOWNSAMPLE, threshold=GATE_THRESHOLD):
+        self.downsample = downsample
+        self.threshold = threshold
+        self._thumbnails = {}
+        self._pending = {}  # thumbnails of changed regions, kept once committed
+        self.checks = {}
+        self.skips = {}
+
+    def changed(self, name, region):
+        """True if the region differs from its last extracted state (or was never seen)."""
+        height, width = region.shape[:2]
+        thumbnail = cv2.resize(region, (max(1, width // self.downsample), max(1, height // self.downsample)), interpolation=cv2.INTER_AREA)
+        self.checks[name] = self.checks.get(name, 0) + 1
+        previous = self._thumbnails.get(name)
+        if previous is not None and previous.shape == thumbnail.shape and cv2.absdiff(previous, thumbnail).max() <= self.threshold:
+            self.skips[name] = self.skips.get(name, 0) + 1
+            # A thumbnail left over from a failed extraction must not be committed later
+            self._pending.pop(name, None)
+            return False
+        self._pending[name] = thumbnail
+        return True
+
+    def commit(self, name):
+        """Keep the region's thumbnail from its last changed() check: it has now been extracted."""
+        thumbnail = self._pending.pop(name, None)
+        if thumbnail is not None:
+            self._thumbnails[name] = thumbnail
+
+    def changed_rows(self, prefix, gray, rois):
+        """Check every row ROI (all of them, so each keeps its own stats); returns the changed row numbers."""
+        return [row_num for row_num, roi in enumerate(rois) if self.changed(f"{prefix}_{row_num}", gray[roi])]
+
+    def commit_rows(self, prefix, row_nums):
+        """Commit the rows of a changed_rows() check once they have been extracted."""
+        for row_num in row_nums:
+            self.commit(f"{prefix}_{row_num}")
+
+    def count(self, name, skipped):
+        """Record a skip decision that is not a single region (e.g. a whole scoreboard extraction)."""
+        self.checks[name] = self.checks.get(name, 0) + 1
+        if skipped:
+            self.skips[name] = self.skips.get(name, 0) + 1
+
+    def skip_rate(self, name):
+        checks = self.checks.get(name, 0)
+        return self.skips.get(name, 0) / checks if checks else 0.0
+
+    def get_stats(self):
+        return {name: {"checks": checks, "skips": self.skips.get(name, 0), "skip_rate": self.skip_rate(name)} for name, checks in self.checks.items()}
@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import deque
+
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+
+class StageQueue:
+    """Bounded FIFO between two pipeline stages.
+
+    With the drop_oldest policy a put on a full queue discards the oldest waiting item,
+    so a slow consumer always works on the most recent frames; with block the producer
+    waits for room instead.
+    """
+
+    def __init__(self, maxsize=2, policy=DROP_OLDEST):
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.puts = 0
+        self.drops = 0
+        self.max_depth = 0
+        self._depth_total = 0
+
+    def put(self, item):
+        """Queue an item; returns the item dropped to make room, if any."""
+        dropped = None
+        with self._cond:
+            if self.policy == BLOCK:
+                while len(self._items) >= self.maxsize and not self._closed:
+                    self._cond.wait()
+            elif len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()
+                self.drops += 1
+            self._items.append(item)
+            self.puts += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._depth_total += len(self._items)
+            self._cond.notify_all()
+        return dropped
+
+    def get(self):
+        """Wait for the next item; None once the queue is closed and drained."""
+        with self._cond:
+            while not self._items and not self._closed:
+                self._cond.wait()
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    def get_stats(self):
+        with self._cond:
+            return {
+                "depth": len(self._items),
+                "max_depth": self.max_depth,
+                "mean_depth": self._depth_total / self.puts if self.puts else 0.0,
+                "puts": self.puts,
+                "drops": self.drops,
+            }
+
+
+class PipelineFrame:
+    """One frame travelling through the pipeline, with its capture time and per-stage timings."""
+
+    def __init__(self, frame_id, data):
+        self.frame_id = frame_id
+        self.data = data
+        self.captured_at = time.perf_counter()
+        self.timestamp = None  # source timestamp, set by the preprocess stage
+        self.stage_times = {}
+
+
+class FramePipeline:
+    """Runs capture -> preprocess -> extract -> publish as threads joined by bounded queues.
+
+    Each stage is a callable taking the PipelineFrame (previous output in frame.data) and
+    returning its own output; returning None from preprocess or extract drops the frame.
+    The capture callable takes no argument, returns None to skip, and ends the
+    pipeline by raising StopIteration. Every stage runs on its own single thread, so the
+    stateful extract stage still sees frames in capture order.
+
+    The drop policy only applies to the queue in front of extract, where waiting frames
+    are interchangeable. The other queues block: the publish queue carries extraction
+    results, and a dropped result would leave the published output stale.
+    """
+
+    STAGES = ("preprocess", "extract", "publish")
+
+    def __init__(self, capture, preprocess, extract, publish, queue_size=2, policy=DROP_OLDEST):
+        self.capture = capture
+        self.handlers = {"preprocess": preprocess, "extract": extract, "publish": publish}
+        self.queues = {stage: StageQueue(queue_size, policy if stage == "extract" else BLOCK) for stage in self.STAGES}
+        self._stop = threading.Event()
+        self._threads = []
+        self._latency_lock = threading.Lock()
+        self._latencies = deque(maxlen=256)
+        self.published = 0
+        self.errors = 0
+
+    def start(self):
+        self._threads = [threading.Thread(target=self._capture_loop, name="pipeline-capture", daemon=True)]
+        for stage, next_stage in zip(self.STAGES, self.STAGES[1:] + (None,)):
+            self._threads.append(threading.Thread(target=self._stage_loop, args=(stage, next_stage), name=f"pipeline-{stage}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop capturing; frames already queued are still processed."""
+        self._stop.set()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def is_alive(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _capture_loop(self):
+        frame_id = 0
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                try:
+                    data = self.capture()
+                except StopIteration:
+                    break
+                if data is None:
+                    continue
+                frame = PipelineFrame(frame_id, data)
+                frame.stage_times["capture"] = frame.captured_at - start
+                frame_id += 1
+                self.queues["preprocess"].put(frame)
+        finally:
+            self.queues["preprocess"].close()
+
+    def _stage_loop(self, stage, next_stage):
+        handler = self.handlers[stage]
+        queue = self.queues[stage]
+        try:
+            while True:
+                frame = queue.get()
+                if frame is None:
+                    break
+                start = time.perf_counter()
+                try:
+                    frame.data = handler(frame)
+                except Exception as e:
+                    with self._latency_lock:
+                        self.errors += 1
+                    print(f"Pipeline {stage} error on frame {frame.frame_id}: {e}")
+                    continue
+                frame.stage_times[stage] = time.perf_counter() - start
+                if next_stage is not None:
+                    if frame.data is not None:
+                        self.queues[next_stage].put(frame)
+                else:
+                    with self._latency_lock:
+                        self._latencies.append(time.perf_counter() - frame.captured_at)
+                        self.published += 1
+        finally:
+            if next_stage is not None:
+                self.queues[next_stage].close()
+
+    def get_stats(self):
+        with self._latency_lock:
+            latencies = list(self._latencies)
+            published = self.published
+            errors = self.errors
+        return {
+            "queues": {stage: queue.get_stats() for stage, queue in self.queues.items()},
+            "published": published,
+            "errors": errors,
+            "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_max": max(latencies) if latencies else 0.0,
+        }
@@ -0,0 +1,262 @@
+import json
+import os
+import time
+import zipfile
+import cv2
+import numpy as np
+
+
+class FrameSource:
+    """
+    Source of BGR frames for the live loop.
+
+    read() returns (timestamp, frame), where timestamps are monotonic seconds, or None when
+    no frame is available right now (e.g. a failed capture). It raises StopIteration once
+    the source is exhausted. Iterating a source yields the (timestamp, frame) pairs.
+    Sources count the full-frame copies they make of a frame once it is in memory
+    (decoding a file or video frame is not counted).
+    """
+    copies = 0
+    frames_read = 0
+
+    def open(self):
+        return self
+
+    def read(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def copies_per_frame(self):
+        return self.copies / self.frames_read if self.frames_read else 0.0
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        while True:
+            try:
+                item = self.read()
+            except StopIteration:
+                return
+            if item is not None:
+                yield item
+
+
+class ReplayClock:
+    """Paces replayed frames so they are returned at their recorded spacing, or as fast as possible."""
+    def __init__(self, realtime):
+        self.realtime = realtime
+        self._first_timestamp = None
+        self._started_at = None
+
+    def wait(self, timestamp):
+        if not self.realtime:
+            return
+        if self._first_timestamp is None:
+            self._first_timestamp = timestamp
+            self._started_at = time.monotonic()
+            return
+        delay = (timestamp - self._first_timestamp) - (time.monotonic() - self._started_at)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class GdiFrameSource(FrameSource):
+    """Live capture of the Underlords window through GDI (Windows only; win32 is imported on open)."""
+    def __init__(self, output_dir="screenshots"):
+        self.output_dir = output_dir
+        self.screenshot_tool = None
+
+    def open(self):
+        from tools.screenshot_tool import UnderlordScreenshotTool, FRAME_COPIES
+        self.frame_copies = FRAME_COPIES
+        self.screenshot_tool = UnderlordScreenshotTool(output_dir=self.output_dir)
+        # Try to find the window once at the start
+        if not self.screenshot_tool.find_underlords_window():
+            raise RuntimeError("Could not find Dota Underlords window! Make sure the game is running and visible.")
+        return self
+
+    def read(self):
+        # BGR straight from the bitmap bits, without a PIL round-trip
+        image = self.screenshot_tool.take_single_frame()
+        timestamp = time.monotonic()
+        if image is None:
+            print("Failed to capture screenshot. Retrying...")
+            return None
+        self.frames_read += 1
+        self.copies += self.frame_copies
+        return timestamp, image
+
+
+class DirectoryFrameSource(FrameSource):
+    """
+    Replay of a directory of PNG screenshots in file name order.
+
+    With fps set, frames are stamped index / fps (and paced to that rate when realtime);
+    otherwise they are stamped with the monotonic clock when read.
+    """
+    def __init__(self, directory, fps=None, realtime=False, loop=False):
+        self.directory = directory
+        self.fps = fps
+        self.clock = ReplayClock(realtime and fps is not None)
+        self.loop = loop
+        self.paths = []
+        self._index = 0
+
+    def open(self):
+        self.paths = [os.path.join(self.directory, name) for name in sorted(os.listdir(self.directory)) if name.lower().endswith(".png")]
+        if not self.paths:
+            raise RuntimeError(f"No PNG frames found in {self.directory}")
+        self._index = 0
+        return self
+
+    def read(self):
+        if self._index >= len(self.paths):
+            if not self.loop:
+                raise StopIteration
+            self._index = 0
+        path = self.paths[self._index]
+        if self.fps:
+            timestamp = self._index / self.fps
+            self.clock.wait(timestamp)
+        else:
+            timestamp = time.monotonic()
+        self._index += 1
+        image = cv2.imread(path)
+        if image is None:
+            print(f"Could not read frame {path}")
+            return None
+        self.frames_read += 1
+        return timestamp, image
+
+
+class VideoFrameSource(FrameSource):
+    """Frames of a video file through cv2.VideoCapture, stamped with their position in the video."""
+    def __init__(self, path, realtime=False):
+        self.path = path
+        self.clock = ReplayClock(realtime)
+        self.capture = None
+
+    def open(self):
+        self.capture = cv2.VideoCapture(self.path)
+        if not self.capture.isOpened():
+            raise RuntimeError(f"Could not open video {self.path}")
+        return self
+
+    def read(self):
+        ok, image = self.capture.read()
+        if not ok:
+            raise StopIteration
+        timestamp = self.capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        self.clock.wait(timestamp)
+        self.frames_read += 1
+        return timestamp, image
+
+    def close(self):
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+
+class RecordedSessionSource(FrameSource):
+    """
+    Replay of a recorded session: a directory with an index.jsonl of {"timestamp", "path"} entries,
+    one per frame, with paths relative to the session directory, or to the zip archive named
+    by an entry's "chunk" (as written by SessionRecorder). Frames keep their recorded
+    timestamps; realtime replay also keeps the recorded spacing between them.
+    """
+    INDEX_FILE = "index.jsonl"
+
+    def __init__(self, session_dir, realtime=True):
+        self.session_dir = session_dir
+        self.clock = ReplayClock(realtime)
+        self.entries = []
+        self._index = 0
+        self._zip = None
+        self._zip_name = None
+
+    def open(self):
+        with open(os.path.join(self.session_dir, self.INDEX_FILE), "r", encoding="utf-8") as f:
+            self.entries = [json.loads(line) for line in f if line.strip()]
+        self._index = 0
+        return self
+
+    def read(self):
+        if self._index >= len(self.entries):
+            raise StopIteration
+        entry = self.entries[self._index]
+        self._index += 1
+        self.clock.wait(entry["timestamp"])
+        try:
+            image = self._load(entry)
+        except (OSError, KeyError, zipfile.BadZipFile):
+            image = None
+        if image is None:
+            print(f"Could not read recorded frame {entry['path']}")
+            return None
+        self.frames_read += 1
+        return entry["timestamp"], image
+
+    def _load(self, entry):
+        if "chunk" not in entry:
+            return cv2.imread(os.path.join(self.session_dir, entry["path"]))
+        # Entries are in chunk order, so keep the current archive open until the next one starts
+        if entry["chunk"] != self._zip_name:
+            self._close_zip()
+            self._zip = zipfile.ZipFile(os.path.join(self.session_dir, entry["chunk"]))
+            self._zip_name = entry["chunk"]
+        return cv2.imdecode(np.frombuffer(self._zip.read(entry["path"]), dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def _close_zip(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+            self._zip_name = None
+
+    def close(self):
+        self._close_zip()
+
+
+class RecordingFrameSource(FrameSource):
+    """Passes the frames of another source through unchanged, handing each one to a SessionRecorder."""
+    def __init__(self, source, recorder):
+        self.source = source
+        self.recorder = recorder
+
+    def open(self):
+        self.source.open()
+        self.recorder.start()
+        return self
+
+    def read(self):
+        item = self.source.read()
+        if item is not None:
+            self.recorder.record(*item)
+        return item
+
+    def close(self):
+        self.recorder.stop()
+        self.source.close()
+
+    def copies_per_frame(self):
+        return self.source.copies_per_frame()
+
+
+def create_frame_source(kind, path=None, realtime=False, fps=None):
+    """Build a frame source by name: gdi, directory, video or session."""
+    if kind == "gdi":
+        return GdiFrameSource()
+    if path is None:
+        raise ValueError(f"The {kind} frame source needs a path")
+    if kind == "directory":
+        return DirectoryFrameSource(path, fps=fps, realtime=realtime)
+    if kind == "video":
+        return VideoFrameSource(path, realtime=realtime)
+    if kind == "session":
+        return RecordedSessionSource(path, realtime=realtime)
+    raise ValueError(f"Unknown frame source: {kind}")
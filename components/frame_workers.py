@@ -0,0 +1,142 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class FrameWorkerPool:
+    """Runs a per-frame extraction function in N worker processes, yielding results in capture order.
+
+    Frames are copied into a ring of shared-memory slots and workers map the slot as a
+    numpy array, so only the slot's block name and the frame shape are pickled per frame.
+    A slot is reused once the frame in it has been collected; a frame larger than its slot
+    (e.g. the game window was resized) gets a new, larger block for that slot. worker_fn(image, config) and the
+    optional initializer(config) must be module-level functions so they can be pickled;
+    the initializer runs once per worker, which is where templates should be preloaded.
+    Workers are always spawned, not forked: a forked child would inherit the parent's
+    thread pools without their threads.
+    """
+
+    def __init__(self, worker_fn, num_workers, config, initializer=None, num_slots=None):
+        self.worker_fn = worker_fn
+        self.num_workers = num_workers
+        self.config = config
+        self.initializer = initializer
+        self.num_slots = num_slots or num_workers * 2
+        self._blocks = []
+        self._executor = None
+        self._free = deque()
+        self._pending = deque()  # (seq, slot, future) in submit order
+        self._seq = 0
+        self.completed = 0
+        self.worker_time = 0.0
+        self.frames_by_worker = {}
+
+    def _start(self, nbytes):
+        self._blocks = [shared_memory.SharedMemory(create=True, size=nbytes) for _ in range(self.num_slots)]
+        self._free = deque(range(self.num_slots))
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.worker_fn, self.config, self.initializer))
+
+    def _grow_slot(self, slot, nbytes):
+        """Replace a free slot's block with one of nbytes; workers still mapping the old one keep it until they switch."""
+        old = self._blocks[slot]
+        self._blocks[slot] = shared_memory.SharedMemory(create=True, size=nbytes)
+        old.close()
+        old.unlink()
+
+    def submit(self, image):
+        """Copy a frame into a free slot and queue it; returns its sequence number."""
+        if self._executor is None:
+            self._start(image.nbytes)
+        if not self._free:
+            raise RuntimeError("No free frame slot; collect a result first")
+        slot = self._free.popleft()
+        if image.nbytes > self._blocks[slot].size:
+            self._grow_slot(slot, image.nbytes)
+        view = np.ndarray(image.shape, dtype=image.dtype, buffer=self._blocks[slot].buf)
+        view[...] = image
+        seq = self._seq
+        self._seq += 1
+        future = self._executor.submit(_run_frame, slot, self._blocks[slot].name, image.shape, image.dtype.str)
+        self._pending.append((seq, slot, future))
+        return seq
+
+    def collect(self):
+        """Wait for the oldest queued frame; returns (seq, result). Worker exceptions propagate."""
+        seq, slot, future = self._pending.popleft()
+        try:
+            result, elapsed, pid = future.result()
+        finally:
+            self._free.append(slot)
+        self.completed += 1
+        self.worker_time += elapsed
+        self.frames_by_worker[pid] = self.frames_by_worker.get(pid, 0) + 1
+        return seq, result
+
+    def map(self, frames):
+        """Feed an iterable of BGR frames through the workers, yielding (seq, result) in capture order."""
+        for image in frames:
+            if self._executor is not None and not self._free:
+                yield self.collect()
+            self.submit(image)
+            while self._pending and self._pending[0][2].done():
+                yield self.collect()
+        while self._pending:
+            yield self.collect()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def get_stats(self):
+        return {
+            "workers": self.num_workers,
+            "submitted": self._seq,
+            "completed": self.completed,
+            "in_flight": len(self._pending),
+            "mean_worker_time": self.worker_time / self.completed if self.completed else 0.0,
+            "frames_by_worker": dict(self.frames_by_worker),
+        }
+
+
+# State of the current worker process, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(worker_fn, config, initializer):
+    _worker["blocks"] = {}  # slot -> the shared block mapped for it
+    _worker["fn"] = worker_fn
+    _worker["config"] = config
+    if initializer is not None:
+        initializer(config)
+
+
+def _slot_block(slot, block_name):
+    """Map a slot's block, switching to the new one when the parent has grown the slot."""
+    block = _worker["blocks"].get(slot)
+    if block is None or block.name != block_name:
+        if block is not None:
+            block.close()
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker["blocks"][slot] = block
+    return block
+
+
+def _run_frame(slot, block_name, shape, dtype):
+    image = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_slot_block(slot, block_name).buf)
+    start = time.perf_counter()
+    result = _worker["fn"](image, _worker["config"])
+    return result, time.perf_counter() - start, os.getpid()
@@ -4,11 +4,14 @@ import os
 
 from components.utils import get_row_boundaries, AnalysisConfig, load_and_preprocess_image, get_header_positions
 from components.shared_digit_detector import shared_detector
+from components.layout_plan import COLUMN_REGION_WIDTH, COLUMN_REGION_HEIGHT
+from components.debug_trace import DebugTrace
 
 class HealthExtractor:
     """Extracts health values from scoreboard rows."""
     def __init__(self, debug=False):
         self.debug = debug
+        self.trace = DebugTrace(debug)
 
     def extract_health_region(self, image, row_y, health_column_x):
         health_width = 100  # Width of health display area
@@ -20,46 +23,64 @@ class HealthExtractor:
         health_region = image[health_y_start:health_y_end, health_x_start:health_x_end]
         return health_region
 
-    def extract_health_value(self, image, row_y, health_column_x):
-        health_region = self.extract_health_region(image, row_y, health_column_x)
+    def extract_health_value(self, image, row_y, health_column_x, roi=None, binary_image=None):
+        # Read from the frame's shared 127-threshold binary when one is given
+        source = binary_image if binary_image is not None else image
+        health_region = source[roi] if roi is not None else self.extract_health_region(source, row_y, health_column_x)
         if health_region.size == 0:
             return 0
-        digit_matches = shared_detector.find_all_digit_matches(health_region, 'health', confidence_threshold=0.95)
+        digit_matches = shared_detector.recognize_digits(health_region, 'health', confidence_threshold=0.95, region_is_binary=binary_image is not None)
+        return self._health_from_matches(digit_matches)
+
+    def extract_health_values(self, image, row_boundaries, health_column_x, binary_image=None):
+        """Extract the health of every row from one column strip (see SharedDigitDetector.read_column_strip)."""
+        source = binary_image if binary_image is not None else image
+        strip_top = row_boundaries[0]
+        strip = source[strip_top:row_boundaries[-1] + COLUMN_REGION_HEIGHT, health_column_x:health_column_x + COLUMN_REGION_WIDTH]
+        band_starts = [row_y - strip_top for row_y in row_boundaries]
+        band_matches = shared_detector.read_column_strip(strip, band_starts, COLUMN_REGION_HEIGHT, 'health', confidence_threshold=0.95, region_is_binary=binary_image is not None)
+        return [self._health_from_matches(digit_matches) for digit_matches in band_matches]
+
+    def _health_from_matches(self, digit_matches):
         if digit_matches:
             number_result = shared_detector.reconstruct_number_from_matches(digit_matches)
             if number_result and 0 <= number_result['number'] <= 100:
-                if self.debug:
-                    print(f"Found health: {number_result['number']} (confidence: {number_result['confidence']:.3f}, digits: {number_result['digit_count']})")
+                self.trace.log("Found health: %s (confidence: %.3f, digits: %s)", number_result['number'], number_result['confidence'], number_result['digit_count'])
                 return number_result['number']
         return 0
 
-def extract_health_from_scoreboard(image, health_column_x, config):
-    """Extract health data for all rows in the scoreboard."""
-    if config.debug:
-        print(f"########################################################################################### health_extraction.py - STARTED ")
+def extract_health_from_scoreboard(image, health_column_x, config, layout=None, frame_ctx=None, rows=None):
+    """Extract health data for all rows in the scoreboard (or only the row numbers in `rows`)."""
+    extractor = HealthExtractor(debug=config.debug)
+    trace = extractor.trace
+    trace.started("health_extraction.py")
+    if trace.enabled:
         health_templates = shared_detector.get_digit_templates('health')
         print(f"Health templates loaded: {len(health_templates)} templates")
         if health_templates:
             print(f"Available health digits: {list(health_templates.keys())}")
     if health_column_x is None:
-        if config.debug:
-            print("Health column not detected, returning empty data")
+        trace.log("Health column not detected, returning empty data")
         return []
-    extractor = HealthExtractor(debug=config.debug)
     health_data = []
-    row_boundaries = get_row_boundaries()
-    for row_num, row_y in enumerate(row_boundaries):
-        if config.debug:
-            print(f"\n--- Extracting Health for Row {row_num} ---")
-        health_value = extractor.extract_health_value(image, row_y, health_column_x)
+    row_boundaries = layout.row_boundaries if layout is not None else get_row_boundaries()
+    row_numbers = list(range(len(row_boundaries))) if rows is None else sorted(rows)
+    rois = layout.column_rois.get("HEALTH") if layout is not None else None
+    binary_image = frame_ctx.binary(127) if frame_ctx is not None else None
+    if not row_numbers:
+        return []
+    if getattr(config, 'column_strip', False):
+        health_values = extractor.extract_health_values(image, [row_boundaries[row_num] for row_num in row_numbers], health_column_x, binary_image=binary_image)
+    else:
+        health_values = [extractor.extract_health_value(image, row_boundaries[row_num], health_column_x, roi=rois[row_num] if rois else None, binary_image=binary_image)
+                         for row_num in row_numbers]
+    for row_num, health_value in zip(row_numbers, health_values):
         health_data.append({
             "row": row_num,
             "health": health_value
         })
-        if config.debug:
-            print(f"Row {row_num}: Health = {health_value}")
-    if config.debug:
-        print(f"########################################################################################### health_extraction.py - FINISHED")
+        trace.log("Row %s: Health = %s", row_num, health_value)
+    trace.finished("health_extraction.py")
     return health_data
 
 if __name__ == "__main__":
@@ -286,15 +286,99 @@ def is_mask_empty(mask):
     # Check if all pixels are 0 (black)
     return np.all(mask == 0)
 
+class HeroTemplateBank:
+    """
+    Hero template masks loaded once into a contiguous (N_heroes x H x W) normalized tensor.
+    
+    Every template is resized to the slot mask size, mean-centred and scaled to unit norm,
+    so scoring a slot mask against all heroes is a single dot product per hero. This equals
+    TM_CCOEFF_NORMED evaluated at a single position (template and mask of equal size).
+    """
+    def __init__(self, template_masks, mask_size=28):
+        self.template_masks = template_masks
+        self.hero_names = list(template_masks.keys())
+        self.shape = (mask_size, mask_size)
+        templates = np.zeros((len(self.hero_names), mask_size, mask_size), dtype=np.float32)
+        for i, hero_name in enumerate(self.hero_names):
+            template_mask = template_masks[hero_name]
+            if template_mask.shape != self.shape:
+                template_mask = cv2.resize(template_mask, (mask_size, mask_size))
+            templates[i] = template_mask
+        self.templates = np.ascontiguousarray(_normalize_masks(templates))
+        self.matrix = self.templates.reshape(len(self.hero_names), -1)
+    
+    def __len__(self):
+        return len(self.hero_names)
+    
+    def score(self, masks):
+        """Score a list of slot masks against every hero. Returns an (N_masks x N_heroes) array."""
+        if not masks or not self.hero_names:
+            return np.zeros((len(masks), len(self.hero_names)), dtype=np.float32)
+        batch = _normalize_masks(np.stack(masks).astype(np.float32))
+        return np.clip(batch.reshape(len(masks), -1) @ self.matrix.T, -1.0, 1.0)
+    
+    def identify(self, masks, threshold=0.3):
+        """
+        Identify the best hero for every slot mask in one batched operation.
+        
+        Returns:
+            List of (best_hero_name, confidence), (None, 0.0) where nothing reaches threshold
+        """
+        if not masks:
+            return []
+        scores = self.score(masks)
+        if not self.hero_names:
+            return [(None, 0.0)] * len(masks)
+        best = np.argmax(scores, axis=1)
+        results = []
+        for mask_idx, hero_idx in enumerate(best):
+            confidence = float(scores[mask_idx, hero_idx])
+            if confidence > 0.0 and confidence >= threshold:
+                results.append((self.hero_names[hero_idx], confidence))
+            else:
+                results.append((None, 0.0))
+        return results
+
+def _normalize_masks(masks):
+    """Mean-centre each mask and scale it to unit norm (constant masks become all zeros)."""
+    flat = masks.reshape(len(masks), -1)
+    flat -= flat.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(flat, axis=1, keepdims=True)
+    np.divide(flat, norms, out=flat, where=norms > 0)
+    flat[norms[:, 0] == 0] = 0.0
+    return masks
+
+_hero_template_banks = {}
+
+def get_hero_template_bank(masks_folder="assets/templates/hero_masks", debug=False):
+    """
+    Return the hero template bank for a folder, loading and normalizing it only once.
+    
+    Args:
+        masks_folder: Path to folder containing template masks
+        debug: Whether to print debug information
+        
+    Returns:
+        HeroTemplateBank
+    """
+    bank = _hero_template_banks.get(masks_folder)
+    if bank is None:
+        bank = HeroTemplateBank(load_template_masks(masks_folder, debug=debug))
+        _hero_template_banks[masks_folder] = bank
+        if debug:
+            print(f"Hero template bank ready: {len(bank)} heroes, tensor {bank.templates.shape}")
+    return bank
+
 def analyze_all_masks(crew_masks_by_row, bench_masks_by_row, template_masks, debug=False):
     """
     Analyze all generated masks against template masks to identify heroes.
     Stops analyzing a row when an empty (black) mask is found.
+    All occupied slots of the frame are scored against every hero in one batch.
     
     Args:
         crew_masks_by_row: Dict of {row_num: [crew_masks]}
         bench_masks_by_row: Dict of {row_num: [bench_masks]}
-        template_masks: Dict of {hero_name: template_mask}
+        template_masks: HeroTemplateBank, or Dict of {hero_name: template_mask}
         debug: Whether to print debug information
         
     Returns:
@@ -302,70 +386,44 @@ def analyze_all_masks(crew_masks_by_row, bench_masks_by_row, template_masks, deb
         crew_results: Dict of {row_num: [{"hero_name": str, "confidence": float}, ...]}
         bench_results: Dict of {row_num: [{"hero_name": str, "confidence": float}, ...]}
     """
+    bank = template_masks if isinstance(template_masks, HeroTemplateBank) else HeroTemplateBank(template_masks)
     crew_results = {}
     bench_results = {}
     
-    # Analyze crew masks
-    for row_num, masks in crew_masks_by_row.items():
-        row_results = []
-        for slot_idx, mask in enumerate(masks):
-            # Check if mask is empty (completely black)
-            if is_mask_empty(mask):
-                if debug:
-                    print(f"Crew Row {row_num}, Slot {slot_idx}: Empty slot detected - skipping remaining slots in row")
-                # Add empty dict for this slot and all remaining slots
-                remaining_slots = len(masks) - slot_idx
-                row_results.extend([{"hero_name": None, "confidence": 0.0}] * remaining_slots)
-                break
-            
-            # Compare mask to templates
-            hero_name, confidence = compare_mask_to_templates(mask, template_masks)
-            
-            # Create hero dictionary
-            hero_dict = {
-                "hero_name": hero_name,
-                "confidence": confidence
-            }
-            row_results.append(hero_dict)
-            
-            if debug:
-                if hero_name:
-                    print(f"Crew Row {row_num}, Slot {slot_idx}: {hero_name} ({confidence:.3f})")
-                else:
-                    print(f"Crew Row {row_num}, Slot {slot_idx}: No match")
-        
-        crew_results[row_num] = row_results
-    
-    # Analyze bench masks
-    for row_num, masks in bench_masks_by_row.items():
-        row_results = []
-        for slot_idx, mask in enumerate(masks):
-            # Check if mask is empty (completely black)
-            if is_mask_empty(mask):
-                if debug:
-                    print(f"Bench Row {row_num}, Slot {slot_idx}: Empty slot detected - skipping remaining slots in row")
-                # Add empty dict for this slot and all remaining slots
-                remaining_slots = len(masks) - slot_idx
-                row_results.extend([{"hero_name": None, "confidence": 0.0}] * remaining_slots)
-                break
-            
-            # Compare mask to templates
-            hero_name, confidence = compare_mask_to_templates(mask, template_masks)
-            
-            # Create hero dictionary
-            hero_dict = {
-                "hero_name": hero_name,
-                "confidence": confidence
-            }
-            row_results.append(hero_dict)
-            
-            if debug:
-                if hero_name:
-                    print(f"Bench Row {row_num}, Slot {slot_idx}: {hero_name} ({confidence:.3f})")
-                else:
-                    print(f"Bench Row {row_num}, Slot {slot_idx}: No match")
-        
-        bench_results[row_num] = row_results
+    # Collect every occupied slot up to the first empty one in each row
+    pending = []  # (label, row_results, slot_idx, mask)
+    for label, masks_by_row, results in (("Crew", crew_masks_by_row, crew_results), ("Bench", bench_masks_by_row, bench_results)):
+        for row_num, masks in masks_by_row.items():
+            row_results = []
+            for slot_idx, mask in enumerate(masks):
+                # Check if mask is empty (completely black)
+                if is_mask_empty(mask):
+                    if debug:
+                        print(f"{label} Row {row_num}, Slot {slot_idx}: Empty slot detected - skipping remaining slots in row")
+                    # Add empty dict for this slot and all remaining slots
+                    remaining_slots = len(masks) - slot_idx
+                    row_results.extend([{"hero_name": None, "confidence": 0.0}] * remaining_slots)
+                    break
+                hero_dict = {"hero_name": None, "confidence": 0.0}
+                row_results.append(hero_dict)
+                pending.append((label, row_num, slot_idx, hero_dict, mask))
+            results[row_num] = row_results
+    
+    # Compare all masks to all templates at once (odd-sized masks use the per-template path)
+    batched = [entry for entry in pending if entry[4].shape == bank.shape]
+    for entry, (hero_name, confidence) in zip(batched, bank.identify([entry[4] for entry in batched])):
+        entry[3]["hero_name"] = hero_name
+        entry[3]["confidence"] = confidence
+    for entry in pending:
+        if entry[4].shape != bank.shape:
+            entry[3]["hero_name"], entry[3]["confidence"] = compare_mask_to_templates(entry[4], bank.template_masks)
+    
+    if debug:
+        for label, row_num, slot_idx, hero_dict, _ in pending:
+            if hero_dict["hero_name"]:
+                print(f"{label} Row {row_num}, Slot {slot_idx}: {hero_dict['hero_name']} ({hero_dict['confidence']:.3f})")
+            else:
+                print(f"{label} Row {row_num}, Slot {slot_idx}: No match")
     
     return crew_results, bench_results
 
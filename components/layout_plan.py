@@ -0,0 +1,97 @@
+from components.utils import get_row_boundaries
+
+# Health, record and networth are read from a fixed-size box starting at their header x
+COLUMN_REGION_WIDTH = 100
+COLUMN_REGION_HEIGHT = 80
+COLUMN_HEADERS = ["HEALTH", "RECORD", "NETWORTH"]
+STAR_AREA_HEIGHT = 18
+
+
+class SlotTable:
+    """Crew or bench slot geometry for every row.
+
+    The per-row slot dicts (same keys as calculate_hero_slots, plus precomputed
+    slices) are built once at compile time and shared by every frame.
+    """
+
+    def __init__(self, slots_by_row):
+        rows = list(slots_by_row.keys())
+        num_slots = len(slots_by_row[rows[0]]) if rows else 0
+        self.rows = rows
+        self.num_slots = num_slots
+        self.slots_by_row = {}
+        for row, slots in slots_by_row.items():
+            row_slots = []
+            for slot in slots:
+                slot = dict(slot)
+                star_x_start = slot['x_center'] - slot['width'] // 2
+                slot['slice'] = (slice(slot['y_start'], slot['y_end']), slice(slot['x_start'], slot['x_end']))
+                slot['star_slice'] = (slice(slot['y_end'], slot['y_end'] + STAR_AREA_HEIGHT), slice(star_x_start, star_x_start + slot['width']))
+                row_slots.append(slot)
+            self.slots_by_row[row] = row_slots
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class LayoutPlan:
+    """Every scoreboard ROI for a given set of header positions, compiled once.
+
+    ROIs are stored as (row_slice, column_slice) tuples so extractors crop with a single
+    `image[roi]` instead of recomputing coordinates every frame.
+    """
+
+    def __init__(self, header_positions, image_width):
+        # Imported here so the extractor modules can import this module without a cycle
+        from components import player_extraction as player
+        from components.hero_extraction import calculate_crew_slots, calculate_bench_slots
+
+        self.header_positions = dict(header_positions)
+        self.image_width = image_width
+        self.row_boundaries = get_row_boundaries()
+
+        # Player column (fixed x, one entry per row)
+        self.player_rois = []
+        for row_y in self.row_boundaries:
+            name_y_start = row_y + player.PLAYER_NAME_Y_START
+            info_y_start = row_y + player.PLAYER_INFO_Y_START
+            info_rows = slice(info_y_start, info_y_start + player.PLAYER_INFO_HEIGHT)
+            self.player_rois.append({
+                "name": (slice(name_y_start, name_y_start + player.PLAYER_NAME_HEIGHT), slice(player.PLAYER_NAME_X_START, player.PLAYER_COLUMN_X_END)),
+                "level": (info_rows, slice(player.PLAYER_LEVEL_X_START, player.PLAYER_LEVEL_X_END)),
+                "gold": (info_rows, slice(player.PLAYER_GOLD_X_START, player.PLAYER_GOLD_X_END)),
+            })
+
+        # Health / record / networth boxes, one per row, for every detected column
+        self.column_rois = {}
+        for header in COLUMN_HEADERS:
+            column_x = self.header_positions.get(header)
+            if column_x is None:
+                continue
+            columns = slice(column_x, column_x + COLUMN_REGION_WIDTH)
+            self.column_rois[header] = [(slice(row_y, row_y + COLUMN_REGION_HEIGHT), columns) for row_y in self.row_boundaries]
+
+        # Crew and bench slot tables
+        crew_start_x = self.header_positions.get("CREW")
+        crew_end_x = self.header_positions.get("UNDERLORD")
+        bench_start_x = self.header_positions.get("BENCH")
+        self.crew_slots = None
+        self.bench_slots = None
+        if crew_start_x is not None and crew_end_x is not None:
+            self.crew_slots = SlotTable({row_num: calculate_crew_slots(crew_start_x, crew_end_x, row_y) for row_num, row_y in enumerate(self.row_boundaries)})
+        if bench_start_x is not None:
+            self.bench_slots = SlotTable({row_num: calculate_bench_slots(bench_start_x, image_width, row_y) for row_num, row_y in enumerate(self.row_boundaries)})
+
+    def matches(self, header_positions, image_width):
+        return image_width == self.image_width and header_positions == self.header_positions
+
+
+_current_plan = None
+
+
+def get_layout_plan(header_positions, image_width):
+    """Return the layout plan for these headers, recompiling only when the headers move."""
+    global _current_plan
+    if _current_plan is None or not _current_plan.matches(header_positions, image_width):
+        _current_plan = LayoutPlan(header_positions, image_width)
+    return _current_plan
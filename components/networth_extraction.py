@@ -6,6 +6,8 @@ import sys
 
 from components.utils import get_row_boundaries, AnalysisConfig, load_and_preprocess_image, get_header_positions
 from components.shared_digit_detector import shared_detector
+from components.layout_plan import COLUMN_REGION_WIDTH, COLUMN_REGION_HEIGHT
+from components.debug_trace import DebugTrace
 
 
 class NetWorthDigitDetector:
@@ -146,6 +148,7 @@ class NetWorthExtractor:
     
     def __init__(self, debug=False):
         self.debug = debug
+        self.trace = DebugTrace(debug)
     
     def extract_networth_region(self, image, row_y, networth_column_x):
         """Extract the networth region from a specific row."""
@@ -163,23 +166,37 @@ class NetWorthExtractor:
         
         return networth_region
     
-    def extract_networth_value(self, image, row_y, networth_column_x):
+    def extract_networth_value(self, image, row_y, networth_column_x, roi=None, binary_image=None):
         """Extract networth value using sliding digit detection."""
-        networth_region = self.extract_networth_region(image, row_y, networth_column_x)
+        # Read from the frame's shared 127-threshold binary when one is given
+        source = binary_image if binary_image is not None else image
+        networth_region = source[roi] if roi is not None else self.extract_networth_region(source, row_y, networth_column_x)
         
         if networth_region.size == 0:
             return 0
         
         # Find all digit matches using sliding window
-        digit_matches = shared_detector.find_all_digit_matches(networth_region, 'networth', confidence_threshold=0.95)
-        
+        digit_matches = shared_detector.recognize_digits(networth_region, 'networth', confidence_threshold=0.95, region_is_binary=binary_image is not None)
+        return self._networth_from_matches(digit_matches)
+    
+    def extract_networth_values(self, image, row_boundaries, networth_column_x, binary_image=None):
+        """Extract the networth of every row from one column strip (see SharedDigitDetector.read_column_strip)."""
+        source = binary_image if binary_image is not None else image
+        strip_top = row_boundaries[0]
+        strip = source[strip_top:row_boundaries[-1] + COLUMN_REGION_HEIGHT, networth_column_x:networth_column_x + COLUMN_REGION_WIDTH]
+        band_starts = [row_y - strip_top for row_y in row_boundaries]
+        band_matches = shared_detector.read_column_strip(strip, band_starts, COLUMN_REGION_HEIGHT, 'networth', confidence_threshold=0.95, region_is_binary=binary_image is not None)
+        # Rows cut off by the frame read as 0, as in extract_networth_value
+        return [self._networth_from_matches(digit_matches) if strip[band_start:band_start + COLUMN_REGION_HEIGHT].size else 0
+                for band_start, digit_matches in zip(band_starts, band_matches)]
+    
+    def _networth_from_matches(self, digit_matches):
         if digit_matches:
             # Reconstruct number from digit matches
             number_result = shared_detector.reconstruct_number_from_matches(digit_matches)
             
             if number_result and number_result['number'] >= 0 and number_result['number'] <= 1000:
-                if self.debug:
-                    print(f"Found networth by using find_all_digit_matches: {number_result['number']} (confidence: {number_result['confidence']:.3f}, digits: {number_result['digit_count']})")
+                self.trace.log("Found networth by using find_all_digit_matches: %s (confidence: %.3f, digits: %s)", number_result['number'], number_result['confidence'], number_result['digit_count'])
                 return number_result['number']
         
         # Fallback to OCR if needed
@@ -225,10 +242,12 @@ class NetWorthExtractor:
         
         return networth
 
-def extract_networth_from_scoreboard(image, networth_column_x, config):
-    """Extract networth data for all rows in the scoreboard."""
-    if config.debug:
-        print(f"###########################################################################################"+" networth_extraction.py" + " - STARTED ")
+def extract_networth_from_scoreboard(image, networth_column_x, config, layout=None, frame_ctx=None, rows=None):
+    """Extract networth data for all rows in the scoreboard (or only the row numbers in `rows`)."""
+    extractor = NetWorthExtractor(debug=config.debug)
+    trace = extractor.trace
+    trace.started("networth_extraction.py")
+    if trace.enabled:
         # Show template loading status once
         networth_templates = shared_detector.get_digit_templates('networth')
         print(f"NetWorth templates loaded: {len(networth_templates)} templates")
@@ -237,31 +256,33 @@ def extract_networth_from_scoreboard(image, networth_column_x, config):
     
     # Check if networth column was detected
     if networth_column_x is None:
-        if config.debug:
-            print("NetWorth column not detected, returning empty data")
+        trace.log("NetWorth column not detected, returning empty data")
         return []
     
-    extractor = NetWorthExtractor(debug=config.debug)
     networth_data = []
     
     # Get row boundaries
-    row_boundaries = get_row_boundaries()
+    row_boundaries = layout.row_boundaries if layout is not None else get_row_boundaries()
+    row_numbers = list(range(len(row_boundaries))) if rows is None else sorted(rows)
+    rois = layout.column_rois.get("NETWORTH") if layout is not None else None
+    binary_image = frame_ctx.binary(127) if frame_ctx is not None else None
     
-    for row_num, row_y in enumerate(row_boundaries):
-        if config.debug:
-            print(f"\n--- Extracting NetWorth for Row {row_num} ---")
-        
-        networth_value = extractor.extract_networth_value(image, row_y, networth_column_x)
-        
+    if not row_numbers:
+        return []
+    if getattr(config, 'column_strip', False):
+        networth_values = extractor.extract_networth_values(image, [row_boundaries[row_num] for row_num in row_numbers], networth_column_x, binary_image=binary_image)
+    else:
+        networth_values = [extractor.extract_networth_value(image, row_boundaries[row_num], networth_column_x, roi=rois[row_num] if rois else None, binary_image=binary_image)
+                           for row_num in row_numbers]
+    
+    for row_num, networth_value in zip(row_numbers, networth_values):
         networth_data.append({
             "row": row_num,
             "networth": networth_value
         })
         
-        if config.debug:
-            print(f"Row {row_num}: NetWorth = {networth_value}")
-    if config.debug:
-        print(f"###########################################################################################"+" networth_extraction.py" + " - FINISHED")
+        trace.log("Row %s: NetWorth = %s", row_num, networth_value)
+    trace.finished("networth_extraction.py")
     return networth_data
 
 if __name__ == "__main__":
@@ -3,7 +3,9 @@ import numpy as np
 import os
 import glob
 from components.shared_digit_detector import shared_detector
-from components.player_template_manager import PlayerTemplateManager
+from components.player_template_manager import get_shared_template_manager
+from components.utils import region_fingerprint
+from components.debug_trace import DebugTrace
 
 # Overlay digit templates
 LEVEL_GOLD_TEMPLATE_DIR = "assets/templates/digits"
@@ -37,53 +39,102 @@ HEALTH_X_END = 202
 HEALTH_Y_START = 18
 HEALTH_Y_END = 48
 
+# Precompiled ROIs: the overlay layout is fixed, so slices are built once at import
+OVERLAY_ROW_COLUMNS = slice(OVERLAY_X, OVERLAY_X + HEALTH_X_END)
+OVERLAY_ROW_Y = [OVERLAY_Y + i * ROW_HEIGHT for i in range(NUM_PLAYERS)]
+OVERLAY_ROW_ROIS = [(slice(row_y, row_y + ROW_HEIGHT), OVERLAY_ROW_COLUMNS) for row_y in OVERLAY_ROW_Y]
+# Subregions relative to a row crop
+OVERLAY_SUBREGION_ROIS = {
+    'player_name': (slice(PLAYER_NAME_Y_START, PLAYER_NAME_Y_END), slice(PLAYER_NAME_X_START, PLAYER_NAME_X_END)),
+    'level': (slice(LEVEL_Y_START, LEVEL_Y_END), slice(LEVEL_X_START, LEVEL_X_END)),
+    'gold': (slice(GOLD_Y_START, GOLD_Y_END), slice(GOLD_X_START, GOLD_X_END)),
+    'health': (slice(HEALTH_Y_START, HEALTH_Y_END), slice(HEALTH_X_START, HEALTH_X_END)),
+}
+
+class OverlayRowCache:
+    """
+    Remembers the last result of every overlay row, keyed by a fingerprint of the row's pixels.
+
+    A row whose name was not matched is read again once the player templates change,
+    since its name may match one of the new templates.
+    """
+    def __init__(self):
+        self.entries = {}  # row_num -> (fingerprint, template store version, overlay row result, name binary)
+        self.reused = 0
+        self.extracted = 0
+
+    def start_frame(self):
+        self.reused = 0
+        self.extracted = 0
+
+    def lookup(self, row_num, fingerprint, store_version):
+        """Return (result copy, name binary) if the row is unchanged since it was last read, else None."""
+        entry = self.entries.get(row_num)
+        if entry is None or entry[0] != fingerprint or (entry[2]['player_name'] is None and entry[1] != store_version):
+            self.extracted += 1
+            return None
+        self.reused += 1
+        return dict(entry[2]), entry[3]
+
+    def store(self, row_num, fingerprint, store_version, result, name_binary):
+        self.entries[row_num] = (fingerprint, store_version, dict(result), name_binary)
+
+    def get_frame_stats(self):
+        return {"reused": self.reused, "extracted": self.extracted}
+
+# Global instance so overlay row results survive across frames
+shared_overlay_row_cache = OverlayRowCache()
+
 class OverlayExtractor:
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, frame_ctx=None):
         self.debug = debug
-        self.template_manager = PlayerTemplateManager()
+        self.trace = DebugTrace(debug)
+        self.template_manager = get_shared_template_manager()
+        self.frame_ctx = frame_ctx  # shared per-frame preprocessing (FrameContext), optional
+
+    def _row_crop(self, image, row_y):
+        return image[row_y:row_y + ROW_HEIGHT, OVERLAY_ROW_COLUMNS]
 
     def extract_level_region(self, image, row_y):
-        return image[row_y + LEVEL_Y_START:row_y + LEVEL_Y_END, OVERLAY_X + LEVEL_X_START:OVERLAY_X + LEVEL_X_END]
+        return self._row_crop(image, row_y)[OVERLAY_SUBREGION_ROIS['level']]
 
     def extract_gold_region(self, image, row_y):
-        return image[row_y + GOLD_Y_START:row_y + GOLD_Y_END, OVERLAY_X + GOLD_X_START:OVERLAY_X + GOLD_X_END]
+        return self._row_crop(image, row_y)[OVERLAY_SUBREGION_ROIS['gold']]
 
     def extract_health_region(self, image, row_y):
-        return image[row_y + HEALTH_Y_START:row_y + HEALTH_Y_END, OVERLAY_X + HEALTH_X_START:OVERLAY_X + HEALTH_X_END]
+        return self._row_crop(image, row_y)[OVERLAY_SUBREGION_ROIS['health']]
 
     def extract_player_name_region(self, image, row_y):
-        return image[row_y + PLAYER_NAME_Y_START:row_y + PLAYER_NAME_Y_END, OVERLAY_X + PLAYER_NAME_X_START:OVERLAY_X + PLAYER_NAME_X_END]
+        return self._row_crop(image, row_y)[OVERLAY_SUBREGION_ROIS['player_name']]
 
-    def extract_row(self, image, row_y, row_num):
+    def extract_row(self, image, row_y, row_num, match_name=True):
         # 1. Crop the full row region
-        row_crop = image[row_y:row_y + ROW_HEIGHT, OVERLAY_X:OVERLAY_X + HEALTH_X_END]
-        # 2. Convert to grayscale and binarize once
-        row_gray = cv2.cvtColor(row_crop, cv2.COLOR_BGR2GRAY) if len(row_crop.shape) == 3 else row_crop
-        _, row_bin = cv2.threshold(row_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        row_crop = self._row_crop(image, row_y)
+        # 2. Convert to grayscale and binarize once (Otsu per row, shared through the frame context)
+        if self.frame_ctx is not None:
+            row_bin = self.frame_ctx.otsu((slice(row_y, row_y + ROW_HEIGHT), OVERLAY_ROW_COLUMNS))
+        else:
+            row_gray = cv2.cvtColor(row_crop, cv2.COLOR_BGR2GRAY) if len(row_crop.shape) == 3 else row_crop
+            _, row_bin = cv2.threshold(row_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
         # 3. Crop subregions from the binary row
-        player_name_bin = row_bin[PLAYER_NAME_Y_START:PLAYER_NAME_Y_END, PLAYER_NAME_X_START:PLAYER_NAME_X_END]
-        level_bin = row_bin[LEVEL_Y_START:LEVEL_Y_END, LEVEL_X_START:LEVEL_X_END]
-        gold_bin = row_bin[GOLD_Y_START:GOLD_Y_END, GOLD_X_START:GOLD_X_END]
-        health_bin = row_bin[HEALTH_Y_START:HEALTH_Y_END, HEALTH_X_START:HEALTH_X_END]
-        # For debug/visualization, also crop original (non-binary) subregions
-        player_name_crop = row_crop[PLAYER_NAME_Y_START:PLAYER_NAME_Y_END, PLAYER_NAME_X_START:PLAYER_NAME_X_END]
-        level_crop = row_crop[LEVEL_Y_START:LEVEL_Y_END, LEVEL_X_START:LEVEL_X_END]
-        gold_crop = row_crop[GOLD_Y_START:GOLD_Y_END, GOLD_X_START:GOLD_X_END]
-        health_crop = row_crop[HEALTH_Y_START:HEALTH_Y_END, HEALTH_X_START:HEALTH_X_END]
+        player_name_bin = row_bin[OVERLAY_SUBREGION_ROIS['player_name']]
+        level_bin = row_bin[OVERLAY_SUBREGION_ROIS['level']]
+        gold_bin = row_bin[OVERLAY_SUBREGION_ROIS['gold']]
+        health_bin = row_bin[OVERLAY_SUBREGION_ROIS['health']]
 
         # Detect digits using shared_detector
-        level_matches = shared_detector.find_all_digit_matches(level_bin, 'overlay', confidence_threshold=0.94)
-        gold_matches = shared_detector.find_all_digit_matches(gold_bin, 'overlay', confidence_threshold=0.94)
-        health_matches = shared_detector.find_all_digit_matches(health_bin, 'overlay_health', confidence_threshold=0.94)
+        level_matches = shared_detector.recognize_digits(level_bin, 'overlay', confidence_threshold=0.94, region_is_binary=True)
+        gold_matches = shared_detector.recognize_digits(gold_bin, 'overlay', confidence_threshold=0.94, region_is_binary=True)
+        health_matches = shared_detector.recognize_digits(health_bin, 'overlay_health', confidence_threshold=0.94, region_is_binary=True)
         level_result = shared_detector.reconstruct_number_from_matches(level_matches)
         gold_result = shared_detector.reconstruct_number_from_matches(gold_matches)
         health_result = shared_detector.reconstruct_number_from_matches(health_matches)
         level = level_result['number'] if level_result else None
         gold = gold_result['number'] if gold_result else None
         health = health_result['number'] if health_result else None
-        # Player name matching
-        template_match = self.template_manager.find_player_by_template(player_name_bin)
+        # Player name matching (skipped when the caller matches all rows in one batch)
+        template_match = self.template_manager.find_player_by_template(player_name_bin, pre_binarized=True) if match_name else None
         if template_match:
             player_name = template_match["player_name"]
         else:
@@ -95,23 +146,41 @@ class OverlayExtractor:
             'gold': gold,
             'health': health,
             'player_name_binary': player_name_bin,
-            'debug_crops': {
-                'player_name': player_name_crop.copy(),
-                'level': level_crop.copy(),
-                'gold': gold_crop.copy(),
-                'health': health_crop.copy()
-            }
+            # For debug/visualization, copies of the original (non-binary) subregions; None unless debugging
+            'debug_crops': self.trace.crops(row_crop, OVERLAY_SUBREGION_ROIS)
         }
 
-def extract_overlay_from_image(image, config):
-    extractor = OverlayExtractor(debug=getattr(config, 'debug', False))
+def extract_overlay_from_image(image, config, frame_ctx=None):
+    """Extract every overlay row; with config.overlay_row_cache, rows with unchanged pixels reuse their last result."""
+    extractor = OverlayExtractor(debug=getattr(config, 'debug', False), frame_ctx=frame_ctx)
+    cache = shared_overlay_row_cache if getattr(config, 'overlay_row_cache', True) else None
     overlay_data = []
     debug_crops = []
     player_name_binaries = []
-    # Calculate y-offsets for all 8 rows
-    y_offsets = [OVERLAY_Y + i * ROW_HEIGHT for i in range(NUM_PLAYERS)]
-    for row_num, row_y in enumerate(y_offsets):
-        row_data = extractor.extract_row(image, row_y, row_num)
+    reused = {}
+    fingerprints = {}
+    store_version = extractor.template_manager.template_store.version
+    if cache is not None:
+        cache.start_frame()
+        for row_num, roi in enumerate(OVERLAY_ROW_ROIS):
+            fingerprints[row_num] = region_fingerprint(image[roi])
+            cached = cache.lookup(row_num, fingerprints[row_num], store_version)
+            if cached is not None:
+                reused[row_num] = cached
+    rows_data = {row_num: extractor.extract_row(image, row_y, row_num, match_name=False) for row_num, row_y in enumerate(OVERLAY_ROW_Y) if row_num not in reused}
+    # Match the player names of the rows read in this frame against all known players in one batch
+    template_matches = extractor.template_manager.find_players_by_template([row_data['player_name_binary'] for row_data in rows_data.values()], pre_binarized=True) if rows_data else []
+    for row_data, template_match in zip(rows_data.values(), template_matches):
+        if template_match:
+            row_data['player_name'] = template_match['player_name']
+    for row_num in range(len(OVERLAY_ROW_Y)):
+        if row_num in reused:
+            result, name_binary = reused[row_num]
+            overlay_data.append(result)
+            player_name_binaries.append(name_binary if result['player_name'] is None else None)
+            debug_crops.append(None)
+            continue
+        row_data = rows_data[row_num]
         overlay_data.append({
             'row': row_num,
             'player_name': row_data['player_name'],
@@ -119,13 +188,13 @@ def extract_overlay_from_image(image, config):
             'gold': row_data['gold'],
             'health': row_data['health']
         })
+        if cache is not None:
+            cache.store(row_num, fingerprints[row_num], store_version, overlay_data[-1], row_data['player_name_binary'])
         if row_data['player_name'] is None:
             player_name_binaries.append(row_data['player_name_binary'])
         else:
             player_name_binaries.append(None)
         debug_crops.append(row_data['debug_crops'])
-    if extractor.debug:
-        print("#create_debug_grid_crops(overlay_data, debug_crops), line 113, in overlay_extraction.py")
     return overlay_data, player_name_binaries
 
 def create_debug_grid_crops(results, debug_crops):
@@ -159,6 +228,8 @@ def create_debug_grid_crops(results, debug_crops):
     
     # Add player data rows
     for row_idx, crops in enumerate(debug_crops):
+        if crops is None:
+            continue  # row reused from the overlay row cache, nothing was cropped
         y = margin + header_height + margin + row_idx * (cell_height + margin)
         for col, key in enumerate(['player_name', 'level', 'gold', 'health']):
             x = margin + col * (cell_width + margin)
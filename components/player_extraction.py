@@ -7,7 +7,8 @@ from datetime import datetime
 
 from components.utils import get_row_boundaries, AnalysisConfig, load_and_preprocess_image
 from components.shared_digit_detector import shared_detector
-from components.player_template_manager import PlayerTemplateManager
+from components.player_template_manager import get_shared_template_manager
+from components.debug_trace import DebugTrace
 
 # Player column position constants
 PLAYER_COLUMN_X_START = 28
@@ -34,20 +35,28 @@ ROWS_START_Y = 96
 class PlayerExtractor:
     """Extracts player information from scoreboard rows."""
     
-    def __init__(self, debug=False):
-        self.template_manager = PlayerTemplateManager()
+    def __init__(self, debug=False, layout=None, frame_ctx=None):
+        self.template_manager = get_shared_template_manager()
         self.debug = debug
+        self.trace = DebugTrace(debug)
+        self.frame_ctx = frame_ctx  # shared per-frame preprocessing (FrameContext), optional
+        self._name_matches = {}  # row_y -> template match prefetched by match_player_names
+        # row_y -> precompiled ROIs from the layout plan
+        self._rois_by_row_y = dict(zip(layout.row_boundaries, layout.player_rois)) if layout is not None else {}
     
     def extract_player_name_region(self, image, row_y):
         """Extract the player name region from a row."""
+        rois = self._rois_by_row_y.get(row_y)
+        if rois is not None:
+            return image[rois["name"]]
         name_y_start = row_y + PLAYER_NAME_Y_START
         name_y_end = name_y_start + PLAYER_NAME_HEIGHT
         name_region = image[name_y_start:name_y_end, PLAYER_NAME_X_START:PLAYER_COLUMN_X_END]
         
-        print(f"extract_player_name_region: row_y={row_y}, name_y_start={name_y_start}, name_y_end={name_y_end}")
-        print(f"PLAYER_NAME_X_START={PLAYER_NAME_X_START}, PLAYER_COLUMN_X_END={PLAYER_COLUMN_X_END}")
-        print(f"image.shape={image.shape}")
-        print(f"name_region.shape={name_region.shape}")
+        self.trace.log("extract_player_name_region: row_y=%s, name_y_start=%s, name_y_end=%s", row_y, name_y_start, name_y_end)
+        self.trace.log("PLAYER_NAME_X_START=%s, PLAYER_COLUMN_X_END=%s", PLAYER_NAME_X_START, PLAYER_COLUMN_X_END)
+        self.trace.log("image.shape=%s", image.shape)
+        self.trace.log("name_region.shape=%s", name_region.shape)
         # Convert to grayscale for template matching
         """ if len(name_region.shape) == 3:
             name_region_gray = cv2.cvtColor(name_region, cv2.COLOR_BGR2GRAY)
@@ -58,6 +67,9 @@ class PlayerExtractor:
     
     def extract_player_level_region(self, image, row_y):
         """Extract the player level region (first 30px) from a row."""
+        rois = self._rois_by_row_y.get(row_y)
+        if rois is not None:
+            return image[rois["level"]]
         info_y_start = row_y + PLAYER_INFO_Y_START
         info_y_end = info_y_start + PLAYER_INFO_HEIGHT
         
@@ -68,6 +80,9 @@ class PlayerExtractor:
     
     def extract_player_gold_region(self, image, row_y):
         """Extract the player gold region (after level region) from a row."""
+        rois = self._rois_by_row_y.get(row_y)
+        if rois is not None:
+            return image[rois["gold"]]
         info_y_start = row_y + PLAYER_INFO_Y_START
         info_y_end = info_y_start + PLAYER_INFO_HEIGHT
         
@@ -78,16 +93,30 @@ class PlayerExtractor:
     
 
     
+    def match_player_names(self, image, row_boundaries):
+        """Match the name regions of all rows against all known players in one batch."""
+        if self.frame_ctx is not None:
+            binary = self.frame_ctx.binary(127)
+            name_regions = [self.extract_player_name_region(binary, row_y) for row_y in row_boundaries]
+            template_matches = self.template_manager.find_players_by_template(name_regions, pre_binarized=True)
+        else:
+            name_regions = [self.extract_player_name_region(image, row_y) for row_y in row_boundaries]
+            template_matches = self.template_manager.find_players_by_template(name_regions)
+        self._name_matches = dict(zip(row_boundaries, template_matches))
+        return template_matches
+
     def extract_player_name(self, image, row_y, skip_template_if_invalid=False, level=None, gold=None):
         """Extract player name using template matching + OCR fallback. Optionally skip template creation if level/gold invalid."""
         name_region = self.extract_player_name_region(image, row_y)
         if name_region.size == 0:
             return {"player_name": "", "template_id": None, "method": "error"}
-        # Try template matching first
-        template_match = self.template_manager.find_player_by_template(name_region)
+        # Try template matching first (use the batched result when the row was prefetched)
+        if row_y in self._name_matches:
+            template_match = self._name_matches[row_y]
+        else:
+            template_match = self.template_manager.find_player_by_template(name_region)
         if template_match:
-            if self.debug:
-                print(f"Found player by template: {template_match['player_name']} (confidence: {template_match['confidence']:.3f})")
+            self.trace.log("Found player by template: %s (confidence: %.3f)", template_match['player_name'], template_match['confidence'])
             return {
                 "player_name": template_match["player_name"],
                 "template_id": template_match["player_id"],
@@ -113,39 +142,37 @@ class PlayerExtractor:
                     "_should_create_template": True
                 }
             else:
-                if self.debug:
-                    print("OCR failed to extract valid player name")
+                self.trace.log("OCR failed to extract valid player name")
                 return {"player_name": "", "template_id": None, "method": "ocr_failed", "_should_create_template": False}
         except Exception as e:
-            if self.debug:
-                print(f"OCR error: {e}")
+            self.trace.log("OCR error: %s", e)
             return {"player_name": "", "template_id": None, "method": "error", "_should_create_template": False}
     
     def extract_player_level(self, image, row_y):
         """Extract player level using sliding digit detection."""
-        level_region = self.extract_player_level_region(image, row_y)
+        source = self.frame_ctx.binary(127) if self.frame_ctx is not None else image
+        level_region = self.extract_player_level_region(source, row_y)
         if level_region.size == 0:
             return 0
-        digit_matches = shared_detector.find_digits_by_sliding(level_region, 'player')
+        digit_matches = shared_detector.recognize_digits(level_region, 'player', confidence_threshold=0.95, region_is_binary=self.frame_ctx is not None)
         if digit_matches:
             number_result = shared_detector.reconstruct_number_from_matches(digit_matches)
             if number_result and 1 <= number_result['number'] <= 10:
-                if self.debug:
-                    print(f"Found level by sliding digits: {number_result['number']} (confidence: {number_result['confidence']:.3f}, digits: {number_result['digit_count']})")
+                self.trace.log("Found level by sliding digits: %s (confidence: %.3f, digits: %s)", number_result['number'], number_result['confidence'], number_result['digit_count'])
                 return number_result['number']
         return 0
     
     def extract_player_gold(self, image, row_y):
         """Extract player gold using sliding digit detection with OCR fallback."""
-        gold_region = self.extract_player_gold_region(image, row_y)
+        source = self.frame_ctx.binary(127) if self.frame_ctx is not None else image
+        gold_region = self.extract_player_gold_region(source, row_y)
         if gold_region.size == 0:
             return 0
-        digit_matches = shared_detector.find_digits_by_sliding(gold_region, 'player')
+        digit_matches = shared_detector.recognize_digits(gold_region, 'player', confidence_threshold=0.95, region_is_binary=self.frame_ctx is not None)
         if digit_matches:
             number_result = shared_detector.reconstruct_number_from_matches(digit_matches)
             if number_result and 0 <= number_result['number'] <= 99:
-                if self.debug:
-                    print(f"Found gold by sliding digits: {number_result['number']} (confidence: {number_result['confidence']:.3f}, digits: {number_result['digit_count']})")
+                self.trace.log("Found gold by sliding digits: %s (confidence: %.3f, digits: %s)", number_result['number'], number_result['confidence'], number_result['digit_count'])
                 return number_result['number']
         return 0
     
@@ -217,16 +244,18 @@ class PlayerExtractor:
         }
 
 # Usage example
-def extract_players_from_scoreboard(image, config, overlay_name_binaries=None):
-    """Extract player data for all rows in the scoreboard."""
-    extractor = PlayerExtractor(debug=config.debug)
+def extract_players_from_scoreboard(image, config, overlay_name_binaries=None, layout=None, frame_ctx=None, rows=None):
+    """Extract player data for all rows in the scoreboard (or only the row numbers in `rows`)."""
+    extractor = PlayerExtractor(debug=config.debug, layout=layout, frame_ctx=frame_ctx)
+    trace = extractor.trace
     players_data = []
-    row_boundaries = get_row_boundaries()
-    if config.debug:
-        print(f"###########################################################################################"+" player_extraction.py" + " - STARTED ")
-    for row_num, row_y in enumerate(row_boundaries):
-        if config.debug:
-            print(f"\n--- Extracting Player Data for Row {row_num} ---")
+    row_boundaries = layout.row_boundaries if layout is not None else get_row_boundaries()
+    row_numbers = range(len(row_boundaries)) if rows is None else sorted(rows)
+    trace.started("player_extraction.py")
+    extractor.match_player_names(image, [row_boundaries[row_num] for row_num in row_numbers])
+    for row_num in row_numbers:
+        row_y = row_boundaries[row_num]
+        trace.log("\n--- Extracting Player Data for Row %s ---", row_num)
         player_data = extractor.extract_all_player_data(image, row_y, row_num)
         # Only add if BOTH level and gold are not None (0 is valid)
         if (
@@ -235,7 +264,7 @@ def extract_players_from_scoreboard(image, config, overlay_name_binaries=None):
             and player_data["playerGold"] is not None
         ):
             # Only create template if needed
-            if player_data.get("_should_create_template"):
+            if player_data.get("_should_create_template") and getattr(config, 'create_player_templates', True):
                 overlay_binary = overlay_name_binaries[row_num] if overlay_name_binaries is not None and row_num < len(overlay_name_binaries) else None
                 # Create scoreboard template and get new template_id
                 template_id = extractor.template_manager.add_new_player(
@@ -252,10 +281,9 @@ def extract_players_from_scoreboard(image, config, overlay_name_binaries=None):
                         player_id=template_id
                     )
             players_data.append(player_data)
-        elif config.debug:
-            print(f"Skipping row {row_num} - missing valid level or gold or player name")
-    if config.debug:
-        print(f"###########################################################################################"+" player_extraction.py" + " - FINISHED")
+        else:
+            trace.log("Skipping row %s - missing valid level or gold or player name", row_num)
+    trace.finished("player_extraction.py")
     return players_data
 
 
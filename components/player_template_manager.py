@@ -1,9 +1,78 @@
 import cv2
+import numpy as np
 import os
 import json
+import threading
 from datetime import datetime
 import re
 
+TEMPLATE_KEYS = ["scoreboard_template_path", "overlay_template_path"]
+NAME_HASH_INDEX_MAX_ENTRIES = 4096
+
+def _normalize_rows(matrix):
+    """Mean-centre each row and scale it to unit length (all-constant rows become zero)."""
+    matrix = matrix.astype(np.float32)
+    matrix -= matrix.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    matrix[norms[:, 0] == 0] = 0.0
+    return matrix
+
+def _crop_hash_key(binary):
+    """Exact-match key for a binarized name crop: its shape plus the packed pixel bits."""
+    return binary.shape, np.packbits(binary > 0).tobytes()
+
+class PlayerTemplateStore:
+    """Keeps every player name template resident in memory as a ready-to-match binary array."""
+    def __init__(self, convert_to_binary):
+        self._convert_to_binary = convert_to_binary
+        self.templates = {}  # template_path -> binary template
+        self.hits = 0
+        self.misses = 0
+        self.version = 0  # bumped whenever the resident set changes
+
+    def load_all(self, players_db):
+        """Load every template referenced by the players database in one pass."""
+        self.templates = {}
+        for player_info in players_db.get("players", {}).values():
+            for key in TEMPLATE_KEYS:
+                template_path = player_info.get(key)
+                if template_path:
+                    self._load(template_path)
+
+    def _load(self, template_path):
+        if not os.path.exists(template_path):
+            return None
+        template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
+        if template is None:
+            return None
+        binary = self._convert_to_binary(template)
+        self.templates[template_path] = binary
+        self.version += 1
+        return binary
+
+    def get(self, template_path):
+        """Return the binary template for a path, loading it from disk only if it is not resident."""
+        binary = self.templates.get(template_path)
+        if binary is not None:
+            self.hits += 1
+            return binary
+        self.misses += 1
+        return self._load(template_path)
+
+    def put(self, template_path, binary):
+        """Register a template that was just written to disk."""
+        self.templates[template_path] = binary
+        self.version += 1
+
+    def get_stats(self):
+        return {
+            "templates": len(self.templates),
+            "memory_bytes": sum(t.nbytes for t in self.templates.values()),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
 class PlayerTemplateManager:
     """Manages player name templates for fast recognition."""
     def __init__(self, templates_dir="assets/templates/players", players_db="assets/players_database.json"):
@@ -14,7 +83,12 @@ class PlayerTemplateManager:
         os.makedirs(self.overlay_templates_dir, exist_ok=True)
         self.players_db_path = players_db
         self.players_db = self._load_players_database()
-        self.templates_cache = {}
+        self.template_store = PlayerTemplateStore(self._convert_to_binary)
+        self.template_store.load_all(self.players_db)
+        self._template_matrices = {}  # crop shape -> (store version, player ids, paths, group starts, matrix)
+        self._name_hash_index = {}  # (shape, packed binary crop) -> (player_id, template_path)
+        self.hash_hits = 0
+        self.hash_misses = 0
         os.makedirs(templates_dir, exist_ok=True)
         os.makedirs(os.path.dirname(players_db), exist_ok=True)
 
@@ -42,36 +116,126 @@ class PlayerTemplateManager:
         _, binary = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
         return binary
 
-    def find_player_by_template(self, name_image, threshold=0.99):
-        name_image_binary = self._convert_to_binary(name_image)
-        best_match = None
-        best_confidence = 0.0
+    def find_player_by_template(self, name_image, threshold=0.99, pre_binarized=False):
+        return self.find_players_by_template([name_image], threshold, pre_binarized)[0]
+
+    def find_players_by_template(self, name_images, threshold=0.99, pre_binarized=False):
+        """Match several name crops against every known player at once.
+
+        Crops that are byte-identical to an already confirmed crop are resolved from the
+        hash index; only the misses go through correlation matching. Returns one entry per
+        crop: the best match (with its runner-up attached) if it reaches the threshold,
+        otherwise None. Pass pre_binarized=True when the crops are already binary.
+        """
+        results = [None] * len(name_images)
+        misses = []
+        for row_idx, name_image in enumerate(name_images):
+            if name_image is None or name_image.size == 0:
+                continue
+            name_image_binary = name_image if pre_binarized else self._convert_to_binary(name_image)
+            crop_key = _crop_hash_key(name_image_binary)
+            indexed = self._name_hash_index.get(crop_key)
+            if indexed is not None and indexed[0] in self.players_db["players"]:
+                self.hash_hits += 1
+                results[row_idx] = self._build_match(indexed[0], indexed[1], 1.0)
+                results[row_idx]["runner_up"] = None
+                continue
+            self.hash_misses += 1
+            misses.append((row_idx, name_image_binary, crop_key))
+
+        if misses:
+            batch_results = self._match_binaries([(row_idx, binary) for row_idx, binary, _ in misses], len(name_images))
+            for row_idx, _, crop_key in misses:
+                best_match = batch_results[row_idx]["best"]
+                if best_match and best_match["confidence"] >= threshold:
+                    best_match["runner_up"] = batch_results[row_idx]["runner_up"]
+                    results[row_idx] = best_match
+                    self._index_crop(crop_key, best_match["player_id"], best_match["template_path"])
+        return results
+
+    def _index_crop(self, crop_key, player_id, template_path):
+        if len(self._name_hash_index) >= NAME_HASH_INDEX_MAX_ENTRIES:
+            # Drop the oldest entry (dicts keep insertion order)
+            del self._name_hash_index[next(iter(self._name_hash_index))]
+        self._name_hash_index[crop_key] = (player_id, template_path)
+
+    def match_players_batch(self, name_images):
+        """Score all name crops against all player templates as one matrix correlation.
+
+        A single-position TM_CCOEFF_NORMED between equally sized images is the dot product
+        of the mean-centred, unit-norm images, so stacking every template into a matrix
+        turns the per-template loop into one matrix product per crop size.
+        """
+        binaries = [(row_idx, self._convert_to_binary(name_image)) for row_idx, name_image in enumerate(name_images)
+                    if name_image is not None and name_image.size > 0]
+        return self._match_binaries(binaries, len(name_images))
+
+    def _match_binaries(self, binaries, num_rows):
+        results = [{"best": None, "runner_up": None} for _ in range(num_rows)]
+        rows_by_shape = {}
+        for row_idx, name_image_binary in binaries:
+            rows_by_shape.setdefault(name_image_binary.shape, []).append((row_idx, name_image_binary))
+
+        for shape, rows in rows_by_shape.items():
+            player_ids, template_paths, group_starts, template_matrix = self._get_template_matrix(shape)
+            if template_matrix is None:
+                continue
+            queries = _normalize_rows(np.stack([binary.reshape(-1) for _, binary in rows]))
+            scores = queries @ template_matrix.T
+            # Best template per player (scoreboard and overlay templates are adjacent columns)
+            player_scores = np.maximum.reduceat(scores, group_starts, axis=1)
+            best_template = np.argmax(scores, axis=1)
+            for query_idx, (row_idx, _) in enumerate(rows):
+                row_scores = player_scores[query_idx]
+                order = np.argsort(-row_scores, kind="stable")[:2]
+                if row_scores[order[0]] <= 0.0:
+                    continue
+                template_idx = best_template[query_idx]
+                results[row_idx]["best"] = self._build_match(player_ids[template_idx], template_paths[template_idx], float(scores[query_idx, template_idx]))
+                if len(order) > 1 and row_scores[order[1]] > 0.0:
+                    runner_up_id = player_ids[group_starts[order[1]]]
+                    results[row_idx]["runner_up"] = {
+                        "player_id": runner_up_id,
+                        "player_name": self.players_db["players"][runner_up_id].get("name", f"Player_{runner_up_id}"),
+                        "confidence": float(row_scores[order[1]])
+                    }
+        return results
+
+    def _build_match(self, player_id, template_path, confidence):
+        player_info = self.players_db["players"].get(player_id, {})
+        return {
+            "player_id": player_id,
+            "player_name": player_info.get("name", f"Player_{player_id}"),
+            "template_path": template_path,
+            "confidence": confidence
+        }
+
+    def _get_template_matrix(self, shape):
+        """Return the stacked, normalized template matrix for a crop size, rebuilding it when templates change."""
+        cached = self._template_matrices.get(shape)
+        if cached is not None and cached[0] == self.template_store.version:
+            return cached[1:]
+        player_ids, template_paths, group_starts, rows = [], [], [], []
         for player_id, player_info in self.players_db["players"].items():
-            for key in ["scoreboard_template_path", "overlay_template_path"]:
+            group_start = len(rows)
+            for key in TEMPLATE_KEYS:
                 template_path = player_info.get(key)
-                if not template_path or not os.path.exists(template_path):
+                if not template_path:
                     continue
-                template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
-                if template is None:
+                template_binary = self.template_store.get(template_path)
+                if template_binary is None:
                     continue
-                template_binary = self._convert_to_binary(template)
-                if template_binary.shape != name_image_binary.shape:
-                    template_resized = cv2.resize(template_binary, (name_image_binary.shape[1], name_image_binary.shape[0]))
-                else:
-                    template_resized = template_binary
-                result = cv2.matchTemplate(name_image_binary, template_resized, cv2.TM_CCOEFF_NORMED)
-                _, max_val, _, _ = cv2.minMaxLoc(result)
-                if max_val > best_confidence:
-                    best_confidence = max_val
-                    best_match = {
-                        "player_id": player_id,
-                        "player_name": player_info.get("name", f"Player_{player_id}"),
-                        "template_path": template_path,
-                        "confidence": max_val
-                    }
-        if best_match and best_confidence >= threshold:
-            return best_match
-        return None
+                if template_binary.shape != shape:
+                    template_binary = cv2.resize(template_binary, (shape[1], shape[0]))
+                player_ids.append(player_id)
+                template_paths.append(template_path)
+                rows.append(template_binary.reshape(-1))
+            if len(rows) > group_start:
+                group_starts.append(group_start)
+        template_matrix = _normalize_rows(np.stack(rows)) if rows else None
+        entry = (player_ids, template_paths, np.array(group_starts, dtype=np.intp), template_matrix)
+        self._template_matrices[shape] = (self.template_store.version,) + entry
+        return entry
 
     def add_new_player(self, player_name_crop, player_name, template_type="scoreboard", player_id=None):
         # If player_id is provided, use it; otherwise, assign a new one
@@ -102,10 +266,32 @@ class PlayerTemplateManager:
             print(f"Warning: Failed to write template image for {player_name} to {template_path}")
         else:
             print(f"Template image written: {template_path}")
+            self.template_store.put(template_path, player_name_crop_binary)
+            self._index_crop(_crop_hash_key(player_name_crop_binary), str(template_id), template_path)
         self.players_db["players"][str(template_id)][template_key] = template_path
         self.players_db["players"][str(template_id)]["template_id"] = template_id
         self._save_players_database()
         return template_id
 
     def get_all_players(self):
-        return [(info.get("name", f"Player_{player_id}"), int(player_id)) for player_id, info in self.players_db["players"].items()] 
\ No newline at end of file
+        return [(info.get("name", f"Player_{player_id}"), int(player_id)) for player_id, info in self.players_db["players"].items()] 
+
+    def get_template_store_stats(self):
+        stats = self.template_store.get_stats()
+        stats.update({
+            "hash_entries": len(self._name_hash_index),
+            "hash_hits": self.hash_hits,
+            "hash_misses": self.hash_misses
+        })
+        return stats
+
+_shared_template_manager = None
+_shared_template_manager_lock = threading.Lock()
+
+def get_shared_template_manager():
+    """Return the process-wide template manager (its resident store survives across frames), creating it on first use."""
+    global _shared_template_manager
+    with _shared_template_manager_lock:
+        if _shared_template_manager is None:
+            _shared_template_manager = PlayerTemplateManager()
+        return _shared_template_manager
@@ -5,11 +5,14 @@ import sys
 
 from components.utils import get_row_boundaries, AnalysisConfig, load_and_preprocess_image, get_header_positions
 from components.shared_digit_detector import shared_detector
+from components.layout_plan import COLUMN_REGION_WIDTH, COLUMN_REGION_HEIGHT
+from components.debug_trace import DebugTrace
 
 class RecordExtractor:
     """Extracts record values from scoreboard rows."""
     def __init__(self, debug=False):
         self.debug = debug
+        self.trace = DebugTrace(debug)
 
     def extract_record_region(self, image, row_y, record_column_x):
         record_width = 100  # Width of record display area
@@ -21,48 +24,66 @@ class RecordExtractor:
         record_region = image[record_y_start:record_y_end, record_x_start:record_x_end]
         return record_region
 
-    def extract_record_value(self, image, row_y, record_column_x):
-        record_region = self.extract_record_region(image, row_y, record_column_x)
+    def extract_record_value(self, image, row_y, record_column_x, roi=None, binary_image=None):
+        # Read from the frame's shared 127-threshold binary when one is given
+        source = binary_image if binary_image is not None else image
+        record_region = source[roi] if roi is not None else self.extract_record_region(source, row_y, record_column_x)
         if record_region.size == 0:
             return {"wins": 0, "losses": 0}
-        matches = shared_detector.find_digits_and_separator(record_region)
+        matches = shared_detector.recognize_digits(record_region, 'record', confidence_threshold=0.95, region_is_binary=binary_image is not None)
+        return self._record_from_matches(matches)
+
+    def extract_record_values(self, image, row_boundaries, record_column_x, binary_image=None):
+        """Extract the record of every row from one column strip (see SharedDigitDetector.read_column_strip)."""
+        source = binary_image if binary_image is not None else image
+        strip_top = row_boundaries[0]
+        strip = source[strip_top:row_boundaries[-1] + COLUMN_REGION_HEIGHT, record_column_x:record_column_x + COLUMN_REGION_WIDTH]
+        band_starts = [row_y - strip_top for row_y in row_boundaries]
+        band_matches = shared_detector.read_column_strip(strip, band_starts, COLUMN_REGION_HEIGHT, 'record', confidence_threshold=0.95, region_is_binary=binary_image is not None)
+        return [self._record_from_matches(matches) for matches in band_matches]
+
+    def _record_from_matches(self, matches):
         if matches:
             record_result = shared_detector.reconstruct_record_from_matches(matches)
             if record_result:
-                if self.debug:
-                    print(f"Found record: {record_result['wins']}-{record_result['losses']} (confidence: {record_result['confidence']:.3f}, matches: {record_result['total_matches']})")
+                self.trace.log("Found record: %s-%s (confidence: %.3f, matches: %s)", record_result['wins'], record_result['losses'], record_result['confidence'], record_result['total_matches'])
                 return {"wins": record_result['wins'], "losses": record_result['losses']}
         return {"wins": 0, "losses": 0}
 
-def extract_record_from_scoreboard(image, record_column_x, config):
-    """Extract record data for all rows in the scoreboard."""
-    if config.debug:
-        print(f"########################################################################################### record_extraction.py - STARTED ")
+def extract_record_from_scoreboard(image, record_column_x, config, layout=None, frame_ctx=None, rows=None):
+    """Extract record data for all rows in the scoreboard (or only the row numbers in `rows`)."""
+    extractor = RecordExtractor(debug=config.debug)
+    trace = extractor.trace
+    trace.started("record_extraction.py")
+    if trace.enabled:
         record_templates = shared_detector.get_digit_templates('record')
         separator_template = shared_detector.get_separator_template()
         print(f"Record templates loaded: {len(record_templates)} digits, separator: {separator_template is not None}")
         if record_templates:
             print(f"Available record digits: {list(record_templates.keys())}")
     if record_column_x is None:
-        if config.debug:
-            print("Record column not detected, returning empty data")
+        trace.log("Record column not detected, returning empty data")
         return []
-    extractor = RecordExtractor(debug=config.debug)
     record_data = []
-    row_boundaries = get_row_boundaries()
-    for row_num, row_y in enumerate(row_boundaries):
-        if config.debug:
-            print(f"\n--- Extracting Record for Row {row_num} ---")
-        record_value = extractor.extract_record_value(image, row_y, record_column_x)
+    row_boundaries = layout.row_boundaries if layout is not None else get_row_boundaries()
+    row_numbers = list(range(len(row_boundaries))) if rows is None else sorted(rows)
+    rois = layout.column_rois.get("RECORD") if layout is not None else None
+    binary_image = frame_ctx.binary(127) if frame_ctx is not None else None
+    if not row_numbers:
+        return []
+    if getattr(config, 'column_strip', False):
+        record_values = extractor.extract_record_values(image, [row_boundaries[row_num] for row_num in row_numbers], record_column_x, binary_image=binary_image)
+    else:
+        record_values = [extractor.extract_record_value(image, row_boundaries[row_num], record_column_x, roi=rois[row_num] if rois else None, binary_image=binary_image)
+                         for row_num in row_numbers]
+    for row_num, record_value in zip(row_numbers, record_values):
         record_data.append({
             "row": row_num,
             "wins": record_value["wins"],
             "losses": record_value["losses"]
         })
-        if config.debug:
-            print(f"Row {row_num}: Record = {record_value['wins']}-{record_value['losses']}")
-    if config.debug:
-        print(f"########################################################################################### record_extraction.py - FINISHED")
+        trace.log("Row %s: Record = %s-%s", row_num, record_value['wins'], record_value['losses'])
+    trace.finished("record_extraction.py")
     return record_data
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+from components.utils import region_fingerprint
+from components.player_extraction import PLAYER_IMAGE_X_START, PLAYER_IMAGE_X_END, PLAYER_ROW_HEIGHT
+
+# Per-row result fields, in the order the scoreboard extraction stages produce them
+ROW_FIELDS = ("player", "health", "record", "networth", "crew", "bench")
+COLUMN_FIELDS = {"health": "HEALTH", "record": "RECORD", "networth": "NETWORTH"}
+
+
+class RowIdentityCache:
+    """
+    Remembers the per-row scoreboard results of the last frame, keyed by row identity.
+
+    A row's identity is a fingerprint of its name and portrait pixels, so when the
+    scoreboard re-sorts, a player's previous results are found again at its new row.
+    Every field (level/gold, health, record, networth, crew, bench) also has a fingerprint
+    of its own pixels. A field is reused when it is unchanged, and re-extracted otherwise.
+    Fingerprints hash pixel content only, not position, so a moved row still matches.
+    """
+    def __init__(self):
+        self.header_positions = None
+        self.rows = []  # per row of the last frame: {"identity", "fields": {field: fingerprint}, "results": {field: result}}
+        self.permuted = 0
+        self.reused = 0
+        self.extracted = 0
+
+    def fingerprint_rows(self, image, layout):
+        """Identity and per-field fingerprints of every row of the frame."""
+        crew_slots = layout.crew_slots.slots_by_row if layout.crew_slots is not None else {}
+        bench_slots = layout.bench_slots.slots_by_row if layout.bench_slots is not None else {}
+        rows = []
+        for row_num, row_y in enumerate(layout.row_boundaries):
+            player_rois = layout.player_rois[row_num]
+            portrait = image[row_y:row_y + PLAYER_ROW_HEIGHT, PLAYER_IMAGE_X_START:PLAYER_IMAGE_X_END]
+            fields = {"player": region_fingerprint(image[player_rois["level"]], image[player_rois["gold"]])}
+            for field, header in COLUMN_FIELDS.items():
+                rois = layout.column_rois.get(header)
+                fields[field] = region_fingerprint(image[rois[row_num]]) if rois else None
+            for field, slots_by_row in (("crew", crew_slots), ("bench", bench_slots)):
+                slots = slots_by_row.get(row_num, [])
+                fields[field] = region_fingerprint(*[image[roi] for slot in slots for roi in (slot['slice'], slot['star_slice'])]) if slots else None
+            rows.append({"identity": region_fingerprint(image[player_rois["name"]], portrait), "fields": fields})
+        return rows
+
+    def plan(self, rows, header_positions):
+        """
+        Match the frame's rows to the last frame's by identity.
+
+        Returns (reused, pending): reused[row_num] holds the results that can be carried
+        over, remapped to the new row; pending[field] lists the rows to re-extract for that field.
+        """
+        self.permuted = self.reused = self.extracted = 0
+        if header_positions != self.header_positions:
+            # Column positions moved: results cached against the old layout are not comparable
+            self.rows = []
+            self.header_positions = dict(header_positions)
+        previous = {entry["identity"]: (row_num, entry) for row_num, entry in enumerate(self.rows)}
+        reused = {}
+        pending = {field: [] for field in ROW_FIELDS}
+        for row_num, row in enumerate(rows):
+            match = previous.get(row["identity"])
+            if match is not None and match[0] != row_num:
+                self.permuted += 1
+            reused[row_num] = {}
+            for field in ROW_FIELDS:
+                if match is not None and match[1]["fields"][field] == row["fields"][field]:
+                    reused[row_num][field] = _remap(field, match[1]["results"][field], row_num)
+                    self.reused += 1
+                else:
+                    pending[field].append(row_num)
+                    self.extracted += 1
+        return reused, pending
+
+    def store(self, rows, results_by_row):
+        """Remember this frame's fingerprints with the complete results of every row."""
+        self.rows = [{"identity": row["identity"], "fields": row["fields"], "results": results_by_row[row_num]} for row_num, row in enumerate(rows)]
+
+    def clear(self):
+        """Forget every row, so the next frame is extracted in full."""
+        self.rows = []
+
+    def get_frame_stats(self):
+        return {"permuted_rows": self.permuted, "reused_fields": self.reused, "extracted_fields": self.extracted}
+
+
+def _remap(field, result, row_num):
+    """Copy a cached per-row result so that it refers to its new row."""
+    if result is None:
+        return None
+    if field in ("crew", "bench"):
+        return [dict(slot) for slot in result]
+    result = dict(result)
+    if field == "player":
+        result["playerRow"] = row_num
+        # Templates are only created the first time a name is read
+        result["_should_create_template"] = False
+    else:
+        result["row"] = row_num
+    return result
@@ -0,0 +1,121 @@
+import json
+import os
+import queue
+import threading
+import zipfile
+import cv2
+
+INDEX_FILE = "index.jsonl"
+
+
+class SessionRecorder:
+    """
+    Records captured frames to a session directory for later replay (see RecordedSessionSource).
+
+    Frames are PNG-encoded on a background thread into rolling zip chunks of frames_per_chunk
+    frames. When a chunk is closed its frames are appended to index.jsonl as
+    {"timestamp", "chunk", "path"} entries, so the index only ever lists complete chunks.
+    Once the chunks exceed max_bytes the oldest ones are deleted and the index is rewritten.
+    record() never blocks: frames arriving while the encoder is behind are dropped and counted.
+    """
+    def __init__(self, session_dir, frames_per_chunk=100, max_bytes=2 * 1024 ** 3, queue_size=8, png_compression=1):
+        self.session_dir = session_dir
+        self.frames_per_chunk = frames_per_chunk
+        self.max_bytes = max_bytes
+        self.png_compression = png_compression
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._chunks = []  # (chunk name, size in bytes, index entries) of the closed chunks, oldest first
+        self._chunk_id = 0
+        self._zip = None
+        self._chunk_name = None
+        self._entries = []
+        self.recorded = 0
+        self.dropped = 0
+        self.deleted_chunks = 0
+
+    def start(self):
+        os.makedirs(self.session_dir, exist_ok=True)
+        # A new recording replaces whatever index was in the directory
+        open(os.path.join(self.session_dir, INDEX_FILE), "w", encoding="utf-8").close()
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+        return self
+
+    def record(self, timestamp, frame):
+        """Queue a frame for encoding; returns False if it was dropped because the encoder is behind."""
+        try:
+            self._queue.put_nowait((timestamp, frame))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def stop(self):
+        """Encode the frames still queued, close the last chunk and stop the encoder thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            self._write_frame(*item)
+        self._close_chunk()
+
+    def _write_frame(self, timestamp, frame):
+        ok, encoded = cv2.imencode(".png", frame, [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression])
+        if not ok:
+            print(f"Could not encode frame at {timestamp:.3f}")
+            return
+        if self._zip is None:
+            self._chunk_name = f"chunk_{self._chunk_id:05d}.zip"
+            self._chunk_id += 1
+            # PNG data is already compressed, so the zip only stores it
+            self._zip = zipfile.ZipFile(os.path.join(self.session_dir, self._chunk_name), "w", zipfile.ZIP_STORED)
+        name = f"{self.recorded:06d}.png"
+        self._zip.writestr(name, encoded.tobytes())
+        self._entries.append({"timestamp": timestamp, "chunk": self._chunk_name, "path": name})
+        self.recorded += 1
+        if len(self._entries) >= self.frames_per_chunk:
+            self._close_chunk()
+
+    def _close_chunk(self):
+        if self._zip is None:
+            return
+        self._zip.close()
+        self._zip = None
+        size = os.path.getsize(os.path.join(self.session_dir, self._chunk_name))
+        self._chunks.append((self._chunk_name, size, self._entries))
+        with open(os.path.join(self.session_dir, INDEX_FILE), "a", encoding="utf-8") as f:
+            for entry in self._entries:
+                f.write(json.dumps(entry) + "\n")
+        self._entries = []
+        self._enforce_size_cap()
+
+    def _enforce_size_cap(self):
+        total = sum(size for _, size, _ in self._chunks)
+        if total <= self.max_bytes or len(self._chunks) <= 1:
+            return
+        while total > self.max_bytes and len(self._chunks) > 1:
+            name, size, _ = self._chunks.pop(0)
+            os.remove(os.path.join(self.session_dir, name))
+            total -= size
+            self.deleted_chunks += 1
+        with open(os.path.join(self.session_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+            for _, _, entries in self._chunks:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+
+    def get_stats(self):
+        return {
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "chunks": len(self._chunks),
+            "bytes": sum(size for _, size, _ in self._chunks),
+            "deleted_chunks": self.deleted_chunks,
+        }
@@ -0,0 +1,77 @@
+import cv2
+
+from components.utils import get_row_boundaries, HEADER_Y_START
+from components.frame_gate import SCOREBOARD_ROW_HEIGHT
+
+# The header strip and every row band, as one (row_slice, column_slice) ROI of the grayscale frame
+SETTLE_ROI = (slice(HEADER_Y_START, get_row_boundaries()[-1] + SCOREBOARD_ROW_HEIGHT), slice(None))
+
+SETTLE_DOWNSAMPLE = 4
+SETTLE_ENERGY = 1.0  # mean gray difference per downsampled pixel between consecutive frames that still counts as still
+SETTLE_FRAMES = 2  # consecutive still frames after which the screen is settled
+
+
+class SettleDetector:
+    """
+    Tells when the scoreboard has finished opening (or closing).
+
+    Every frame, the header strip and row bands are reduced to an area-averaged thumbnail
+    and compared with the previous frame's. The mean difference is the frame's motion energy.
+    When the scoreboard opens or closes, a transition starts. The screen is settled once
+    SETTLE_FRAMES consecutive frames stay below SETTLE_ENERGY. Each completed transition
+    records how long it took to settle, in seconds and in frames.
+    """
+    def __init__(self, downsample=SETTLE_DOWNSAMPLE, energy_threshold=SETTLE_ENERGY, settle_frames=SETTLE_FRAMES):
+        self.downsample = downsample
+        self.energy_threshold = energy_threshold
+        self.settle_frames = settle_frames
+        self._previous = None
+        self.energy = None
+        self.state = None  # "open" or "closed": the screen the detector is settling on
+        self.settled = False
+        self.still_frames = 0
+        self._started_at = None
+        self._frames = 0
+        self.transitions = {"open": [], "close": []}  # (seconds, frames) of every completed transition
+
+    def update(self, gray, scoreboard_open, timestamp):
+        """Feed one frame; returns True while the screen is settled."""
+        region = gray[SETTLE_ROI]
+        height, width = region.shape[:2]
+        thumbnail = cv2.resize(region, (max(1, width // self.downsample), max(1, height // self.downsample)), interpolation=cv2.INTER_AREA)
+        previous = self._previous
+        self._previous = thumbnail
+        self.energy = cv2.absdiff(previous, thumbnail).mean() if previous is not None and previous.shape == thumbnail.shape else None
+        state = "open" if scoreboard_open else "closed"
+        if state != self.state:
+            # The first frame only sets the initial state; it is not a transition
+            self._started_at = timestamp if self.state is not None else None
+            self.state = state
+            self.settled = False
+            self.still_frames = 0
+            self._frames = 0
+        self._frames += 1
+        if self.settled:
+            return True
+        if self.energy is not None and self.energy <= self.energy_threshold:
+            self.still_frames += 1
+        else:
+            self.still_frames = 0
+        if self.still_frames >= self.settle_frames:
+            self.settled = True
+            if self._started_at is not None:
+                self.transitions["open" if state == "open" else "close"].append((timestamp - self._started_at, self._frames))
+        return self.settled
+
+    def get_stats(self):
+        stats = {}
+        for kind, transitions in self.transitions.items():
+            seconds = [elapsed for elapsed, _ in transitions]
+            frames = [count for _, count in transitions]
+            stats[kind] = {
+                "transitions": len(transitions),
+                "mean_seconds": sum(seconds) / len(seconds) if seconds else 0.0,
+                "max_seconds": max(seconds) if seconds else 0.0,
+                "mean_frames": sum(frames) / len(frames) if frames else 0.0,
+            }
+        return stats
@@ -3,14 +3,84 @@ import numpy as np
 import os
 import glob
 import re
+import threading
+from collections import OrderedDict
+
+from components.utils import region_fingerprint
+
+# Default bound of the digit memo (entries, one per distinct region content and template type)
+DIGIT_MEMO_MAX_ENTRIES = 1024
+
+# One row per template hit: template index, top-left position, score and template size
+MATCH_DTYPE = np.dtype([
+    ('template', np.int32),
+    ('x', np.intp),
+    ('y', np.intp),
+    ('confidence', np.float32),
+    ('width', np.int32),
+    ('height', np.int32),
+])
+
+class DigitMemo:
+    """Bounded LRU cache of digit reads keyed by the binarized region bytes.
+    
+    Scoreboard numbers change a few times per round, so most regions are byte-identical
+    to one seen recently. Lookups return a fresh list so callers that sort in place
+    (reconstruct_record_from_matches) cannot corrupt the cached entry. Safe to share
+    between the extraction threads.
+    """
+    
+    def __init__(self, max_entries=DIGIT_MEMO_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def key(self, region_binary, template_type, confidence_threshold):
+        return (template_type, confidence_threshold, region_fingerprint(region_binary))
+    
+    def get(self, key):
+        with self._lock:
+            matches = self._entries.get(key)
+            if matches is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(matches)
+    
+    def put(self, key, matches):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = list(matches)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
 
 class SharedDigitDetector:
     """Shared digit detector that uses template matching for all extraction types."""
     
-    def __init__(self, templates_dir="assets/templates/digits"):
+    def __init__(self, templates_dir="assets/templates/digits", memo_size=DIGIT_MEMO_MAX_ENTRIES):
         self.templates_dir = templates_dir
+        self.memo = DigitMemo(memo_size)
         self._templates_cache = {}
         self._load_all_templates()
+        self._glyph_tables = {template_type: self._build_glyph_table(templates) for template_type, templates in self._templates_cache.items()}
+        self.glyph_reads = 0      # regions read entirely from the glyph hash tables
+        self.glyph_fallbacks = 0  # regions that contained an unknown glyph and were template matched
+        self._stats_lock = threading.Lock()
     
     def _load_all_templates(self):
         """Load all digit templates and cache them."""
@@ -58,6 +128,37 @@ class SharedDigitDetector:
         _, binary = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
         return binary
     
+    def _build_glyph_table(self, templates):
+        """Index every template by its trimmed, bit-packed glyph.
+        
+        The fonts are fixed, so after binarization an on-screen glyph is bit-identical to
+        its template. Each entry keeps the glyph's offset inside the template so a hit can
+        be reported at the same position template matching would give. Glyphs shared by
+        two templates are left out, which sends them to the template-matching fallback.
+        """
+        table = {}
+        ambiguous = set()
+        for key, template in templates.items():
+            glyph_key, x_offset, y_offset = _glyph_key(template > 0)
+            if glyph_key is None:
+                continue
+            if glyph_key in table:
+                ambiguous.add(glyph_key)
+            table[glyph_key] = (key, x_offset, y_offset, template.shape[1], template.shape[0])
+        for glyph_key in ambiguous:
+            del table[glyph_key]
+        return table
+    
+    def _count_glyph_read(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.glyph_reads += 1
+            else:
+                self.glyph_fallbacks += 1
+    
+    def get_glyph_stats(self):
+        return {"glyph_reads": self.glyph_reads, "glyph_fallbacks": self.glyph_fallbacks}
+    
     def get_digit_templates(self, template_type):
         """Get digit templates for a specific extraction type."""
         return self._templates_cache.get(template_type, {})
@@ -66,8 +167,12 @@ class SharedDigitDetector:
         """Get the record separator template from the record templates."""
         return self._templates_cache['record'].get('separator')
     
-    def find_all_digit_matches(self, region, template_type, confidence_threshold=0.97):
-        """Find all digit matches in a region using template matching (no sliding)."""
+    def find_all_digit_matches(self, region, template_type, confidence_threshold=0.97, region_is_binary=False):
+        """Find all digit matches in a region using template matching (no sliding).
+
+        Pass region_is_binary=True when the region is already a 127-threshold binary
+        (e.g. a crop of FrameContext.binary(127)) to skip the conversion.
+        """
         if region.size == 0:
             return []
         
@@ -76,120 +181,301 @@ class SharedDigitDetector:
         if not templates:
             return []
         
-        region_binary = self._convert_to_binary(region)
-        all_matches = []
-        
-        # For each digit template, find all matches above threshold
-        for digit_value, template in templates.items():
-            # Perform template matching on entire region
-            result = cv2.matchTemplate(region_binary, template, cv2.TM_CCOEFF_NORMED)
-            
-            # Find all locations where matching is above threshold
-            locations = np.where(result >= confidence_threshold)
-            
-            # Convert to list of matches
-            for y, x in zip(locations[0], locations[1]):
-                confidence = result[y, x]
+        region_binary = region if region_is_binary else self._convert_to_binary(region)
+        keys, template_list, has_separator = self._template_list(template_type, with_separator=False)
+        results = self._match_results(region_binary, template_list)
+        return self._matches_from_results(results, keys, template_list, has_separator, confidence_threshold)
+    
+    def _template_list(self, template_type, with_separator):
+        """Keys and templates of a type as parallel lists, optionally followed by the record separator."""
+        templates = self.get_digit_templates(template_type)
+        keys = list(templates.keys())
+        template_list = list(templates.values())
+        separator_template = self.get_separator_template() if with_separator else None
+        if separator_template is not None:
+            keys.append('separator')
+            template_list.append(separator_template)
+        return keys, template_list, separator_template is not None
+    
+    def _match_results(self, region_binary, templates):
+        """TM_CCOEFF_NORMED map per template (None when it does not fit); a template listed twice is matched once."""
+        by_id = {}
+        results = []
+        for template in templates:
+            if id(template) not in by_id:
                 template_height, template_width = template.shape
-                
-                all_matches.append({
-                    'digit': digit_value,
-                    'x_position': x,
-                    'y_position': y,
-                    'confidence': confidence,
-                    'width': template_width,
-                    'height': template_height
-                })
-        
-        # Remove overlapping matches (non-maximum suppression)
-        filtered_matches = self._remove_overlapping_matches(all_matches)
-        
-        # Sort by x-position (left to right)
-        filtered_matches.sort(key=lambda x: x['x_position'])
+                fits = template_height <= region_binary.shape[0] and template_width <= region_binary.shape[1]
+                by_id[id(template)] = cv2.matchTemplate(region_binary, template, cv2.TM_CCOEFF_NORMED) if fits else None
+            results.append(by_id[id(template)])
+        return results
+    
+    def _matches_from_results(self, results, keys, templates, has_separator, confidence_threshold):
+        """Turn per-template match maps into the suppressed, left-to-right match dicts.
         
-        return filtered_matches
+        Digits are suppressed first; with a separator, its hits then join the kept digits
+        (which keep precedence on equal confidence) for a second suppression pass.
+        """
+        num_digits = len(templates) - 1 if has_separator else len(templates)
+        candidates = self._collect_candidates(results[:num_digits], templates[:num_digits], confidence_threshold)
+        # Remove overlapping matches (non-maximum suppression), then sort left to right
+        digits = self._suppress_overlaps(candidates[self._confidence_order(candidates, candidates['template'], candidates['y'], candidates['x'])])
+        if not has_separator:
+            return self._to_match_dicts(digits, keys)
+        separators = self._collect_candidates(results[num_digits:], templates[num_digits:], confidence_threshold, template_offset=num_digits)
+        separators = separators[np.lexsort((separators['x'], separators['y']))]
+        combined = np.concatenate([digits, separators])
+        filtered = self._suppress_overlaps(combined[self._confidence_order(combined, np.arange(combined.size))])
+        return self._to_match_dicts(filtered, keys)
     
-    def _remove_overlapping_matches(self, matches):
-        """Remove overlapping matches, keeping the one with highest confidence."""
-        if not matches:
-            return []
+    def _collect_candidates(self, results, templates, confidence_threshold, template_offset=0):
+        """Collect above-threshold template hits as one structured array.
         
-        # Sort by confidence (highest first)
-        matches.sort(key=lambda x: x['confidence'], reverse=True)
+        Two hits of the same template at the same x always overlap completely, so only
+        the best y of each (template, x) column can survive suppression; the column
+        maximum is taken up front (first y on ties, as the pixel scan did), which bounds
+        the candidate count by templates x positions however noisy the region is.
+        """
+        chunks = []
+        for template_idx, (result, template) in enumerate(zip(results, templates)):
+            if result is None or result.size == 0:
+                continue
+            template_height, template_width = template.shape
+            best_y = result.argmax(axis=0)
+            best = result[best_y, np.arange(result.shape[1])]
+            xs = np.flatnonzero(best >= confidence_threshold)
+            if xs.size == 0:
+                continue
+            chunk = np.empty(xs.size, dtype=MATCH_DTYPE)
+            chunk['template'] = template_offset + template_idx
+            chunk['x'] = xs
+            chunk['y'] = best_y[xs]
+            chunk['confidence'] = best[xs]
+            chunk['width'] = template_width
+            chunk['height'] = template_height
+            chunks.append(chunk)
+        if not chunks:
+            return np.empty(0, dtype=MATCH_DTYPE)
+        return np.concatenate(chunks)
+    
+    def _confidence_order(self, candidates, *tiebreak_keys):
+        """Indices sorting candidates by confidence (highest first), ties broken by the given keys in order."""
+        return np.lexsort(tuple(reversed(tiebreak_keys)) + (-candidates['confidence'],))
+    
+    def _suppress_overlaps(self, candidates):
+        """Greedy non-maximum suppression along x over candidates already in priority order.
         
-        filtered = []
-        for match in matches:
-            # Check if this match overlaps with any already selected match
-            overlaps = False
-            for selected in filtered:
-                if self._matches_overlap(match, selected):
-                    overlaps = True
-                    break
-            
-            if not overlaps:
-                filtered.append(match)
+        A candidate is dropped when more than 50% of the smaller width overlaps a kept
+        one. Each kept candidate suppresses the rest in one vectorized step, so the loop
+        runs once per kept digit rather than once per pair. Returns the kept candidates
+        sorted by x-position.
+        """
+        if candidates.size == 0:
+            return candidates
+        x_start = candidates['x']
+        x_end = x_start + candidates['width']
+        width = candidates['width']
+        alive = np.ones(candidates.size, dtype=bool)
+        kept = []
+        idx = 0
+        while True:
+            kept.append(idx)
+            overlap = np.maximum(0, np.minimum(x_end[idx], x_end) - np.maximum(x_start[idx], x_start))
+            alive &= ~(overlap / np.minimum(width[idx], width) > 0.5)
+            remaining = np.flatnonzero(alive[idx + 1:])
+            if remaining.size == 0:
+                break
+            idx += 1 + remaining[0]
+        kept = candidates[kept]
+        return kept[np.argsort(kept['x'], kind='stable')]
+    
+    def _to_match_dicts(self, candidates, keys):
+        return [{
+            'digit': keys[candidate['template']],
+            'x_position': candidate['x'],
+            'y_position': candidate['y'],
+            'confidence': candidate['confidence'],
+            'width': int(candidate['width']),
+            'height': int(candidate['height'])
+        } for candidate in candidates]
+    
+    def recognize_digits(self, region, template_type, confidence_threshold=0.97, region_is_binary=False):
+        """Read the digits in a region glyph by glyph, falling back to template matching.
         
-        return filtered
+        The region is split into glyphs at empty columns and each glyph is looked up in
+        the hash table for this template type, so a read costs O(glyphs). If any glyph is
+        unknown (touching glyphs, noise, a partial glyph at the border...) the whole
+        region goes through find_all_digit_matches, or find_digits_and_separator for
+        'record'. Returns matches in the same format as find_all_digit_matches, with a
+        confidence of 1.0 for hash hits.
+        """
+        if region.size == 0:
+            return []
+        region_binary = region if region_is_binary else self._convert_to_binary(region)
+        memo_key = self.memo.key(region_binary, template_type, confidence_threshold)
+        matches = self.memo.get(memo_key)
+        if matches is not None:
+            return matches
+        matches = self._match_glyphs(region_binary, template_type)
+        if matches is not None:
+            self._count_glyph_read(True)
+        else:
+            self._count_glyph_read(False)
+            if template_type == 'record':
+                matches = self.find_digits_and_separator(region_binary, confidence_threshold, region_is_binary=True)
+            else:
+                matches = self.find_all_digit_matches(region_binary, template_type, confidence_threshold, region_is_binary=True)
+        self.memo.put(memo_key, matches)
+        return matches
+    
+    def _match_glyphs(self, region_binary, template_type):
+        """Look up every glyph of a binary region; None as soon as one is unknown."""
+        table = self._glyph_tables.get(template_type)
+        if not table:
+            return None
+        ink = region_binary > 0
+        columns = np.concatenate(([False], ink.any(axis=0), [False]))
+        edges = np.flatnonzero(columns[1:] != columns[:-1])
+        matches = []
+        for run_start, run_end in zip(edges[::2], edges[1::2]):
+            glyph_key, _, top = _glyph_key(ink[:, run_start:run_end])
+            entry = table.get(glyph_key)
+            if entry is None:
+                return None
+            digit, x_offset, y_offset, template_width, template_height = entry
+            matches.append({
+                'digit': digit,
+                'x_position': run_start - x_offset,
+                'y_position': top - y_offset,
+                'confidence': 1.0,
+                'width': template_width,
+                'height': template_height
+            })
+        return matches
     
-    def _matches_overlap(self, match1, match2):
-        """Check if two matches overlap significantly."""
-        # Calculate overlap in x-direction
-        x1_start, x1_end = match1['x_position'], match1['x_position'] + match1['width']
-        x2_start, x2_end = match2['x_position'], match2['x_position'] + match2['width']
+    def _score_full_height_templates(self, bands, templates):
+        """TM_CCOEFF_NORMED of templates as tall as the bands, for every band in one matrix product.
         
-        # Calculate overlap
-        overlap_start = max(x1_start, x2_start)
-        overlap_end = min(x1_end, x2_end)
-        overlap_width = max(0, overlap_end - overlap_start)
+        A template as tall as the band only slides along x, so every window of every band
+        becomes one row of a (bands x positions, pixels) matrix and all templates are
+        scored with a single product against their mean-centred pixels (zero-padded to
+        the widest template). Window means and norms come from cumulative column sums.
+        Zero-variance windows follow OpenCV's rule. Returns, per band, one (1, positions)
+        map per template, as cv2.matchTemplate would.
+        """
+        num_bands, band_height, band_width = bands.shape
+        widths = [template.shape[1] for template in templates]
+        max_width = max(widths)
+        centred = np.zeros((len(templates), band_height, max_width), dtype=np.float32)
+        template_norms = np.empty(len(templates))
+        for template_idx, template in enumerate(templates):
+            template_float = template.astype(np.float64) / 255
+            template_centred = template_float - template_float.mean()
+            centred[template_idx, :, :template.shape[1]] = template_centred
+            template_norms[template_idx] = np.sqrt((template_centred ** 2).sum())
         
-        # Consider overlapping if more than 50% of smaller width overlaps
-        min_width = min(match1['width'], match2['width'])
-        overlap_ratio = overlap_width / min_width
+        pixels = (bands > 0).astype(np.float32)
+        padded = np.zeros((num_bands, band_height, band_width + max_width - 1), dtype=np.float32)
+        padded[:, :, :band_width] = pixels
+        windows = np.lib.stride_tricks.sliding_window_view(padded, max_width, axis=2)
+        windows = np.ascontiguousarray(windows.transpose(0, 2, 1, 3)).reshape(num_bands * band_width, band_height * max_width)
+        numerators = (windows @ centred.reshape(len(templates), -1).T).reshape(num_bands, band_width, len(templates)).astype(np.float64)
         
-        return overlap_ratio > 0.5
+        # Binary pixels: the sum of squares equals the sum
+        column_sums = pixels.sum(axis=1, dtype=np.float64)
+        cumulative = np.concatenate((np.zeros((num_bands, 1)), np.cumsum(column_sums, axis=1)), axis=1)
+        scores = [[] for _ in range(num_bands)]
+        for template_idx, width in enumerate(widths):
+            if width > band_width:
+                for band_scores in scores:
+                    band_scores.append(None)
+                continue
+            window_sums = cumulative[:, width:] - cumulative[:, :-width]
+            window_norms = np.sqrt(np.maximum(window_sums - window_sums * window_sums / (band_height * width), 0)) * template_norms[template_idx]
+            numerator = numerators[:, :band_width - width + 1, template_idx]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = np.where(np.abs(numerator) < window_norms, numerator / window_norms,
+                                  np.where(np.abs(numerator) < window_norms * 1.125, np.sign(numerator), 0.0))
+            result = result.astype(np.float32)
+            for band_idx in range(num_bands):
+                scores[band_idx].append(result[band_idx:band_idx + 1])
+        return scores
     
-    def find_digits_by_sliding(self, number_region, template_type, confidence_threshold=0.95):
+    def find_digits_by_sliding(self, number_region, template_type, confidence_threshold=0.95, region_is_binary=False):
         """Find all digits in a region using optimized template matching (replaces sliding window)."""
-        return self.find_all_digit_matches(number_region, template_type, confidence_threshold)
+        return self.find_all_digit_matches(number_region, template_type, confidence_threshold, region_is_binary=region_is_binary)
     
-    def find_digits_and_separator(self, record_region, confidence_threshold=0.95):
+    def find_digits_and_separator(self, record_region, confidence_threshold=0.95, region_is_binary=False):
         """Find all digits and separator in a record region using optimized template matching."""
         if record_region.size == 0:
             return []
         
-        # Get digit matches
-        digit_matches = self.find_all_digit_matches(record_region, 'record', confidence_threshold)
-        
-        # Find separator match
-        separator_template = self.get_separator_template()
-        if separator_template is None:
-            return digit_matches
-        
-        region_binary = self._convert_to_binary(record_region)
-        
-        # Find separator
-        result = cv2.matchTemplate(region_binary, separator_template, cv2.TM_CCOEFF_NORMED)
-        locations = np.where(result >= confidence_threshold)
-        
-        # Add separator matches
-        for y, x in zip(locations[0], locations[1]):
-            confidence = result[y, x]
-            template_height, template_width = separator_template.shape
-            
-            digit_matches.append({
-                'digit': 'separator',
-                'x_position': x,
-                'y_position': y,
-                'confidence': confidence,
-                'width': template_width,
-                'height': template_height
-            })
+        # Binarize once and share it between the digit and separator passes
+        region_binary = record_region if region_is_binary else self._convert_to_binary(record_region)
+        keys, template_list, has_separator = self._template_list('record', with_separator=True)
+        results = self._match_results(region_binary, template_list)
+        return self._matches_from_results(results, keys, template_list, has_separator, confidence_threshold)
+    
+    def read_column_strip(self, strip, band_starts, band_height, template_type, confidence_threshold=0.95, region_is_binary=False):
+        """Read several stacked rows of one column at once.
         
-        # Remove overlapping matches and sort by position
-        filtered_matches = self._remove_overlapping_matches(digit_matches)
-        filtered_matches.sort(key=lambda x: x['x_position'])
+        `strip` holds the rows of a column on top of each other and band_starts gives each
+        row's top y inside it. Every band is read by glyph hash first; the bands that need
+        template matching are scored together against all full-height templates in one
+        matrix product (see _score_full_height_templates) instead of one matchTemplate
+        call per row and template. Scores agree with per-row matching up to floating-point
+        rounding. Returns one match list per band, in the format of recognize_digits.
+        """
+        band_matches = [[] for _ in band_starts]
+        if strip.size == 0:
+            return band_matches
+        strip_binary = strip if region_is_binary else self._convert_to_binary(strip)
+        pending = []
+        memo_keys = {}
+        for band_idx, band_start in enumerate(band_starts):
+            band = strip_binary[band_start:band_start + band_height]
+            if band.size == 0:
+                continue
+            memo_keys[band_idx] = self.memo.key(band, template_type, confidence_threshold)
+            matches = self.memo.get(memo_keys[band_idx])
+            if matches is not None:
+                band_matches[band_idx] = matches
+                continue
+            matches = self._match_glyphs(band, template_type)
+            if matches is not None:
+                self._count_glyph_read(True)
+                band_matches[band_idx] = matches
+                self.memo.put(memo_keys[band_idx], matches)
+            else:
+                self._count_glyph_read(False)
+                pending.append(band_idx)
+        if not pending:
+            return band_matches
         
-        return filtered_matches
+        with_separator = template_type == 'record'
+        keys, template_list, has_separator = self._template_list(template_type, with_separator)
+        if not template_list:
+            return band_matches
+        strip_height, strip_width = strip_binary.shape
+        full_bands = [band_idx for band_idx in pending if band_starts[band_idx] + band_height <= strip_height]
+        full_height = [template.shape[0] == band_height for template in template_list]
+        batched = {}
+        if full_bands and any(full_height):
+            bands = np.stack([strip_binary[band_starts[band_idx]:band_starts[band_idx] + band_height] for band_idx in full_bands])
+            scores = self._score_full_height_templates(bands, [template for template, full in zip(template_list, full_height) if full])
+            batched = dict(zip(full_bands, scores))
+        for band_idx in pending:
+            band = strip_binary[band_starts[band_idx]:band_starts[band_idx] + band_height]
+            band_scores = iter(batched.get(band_idx, ()))
+            band_results = []
+            for template, full in zip(template_list, full_height):
+                if full:
+                    band_results.append(next(band_scores) if band_idx in batched else None)
+                else:
+                    # Shorter templates (not used by the column readers) are matched per band
+                    band_results.append(self._match_results(band, [template])[0])
+            band_matches[band_idx] = self._matches_from_results(band_results, keys, template_list, has_separator, confidence_threshold)
+            self.memo.put(memo_keys[band_idx], band_matches[band_idx])
+        return band_matches
     
     def reconstruct_number_from_matches(self, matches):
         """Reconstruct a number from digit matches sorted by position."""
@@ -257,5 +543,14 @@ class SharedDigitDetector:
             'total_matches': len(matches)
         }
 
+def _glyph_key(ink):
+    """Hash key (shape + packed bits) of the ink bounding box, and the box's left/top offsets."""
+    rows = np.flatnonzero(ink.any(axis=1))
+    if rows.size == 0:
+        return None, 0, 0
+    cols = np.flatnonzero(ink.any(axis=0))
+    glyph = ink[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+    return (glyph.shape, np.packbits(glyph).tobytes()), int(cols[0]), int(rows[0])
+
 # Global instance for backward compatibility
 shared_detector = SharedDigitDetector() 
\ No newline at end of file
@@ -0,0 +1,71 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StageTimings:
+    """Start/end offsets (seconds from the start of the run) of each stage, plus the wall time."""
+
+    def __init__(self, spans, wall_time):
+        self.spans = spans
+        self.wall_time = wall_time
+
+    def durations(self):
+        return {name: end - start for name, (start, end) in self.spans.items()}
+
+    def busy_time(self):
+        """Sum of the stage durations (what a sequential run would have taken)."""
+        return sum(self.durations().values())
+
+    def overlap(self):
+        """Stage time that ran concurrently with another stage (busy time minus wall time)."""
+        return max(0.0, self.busy_time() - self.wall_time)
+
+
+class StageScheduler:
+    """Runs the independent extraction stages of one frame concurrently on a thread pool.
+
+    The stages spend most of their time in OpenCV and numpy calls that release the GIL,
+    so threads are enough to use idle cores. With max_workers <= 1 the stages run
+    sequentially on the calling thread, in order.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="extract") if max_workers > 1 else None
+
+    def run(self, stages):
+        """Run {name: callable}; returns ({name: result}, StageTimings). Exceptions propagate."""
+        run_start = time.perf_counter()
+        spans = {}
+
+        def timed(name, stage):
+            stage_start = time.perf_counter()
+            try:
+                return stage()
+            finally:
+                spans[name] = (stage_start - run_start, time.perf_counter() - run_start)
+
+        if self._executor is None:
+            results = {name: timed(name, stage) for name, stage in stages.items()}
+        else:
+            futures = {name: self._executor.submit(timed, name, stage) for name, stage in stages.items()}
+            results = {name: future.result() for name, future in futures.items()}
+        return results, StageTimings(spans, time.perf_counter() - run_start)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+_scheduler = None
+
+
+def get_stage_scheduler(max_workers):
+    """Return the process-wide scheduler, recreating it only when the worker count changes."""
+    global _scheduler
+    if _scheduler is None or _scheduler.max_workers != max_workers:
+        if _scheduler is not None:
+            _scheduler.shutdown()
+        _scheduler = StageScheduler(max_workers)
+    return _scheduler
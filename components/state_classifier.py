@@ -0,0 +1,127 @@
+import time
+import numpy as np
+
+from components.utils import HEADER_Y_START, HEADER_Y_END
+from components.overlay_extraction import OVERLAY_ROW_Y, OVERLAY_X, LEVEL_Y_START, LEVEL_Y_END, GOLD_X_END, HEALTH_X_START, HEALTH_X_END, HEALTH_Y_START, HEALTH_Y_END
+
+SCOREBOARD = "scoreboard"
+OVERLAY_OUT_OF_COMBAT = "overlay_out_of_combat"
+OVERLAY_IN_COMBAT = "overlay_in_combat"
+OTHER = "other"  # loading screens and anything without a readable overlay
+
+SAMPLE_STEP = 4  # every 4th pixel of an anchor in both directions
+HEADER_MATCH = 10.0  # mean gray difference of the sampled header strip that still matches a known scoreboard
+OVERLAY_MATCH = 6.0  # mean difference of the overlay band contrasts that still matches a known overlay state
+MAX_PROTOTYPES = 16  # per state, oldest replaced first
+AUDIT_INTERVAL = 30  # every 30th classified frame is also checked by the full detectors
+
+# Sampled (rows, columns) of the level/gold band and the health band of all overlay rows, one row of samples per overlay row
+_LEVEL_GOLD_SAMPLES = np.ix_([row_y + y for row_y in OVERLAY_ROW_Y for y in range(LEVEL_Y_START, LEVEL_Y_END, SAMPLE_STEP)],
+                             list(range(OVERLAY_X, OVERLAY_X + GOLD_X_END, SAMPLE_STEP)))
+_HEALTH_SAMPLES = np.ix_([row_y + y for row_y in OVERLAY_ROW_Y for y in range(HEALTH_Y_START, HEALTH_Y_END, SAMPLE_STEP)],
+                         list(range(OVERLAY_X + HEALTH_X_START, OVERLAY_X + HEALTH_X_END, SAMPLE_STEP)))
+
+
+class StateClassifier:
+    """
+    Labels a frame as scoreboard, overlay (out of combat / in combat) or other from a few sampled anchors.
+
+    The anchors are the header strip, sampled as pixels, and each overlay row's level/gold
+    and health bands, reduced to their contrast. Known signatures of each state are learned
+    from the full detectors: header template matching and overlay extraction. A frame is
+    given the state of the nearest known signature within the match distance, and None
+    (unknown) otherwise. The caller then runs the full detectors and teaches the result back.
+    Every AUDIT_INTERVAL-th classified frame is audited the same way, so a state that was
+    never seen (e.g. a different set of scoreboard columns) is still found.
+    """
+    def __init__(self):
+        self.header_prototypes = []
+        self.overlay_prototypes = {OVERLAY_OUT_OF_COMBAT: [], OVERLAY_IN_COMBAT: [], OTHER: []}
+        self.since_audit = 0
+        self.counts = {}
+        self.audits = 0
+        self.mismatches = 0
+        self.classify_time = 0.0
+        self._header = None
+        self._overlay = None
+
+    def classify(self, gray):
+        """Returns (state or None, audit): audit asks the caller to run the full detectors anyway."""
+        start = time.perf_counter()
+        self._header = gray[HEADER_Y_START:HEADER_Y_END:SAMPLE_STEP, ::SAMPLE_STEP].astype(np.int16)
+        self._overlay = self._overlay_signature(gray)
+        state = None
+        # Until a scoreboard has been seen, a frame cannot be ruled out as one
+        if self.header_prototypes:
+            if any(_distance(self._header, prototype) <= HEADER_MATCH for prototype in self.header_prototypes):
+                state = SCOREBOARD
+            else:
+                best = None
+                for label, prototypes in self.overlay_prototypes.items():
+                    for prototype in prototypes:
+                        distance = _distance(self._overlay, prototype)
+                        if distance <= OVERLAY_MATCH and (best is None or distance < best[0]):
+                            best = (distance, label)
+                state = best[1] if best is not None else None
+        self.counts[state] = self.counts.get(state, 0) + 1
+        audit = False
+        if state is not None:
+            self.since_audit += 1
+            if self.since_audit >= AUDIT_INTERVAL:
+                self.since_audit = 0
+                self.audits += 1
+                audit = True
+        self.classify_time += time.perf_counter() - start
+        return state, audit
+
+    def learn_scoreboard(self, predicted, is_scoreboard):
+        """Teach the last classified frame's header strip from header detection."""
+        if predicted is not None and (predicted == SCOREBOARD) != is_scoreboard:
+            self.mismatches += 1
+        if is_scoreboard and predicted != SCOREBOARD:
+            _add(self.header_prototypes, self._header)
+
+    def learn_overlay(self, predicted, label):
+        """Teach the last classified frame's overlay bands from the overlay extraction (label from overlay_state)."""
+        if predicted is not None and predicted != SCOREBOARD and predicted != label:
+            self.mismatches += 1
+        if predicted != label:
+            _add(self.overlay_prototypes[label], self._overlay)
+
+    def _overlay_signature(self, gray):
+        """Contrast (standard deviation) of every overlay row's level/gold and health bands."""
+        rows = len(OVERLAY_ROW_Y)
+        level_gold = gray[_LEVEL_GOLD_SAMPLES].reshape(rows, -1).std(axis=1)
+        health = gray[_HEALTH_SAMPLES].reshape(rows, -1).std(axis=1)
+        return np.concatenate((level_gold, health))
+
+    def get_stats(self):
+        classified = sum(self.counts.values())
+        return {
+            "states": {state if state is not None else "unknown": count for state, count in self.counts.items()},
+            "audits": self.audits,
+            "mismatches": self.mismatches,
+            "prototypes": len(self.header_prototypes) + sum(len(prototypes) for prototypes in self.overlay_prototypes.values()),
+            "mean_time": self.classify_time / classified if classified else 0.0,
+        }
+
+
+def overlay_state(overlay_values):
+    """The state an overlay extraction result shows: level and gold are only on screen out of combat."""
+    if any(row['level'] is not None and row['gold'] is not None for row in overlay_values):
+        return OVERLAY_OUT_OF_COMBAT
+    if any(row['health'] is not None or row['player_name'] for row in overlay_values):
+        return OVERLAY_IN_COMBAT
+    return OTHER
+
+
+def _distance(signature, prototype):
+    if signature.shape != prototype.shape:
+        return float("inf")
+    return float(np.abs(signature - prototype).mean())
+
+
+def _add(prototypes, signature):
+    if len(prototypes) >= MAX_PROTOTYPES:
+        prototypes.pop(0)
+    prototypes.append(signature)
@@ -1,17 +1,41 @@
 import cv2
 import time
+import hashlib
+import numpy as np
 
 class AnalysisConfig:
     """Configuration for the analysis process."""
-    def __init__(self, debug=False, show_timing=True, show_visualization=False):
+    def __init__(self, debug=False, show_timing=True, show_visualization=False, column_strip=True, extraction_workers=4,
+                 pipeline_queue_size=2, pipeline_drop_policy="drop_oldest", frame_workers=0, frame_gate=True,
+                 row_identity=True, speculative_extraction=True, settle_detector=True,
+                 state_classifier=True, overlay_row_cache=True):
         self.debug = debug
         self.show_timing = show_timing
         self.show_visualization = show_visualization
+        self.column_strip = column_strip  # read health/record/networth columns as one strip instead of row by row
+        self.extraction_workers = extraction_workers  # threads running the per-frame extraction stages (1 = sequential)
+        self.pipeline_queue_size = pipeline_queue_size  # frames waiting between live pipeline stages
+        self.pipeline_drop_policy = pipeline_drop_policy  # "drop_oldest" or "block" when a stage falls behind
+        self.frame_workers = frame_workers  # > 1: extract frames in that many worker processes instead of the thread pipeline
+        self.frame_gate = frame_gate  # skip header detection and extraction of regions that did not change (live loop)
+        self.row_identity = row_identity  # reuse per-player results of unchanged (or re-sorted) rows (live loop)
+        self.speculative_extraction = speculative_extraction  # extract the scoreboard while its headers are still being confirmed (live loop)
+        self.settle_detector = settle_detector  # confirm the scoreboard once its animation stops moving (live loop)
+        self.state_classifier = state_classifier  # classify frames from sampled pixels and skip the extractors of other states (live loop)
+        self.overlay_row_cache = overlay_row_cache  # reuse the results of overlay rows whose pixels did not change
 
 def get_row_boundaries(header_end=93, row_height=80, num_rows=8):
     """Returns row start positions: [93, 173, 253, 333, 413, 493, 573, 653, 733]"""
     return [header_end + (i * row_height) for i in range(num_rows)]  # 8 rows
 
+def region_fingerprint(*regions):
+    """Cheap content fingerprint of one or more image regions (exact bytes, shapes included)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for region in regions:
+        digest.update(str(region.shape).encode())
+        digest.update(np.ascontiguousarray(region))
+    return digest.digest()
+
 def load_and_preprocess_image(image_path, config):
     """Load and preprocess the image."""
     if config.debug:
@@ -28,37 +52,122 @@ def load_and_preprocess_image(image_path, config):
     _, thresh_binary = cv2.threshold(gray, 100, 255, cv2.THRESH_BINARY)
     return image, thresh_binary
 
-def get_header_positions(image, template_folder="assets/templates/header_templates"):
-    """Get x positions of headers using template matching."""
+HEADER_Y_START = 61
+HEADER_Y_END = 93
+HEADER_MATCH_THRESHOLD = 0.7
+HEADER_SEARCH_MARGIN = 16  # px searched either side of a locked header's last x
+HEADER_MISSING_SEARCH_INTERVAL = 10  # frames between full-strip searches for headers the tracker has not locked
+
+_header_templates_cache = {}
+
+def load_header_templates(template_folder="assets/templates/header_templates"):
+    """Load header templates once per folder. Returns a list of (header_name, binary_template)."""
     import os
     import glob
     
-    _, thresh = cv2.threshold(image, 100, 255, cv2.THRESH_BINARY)
-    header_region = thresh[61:93, :]  # Header area
-    
+    templates = _header_templates_cache.get(template_folder)
+    if templates is None:
+        templates = []
+        # Find all template files
+        for template_file in glob.glob(os.path.join(template_folder, "*_template.png")):
+            # Get header name from filename
+            header_name = os.path.basename(template_file).replace("_template.png", "").upper()
+            template = cv2.imread(template_file)
+            if template is None:
+                continue
+            if len(template.shape) == 3:
+                template = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+            templates.append((header_name, template))
+        _header_templates_cache[template_folder] = templates
+    return templates
+
+class HeaderTracker:
+    """Remembers where headers were last found so the next frame only searches a narrow x-window."""
+    def __init__(self, search_margin=HEADER_SEARCH_MARGIN, missing_search_interval=HEADER_MISSING_SEARCH_INTERVAL):
+        self.search_margin = search_margin
+        self.missing_search_interval = missing_search_interval
+        self.last_positions = {}
+        self.frames_since_full_search = 0
+        self.narrow_searches = 0
+        self.full_searches = 0
+
+    def get_stats(self):
+        return {"narrow_searches": self.narrow_searches, "full_searches": self.full_searches}
+
+def _match_header(header_region, template, x_start=0, x_end=None):
+    """Best match of a header template within [x_start, x_end) of the header strip. Returns (score, x)."""
+    strip = header_region[:, x_start:x_end]
+    if strip.shape[0] < template.shape[0] or strip.shape[1] < template.shape[1]:
+        return 0.0, None
+    result = cv2.matchTemplate(strip, template, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_val, x_start + max_loc[0]
+
+def _threshold_header_strip(image):
+    # Only the header strip is thresholded (same result as thresholding the whole frame)
+    _, header_region = cv2.threshold(image[HEADER_Y_START:HEADER_Y_END, :], 100, 255, cv2.THRESH_BINARY)
     if len(header_region.shape) == 3:
         header_region = cv2.cvtColor(header_region, cv2.COLOR_BGR2GRAY)
+    return header_region
+
+
+def get_header_positions(image, template_folder="assets/templates/header_templates", tracker=None, frame_ctx=None):
+    """
+    Get x positions of headers using template matching.
     
-    positions = {}
+    With a HeaderTracker, headers that were found on the previous frame are only searched
+    in a narrow window around their last x; the full strip is searched when that fails.
+    Headers the tracker has not locked are searched in the full strip once every
+    missing_search_interval frames (counted as a full search).
+    With a FrameContext, the thresholded strip is shared with anything else that reads it
+    on the same frame.
+    """
+    if frame_ctx is not None:
+        header_region = frame_ctx.memo(("header_strip",), lambda: _threshold_header_strip(image))
+    else:
+        header_region = _threshold_header_strip(image)
+    
+    templates = load_header_templates(template_folder)
     
-    # Find all template files
-    template_files = glob.glob(os.path.join(template_folder, "*_template.png"))
+    if tracker is not None and tracker.last_positions:
+        tracker.narrow_searches += 1
+        tracker.frames_since_full_search += 1
+        positions = {}
+        missing = []
+        for header_name, template in templates:
+            last_x = tracker.last_positions.get(header_name)
+            if last_x is None:
+                missing.append((header_name, template))
+                continue
+            x_start = max(0, last_x - tracker.search_margin)
+            x_end = last_x + template.shape[1] + tracker.search_margin
+            max_val, x = _match_header(header_region, template, x_start, x_end)
+            if max_val < HEADER_MATCH_THRESHOLD:
+                break
+            positions[header_name] = x
+        else:
+            # Not found when the tracker locked on (e.g. the scoreboard was still sliding in, or the column is absent)
+            if missing and tracker.frames_since_full_search >= tracker.missing_search_interval:
+                tracker.full_searches += 1
+                tracker.frames_since_full_search = 0
+                for header_name, template in missing:
+                    max_val, x = _match_header(header_region, template)
+                    if max_val >= HEADER_MATCH_THRESHOLD:
+                        positions[header_name] = x
+            positions = dict(sorted(positions.items(), key=lambda x: x[1]))
+            tracker.last_positions = positions
+            return positions
     
-    for template_file in template_files:
-        # Get header name from filename
-        header_name = os.path.basename(template_file).replace("_template.png", "").upper()
-        
-        # Load template
-        template = cv2.imread(template_file)
-        if len(template.shape) == 3:
-            template = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-        
-        # Match template
-        result = cv2.matchTemplate(header_region, template, cv2.TM_CCOEFF_NORMED)
-        _, max_val, _, max_loc = cv2.minMaxLoc(result)
-        
-        if max_val >= 0.7:  # Good match
-            positions[header_name] = max_loc[0]
+    positions = {}
+    for header_name, template in templates:
+        max_val, x = _match_header(header_region, template)
+        if max_val >= HEADER_MATCH_THRESHOLD:  # Good match
+            positions[header_name] = x
     
     # Sort by x position
-    return dict(sorted(positions.items(), key=lambda x: x[1])) 
\ No newline at end of file
+    positions = dict(sorted(positions.items(), key=lambda x: x[1]))
+    if tracker is not None:
+        tracker.full_searches += 1
+        tracker.frames_since_full_search = 0
+        tracker.last_positions = positions
+    return positions
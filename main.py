@@ -1,14 +1,30 @@
-from components.utils import AnalysisConfig, get_row_boundaries, load_and_preprocess_image, get_header_positions
+from components.utils import AnalysisConfig, get_row_boundaries, load_and_preprocess_image, get_header_positions, HeaderTracker, load_header_templates
 from components.player_extraction import extract_players_from_scoreboard
 from components.health_extraction import extract_health_from_scoreboard
 from components.record_extraction import extract_record_from_scoreboard
 from components.networth_extraction import extract_networth_from_scoreboard
-from components.crew_bench_extraction import extract_crew_and_bench_from_scoreboard
-from components.overlay_extraction import extract_overlay_from_image
-from components.player_template_manager import PlayerTemplateManager
-from tools.screenshot_tool import UnderlordScreenshotTool
+from components.crew_bench_extraction import extract_crew_and_bench_from_scoreboard, shared_slot_cache
+from components.overlay_extraction import extract_overlay_from_image, shared_overlay_row_cache
+from components.player_template_manager import get_shared_template_manager
+from components.shared_digit_detector import shared_detector
+from components.layout_plan import get_layout_plan
+from components.frame_context import FrameContext
+from components.stage_scheduler import get_stage_scheduler
+from components.frame_pipeline import FramePipeline
+from components.frame_workers import FrameWorkerPool
+from components.image_processing import get_hero_template_bank
+from components.frame_sources import create_frame_source, RecordingFrameSource
+from components.session_recorder import SessionRecorder
+from components.frame_gate import FrameGate, HEADER_STRIP_ROI, SCOREBOARD_ROW_ROIS
+from components.overlay_extraction import OVERLAY_ROW_ROIS
+from components.row_identity import RowIdentityCache
+from components.settle_detector import SettleDetector
+from components.state_classifier import StateClassifier, overlay_state, SCOREBOARD, OVERLAY_IN_COMBAT, OTHER
+from components.debug_trace import trace_for, BANNER
 
 from datetime import datetime
+from collections import deque
+import copy
 import time
 import json
 import os
@@ -21,6 +37,7 @@ class PerformanceTracker:
         self.times = {}
         self.start_time = None
         self.last_mark_time = None
+        self.parallel = None  # wall/busy/overlap of the last concurrent stage run
     
     def start(self):
         self.start_time = time.time()
@@ -36,6 +53,13 @@ class PerformanceTracker:
         self.times[phase_name] = current_time - self.last_mark_time
         self.last_mark_time = current_time
     
+    def record_stages(self, timings):
+        """Record stages that ran concurrently: each stage's own duration, plus wall time and overlap."""
+        for phase_name, duration in timings.durations().items():
+            self.times[phase_name] = duration
+        self.parallel = {"wall": timings.wall_time, "busy": timings.busy_time(), "overlap": timings.overlap()}
+        self.last_mark_time = time.time()
+    
     def get_total_time(self):
         return time.time() - self.start_time if self.start_time else 0
     
@@ -50,6 +74,8 @@ class PerformanceTracker:
             percentage = (phase_time / total_time * 100) if total_time > 0 else 0
             print(f"{phase:<20} {phase_time:.3f}s ({percentage:.1f}%)")
         
+        if self.parallel:
+            print(f"{'Concurrent stages:':<20} {self.parallel['busy']:.3f}s of work in {self.parallel['wall']:.3f}s wall ({self.parallel['overlap']:.3f}s overlapped)")
         print(f"{'TOTAL TIME:':<20} {total_time:.3f}s")
         print("=" * 35)
 
@@ -61,40 +87,107 @@ class PerformanceTracker:
 
 
 
-def extract_all_players(image, thresh, header_positions, crew_results, bench_results, config, tracker=None, overlay_name_binaries=None):
-    """Extract data for all players and combine into final structure."""
-    if config.debug:
-        print("\n=== EXTRACTING DATA ===")
-        print(f"Detected columns: {list(header_positions.keys())}")
-    
-    # Extract player data using the new player extraction system
-    if config.debug:
-        print("\n=== PLAYER COLUMN DATA ===")
-    players_data = extract_players_from_scoreboard(image, config, overlay_name_binaries=overlay_name_binaries)
-    if tracker:
-        tracker.mark("Player Extraction")
+# Row result field (see components.row_identity) produced by each column stage
+STAGE_FIELDS = {"Player Extraction": "player", "Health Extraction": "health", "Record Extraction": "record", "NetWorth Extraction": "networth"}
+
+def _column_stages(image, header_positions, config, overlay_name_binaries=None, layout=None, frame_ctx=None, pending=None):
+    """
+    The per-column extraction stages; none of them depends on another's output.
     
-    if config.debug:
-        print("\n=== HEALTH COLUMN DATA ===")
-    health_data = extract_health_from_scoreboard(image, header_positions.get("HEALTH"), config)
+    With `pending` ({field: row numbers}), each stage reads only those rows, and stages
+    with no rows to read are left out.
+    """
+    rows = pending or {}
+    stages = {
+        "Player Extraction": lambda: extract_players_from_scoreboard(image, config, overlay_name_binaries=overlay_name_binaries, layout=layout, frame_ctx=frame_ctx, rows=rows.get("player")),
+        "Health Extraction": lambda: extract_health_from_scoreboard(image, header_positions.get("HEALTH"), config, layout=layout, frame_ctx=frame_ctx, rows=rows.get("health")),
+        "Record Extraction": lambda: extract_record_from_scoreboard(image, header_positions.get("RECORD"), config, layout=layout, frame_ctx=frame_ctx, rows=rows.get("record")),
+        "NetWorth Extraction": lambda: extract_networth_from_scoreboard(image, header_positions.get("NETWORTH"), config, layout=layout, frame_ctx=frame_ctx, rows=rows.get("networth")),
+    }
+    if pending is not None:
+        stages = {name: stage for name, stage in stages.items() if pending[STAGE_FIELDS[name]]}
+    return stages
+
+def _run_stages(stages, config, tracker=None):
+    scheduler = get_stage_scheduler(getattr(config, 'extraction_workers', 1))
+    results, timings = scheduler.run(stages)
     if tracker:
-        tracker.mark("Health Extraction")
+        tracker.record_stages(timings)
+    return results
+
+def extract_scoreboard(image, thresh, header_positions, config, tracker=None, overlay_name_binaries=None, layout=None, frame_ctx=None, row_cache=None):
+    """
+    Run crew/bench and all column extractions concurrently, then combine them per player.
     
-    if config.debug:
-        print("\n=== RECORD COLUMN DATA ===")
-    record_data = extract_record_from_scoreboard(image, header_positions.get("RECORD"), config)
-    if tracker:
-        tracker.mark("Record Extraction")
+    With a RowIdentityCache, rows already read on an earlier frame (possibly at another
+    row, after the scoreboard re-sorted) reuse their results, and only changed fields are extracted.
+    """
+    trace = trace_for(config)
+    trace.log("\n=== EXTRACTING DATA ===")
+    trace.log("Detected columns: %s", list(header_positions))
+    if row_cache is not None:
+        return _extract_changed_rows(image, thresh, header_positions, config, tracker, overlay_name_binaries, layout, frame_ctx, row_cache)
+    stages = {"Crew/Bench Extraction": lambda: extract_crew_and_bench_from_scoreboard(image, thresh, header_positions, config, layout=layout)}
+    stages.update(_column_stages(image, header_positions, config, overlay_name_binaries, layout, frame_ctx))
+    results = _run_stages(stages, config, tracker)
+    crew_results, bench_results = results["Crew/Bench Extraction"]
+    return combine_player_data(results["Player Extraction"], results["Health Extraction"], results["Record Extraction"], results["NetWorth Extraction"],
+                               crew_results, bench_results, header_positions, config)
+
+def _extract_changed_rows(image, thresh, header_positions, config, tracker, overlay_name_binaries, layout, frame_ctx, row_cache):
+    if layout is None:
+        layout = get_layout_plan(header_positions, image.shape[1])
+    row_prints = row_cache.fingerprint_rows(image, layout)
+    results_by_row, pending = row_cache.plan(row_prints, header_positions)
+    stages = {}
+    crew_bench_rows = sorted(set(pending["crew"]) | set(pending["bench"]))
+    if crew_bench_rows:
+        stages["Crew/Bench Extraction"] = lambda: extract_crew_and_bench_from_scoreboard(image, thresh, header_positions, config, layout=layout, rows=crew_bench_rows)
+    else:
+        # No slot is read this frame, so its slot stats must not show the previous frame's
+        shared_slot_cache.start_frame()
+    stages.update(_column_stages(image, header_positions, config, overlay_name_binaries, layout, frame_ctx, pending=pending))
+    results = _run_stages(stages, config, tracker)
     
-    if config.debug:
-        print("\n=== NETWORTH COLUMN DATA ===")
-    networth_data = extract_networth_from_scoreboard(image, header_positions.get("NETWORTH"), config)
-    if tracker:
-        tracker.mark("NetWorth Extraction")
+    # Fresh results fill the pending fields; a row missing from a stage's output has no value for that field
+    for field in pending:
+        for row_num in pending[field]:
+            results_by_row[row_num][field] = None
+    for player_data in results.get("Player Extraction", []):
+        results_by_row[player_data["playerRow"]]["player"] = player_data
+    for stage_name, field in STAGE_FIELDS.items():
+        if field != "player":
+            for row_data in results.get(stage_name, []):
+                results_by_row[row_data["row"]][field] = row_data
+    if "Crew/Bench Extraction" in results:
+        for field, stage_results in zip(("crew", "bench"), results["Crew/Bench Extraction"]):
+            for row_num in pending[field]:
+                results_by_row[row_num][field] = stage_results.get(row_num)
+    row_cache.store(row_prints, results_by_row)
+    
+    rows = [results_by_row[row_num] for row_num in range(len(row_prints))]
+    def column(field):
+        return [row[field] for row in rows if row[field] is not None]
+    crew_results = {row_num: row["crew"] for row_num, row in enumerate(rows) if row["crew"] is not None}
+    bench_results = {row_num: row["bench"] for row_num, row in enumerate(rows) if row["bench"] is not None}
+    return combine_player_data(column("player"), column("health"), column("record"), column("networth"),
+                               crew_results, bench_results, header_positions, config)
+
+def extract_all_players(image, thresh, header_positions, crew_results, bench_results, config, tracker=None, overlay_name_binaries=None, layout=None, frame_ctx=None):
+    """Extract data for all players and combine into final structure."""
+    trace = trace_for(config)
+    trace.log("\n=== EXTRACTING DATA ===")
+    trace.log("Detected columns: %s", list(header_positions))
     
+    # Player, health, record and networth columns run concurrently (config.extraction_workers)
+    results = _run_stages(_column_stages(image, header_positions, config, overlay_name_binaries, layout, frame_ctx), config, tracker)
+    return combine_player_data(results["Player Extraction"], results["Health Extraction"], results["Record Extraction"], results["NetWorth Extraction"],
+                               crew_results, bench_results, header_positions, config)
 
-    if config.debug:
-        print(f"###########################################################################################"+" Summary of extracted data")
+def combine_player_data(players_data, health_data, record_data, networth_data, crew_results, bench_results, header_positions, config):
+    """Combine the per-column results into one record per player."""
+    trace = trace_for(config)
+    trace.log("%s Summary of extracted data", BANNER)
 
     # Combine player data with crew/bench results
     combined_players = []
@@ -104,8 +197,7 @@ def extract_all_players(image, thresh, header_positions, crew_results, bench_res
 
         # Skip players with no level and no gold
         if player_data["playerLevel"] is None and player_data["playerGold"] is None:
-            if config.debug:
-                print(f"Skipping player at row {row_num}: missing both level and gold")
+            trace.log("Skipping player at row %s: missing both level and gold", row_num)
             continue
         
         # Get corresponding data from other extraction functions (with safe defaults)
@@ -113,7 +205,7 @@ def extract_all_players(image, thresh, header_positions, crew_results, bench_res
         record_info = next((r for r in record_data if r["row"] == row_num), {"wins": None, "losses": None})
         networth_info = next((n for n in networth_data if n["row"] == row_num), {"networth": None})
         
-        if config.debug:
+        if trace.enabled:
             missing_columns = []
             if health_info["health"] is None and "HEALTH" not in header_positions:
                 missing_columns.append("HEALTH")
@@ -123,7 +215,7 @@ def extract_all_players(image, thresh, header_positions, crew_results, bench_res
                 missing_columns.append("NETWORTH")
             
             if missing_columns:
-                print(f"Row {row_num}: Missing columns {missing_columns}, using default values")
+                trace.log("Row %s: Missing columns %s, using default values", row_num, missing_columns)
         
         # Create combined player structure
         combined_player = {
@@ -176,29 +268,29 @@ def main(config):
     if image is None:
         print("Failed to load image")
         return
+    frame_ctx = FrameContext(image)
     
     # Get header positions
     header_positions = get_header_positions(thresh)
     tracker.mark("Header Detection")
-    if config.debug:
-        print(f"Found headers: {list(header_positions.keys())}")
+    trace = trace_for(config)
+    trace.log("Found headers: %s", list(header_positions))
     
     # If no headers found, abort extraction
     if not header_positions:
         print("No headers found in the image. Extraction aborted.")
-        overlay_values, _ = extract_overlay_from_image(image, config)
+        overlay_values, _ = extract_overlay_from_image(image, config, frame_ctx=frame_ctx)
         print(overlay_values)
         return
 
     # Extract overlay player name binaries for template creation
-    overlay_values, overlay_name_binaries = extract_overlay_from_image(image, config)
+    overlay_values, overlay_name_binaries = extract_overlay_from_image(image, config, frame_ctx=frame_ctx)
 
-    # Extract crew and bench data (heroes and star levels)
-    crew_results, bench_results = extract_crew_and_bench_from_scoreboard(image, thresh, header_positions, config)
-    tracker.mark("Crew/Bench Extraction")
-    
-    # Extract all player data and combine
-    players = extract_all_players(image, thresh, header_positions, crew_results, bench_results, config, tracker, overlay_name_binaries=overlay_name_binaries)
+    # Compile (or reuse) the scoreboard layout for these headers
+    layout = get_layout_plan(header_positions, image.shape[1])
+
+    # Extract crew/bench (heroes and star levels) and all player columns concurrently, then combine
+    players = extract_scoreboard(image, thresh, header_positions, config, tracker, overlay_name_binaries=overlay_name_binaries, layout=layout, frame_ctx=frame_ctx)
     tracker.mark("Data Combination")
     # Only create templates if last overlay was out of combat and overlay_name_binaries_buffer is available
     if overlay_name_binaries_buffer is not None and last_overlay_was_out_of_combat:
@@ -243,16 +335,16 @@ def main(config):
     }
     
     # Print summary
-    if config.debug:
-        print("\n=== EXTRACTION SUMMARY ===")
-        print(f"Total players: {scoreboard_data['metadata']['total_players']}")
-        print(f"Players with names: {scoreboard_data['metadata']['extraction_summary']['players_with_names']}")
-        print(f"Players with health: {scoreboard_data['metadata']['extraction_summary']['players_with_health']}")
-        print(f"Players with record: {scoreboard_data['metadata']['extraction_summary']['players_with_record']}")
-        print(f"Players with networth: {scoreboard_data['metadata']['extraction_summary']['players_with_networth']}")
-        print(f"Total crew units: {scoreboard_data['metadata']['extraction_summary']['total_crew_units']}")
-        print(f"Total bench units: {scoreboard_data['metadata']['extraction_summary']['total_bench_units']}")
-        print(f"Extraction time: {scoreboard_data['metadata']['extraction_time']:.3f}s")
+    summary = scoreboard_data['metadata']['extraction_summary']
+    trace.log("\n=== EXTRACTION SUMMARY ===")
+    trace.log("Total players: %s", scoreboard_data['metadata']['total_players'])
+    trace.log("Players with names: %s", summary['players_with_names'])
+    trace.log("Players with health: %s", summary['players_with_health'])
+    trace.log("Players with record: %s", summary['players_with_record'])
+    trace.log("Players with networth: %s", summary['players_with_networth'])
+    trace.log("Total crew units: %s", summary['total_crew_units'])
+    trace.log("Total bench units: %s", summary['total_bench_units'])
+    trace.log("Extraction time: %.3fs", scoreboard_data['metadata']['extraction_time'])
     
     # Print timing summary if enabled
     tracker.print_summary(config.show_timing)
@@ -307,131 +399,438 @@ def print_scoreboard_data(scoreboard_data):
         print(f"\033[1;34m      Bench: \033[1;37m{bench_heroes}")
         print()
     
+class LiveExtractor:
+    """Extract stage of the live loop: header stability, then scoreboard or overlay extraction.
+    
+    Holds the state carried from frame to frame, so it must see frames in capture order
+    (the pipeline runs it on a single thread).
+    
+    With speculative extraction, the scoreboard is extracted from the first frame its headers
+    appear on, while they are still being confirmed. The result is held provisionally: it is
+    published as soon as the headers reach STABILITY_THRESHOLD, or discarded if they change
+    first. Provisional results are refreshed whenever the rows change during the wait.
+    
+    With the settle detector, headers also count as confirmed as soon as the opening animation
+    has stopped moving, which is usually well before STABILITY_THRESHOLD frames.
+    
+    With the state classifier, header detection only runs on frames that look like a scoreboard
+    (or that the classifier cannot place), and in-combat or loading frames are not extracted.
+    """
+    STABILITY_THRESHOLD = 12
+    
+    def __init__(self, config):
+        self.config = config
+        self.trace = trace_for(config)
+        self.template_manager = get_shared_template_manager()
+        self.header_tracker = HeaderTracker()
+        self.last_header_positions = None
+        self.header_stable_count = 0
+        self.overlay_name_binaries_buffer = None
+        # Add a flag to track overlay state
+        self.last_overlay_was_out_of_combat = False
+        # Skips header detection and extraction for regions that did not change since they were last read
+        self.gate = FrameGate() if getattr(config, 'frame_gate', True) else None
+        # Carries per-player results across frames, following players when the scoreboard re-sorts
+        self.row_cache = RowIdentityCache() if getattr(config, 'row_identity', True) else None
+        # Confirms the scoreboard as soon as its opening animation stops, instead of after a fixed frame count
+        self.settle = SettleDetector() if getattr(config, 'settle_detector', True) else None
+        self.speculative = getattr(config, 'speculative_extraction', True)
+        # Labels frames from sampled pixels, so only the extractors for the frame's state run
+        self.classifier = StateClassifier() if getattr(config, 'state_classifier', True) else None
+        # Provisional extractions must not create player templates from a frame that may still be animating
+        self.speculative_config = copy.copy(config)
+        self.speculative_config.create_player_templates = False
+        self.provisional = None
+        self.opened_at = None  # capture time of the first frame showing the current headers
+        self.speculative_commits = 0
+        self.speculative_discards = 0
+    
+    def __call__(self, frame):
+        image, frame_ctx = frame.data
+        return self.extract(image, frame_ctx, frame.stage_times, captured_at=frame.captured_at)
+    
+    def extract(self, image, frame_ctx, stage_times, captured_at=None):
+        """Extract one frame; returns (kind, payload, frame conversion stats, opened_at) for the publisher.
+        
+        opened_at is the capture time of the scoreboard's first frame, given only with the
+        result that first confirms it, so the publisher can measure open-to-publish latency.
+        """
+        config = self.config
+        gate = self.gate
+        tracker = PerformanceTracker()
+        tracker.start()
+        classifier = self.classifier
+        state, audit = classifier.classify(frame_ctx.gray()) if classifier is not None else (None, False)
+        header_changed = gate is None or gate.changed("header", frame_ctx.gray()[HEADER_STRIP_ROI])
+        if header_changed and state not in (None, SCOREBOARD) and not audit:
+            # Not a scoreboard, known without template matching
+            header_positions = {}
+        elif header_changed:
+            header_positions = get_header_positions(image, tracker=self.header_tracker, frame_ctx=frame_ctx)
+            if classifier is not None:
+                classifier.learn_scoreboard(state, bool(header_positions))
+        else:
+            header_positions = self.last_header_positions
+        if header_changed and gate is not None:
+            gate.commit("header")
+        tracker.mark("Header Detection")
+        if config.show_timing:
+            print(f"Header Detection: {tracker.times.get('Header Detection', 0):.4f} {stage_times.get('preprocess', 0):.4f} {stage_times.get('capture', 0):.4f}")
+        stable = self.update_stability(header_positions)
+        if self.settle is not None:
+            settled = self.settle.update(frame_ctx.gray(), bool(header_positions), captured_at if captured_at is not None else time.perf_counter())
+            # The same headers on consecutive frames as well: a settled screen can still be detected wrong once
+            stable = stable or (settled and bool(header_positions) and self.header_stable_count > 1)
+        if self.header_stable_count == 1:
+            # New headers (or none): whatever was extracted for the previous ones is void
+            if self.provisional is not None:
+                self.speculative_discards += 1
+            self.provisional = None
+            self.opened_at = (captured_at if captured_at is not None else time.perf_counter()) if header_positions else None
+        if stable or (self.speculative and header_positions):
+            # A payload of None tells the publisher nothing changed since the last extraction
+            payload = None
+            skip = False
+            if gate is not None:
+                changed_rows = gate.changed_rows("scoreboard_row", frame_ctx.gray(), SCOREBOARD_ROW_ROIS)
+                skip = not header_changed and not changed_rows
+                gate.count("scoreboard", skip)
+            if stable and skip and self.provisional is not None and any(p.get('_should_create_template') for p in self.provisional["players"]):
+                # New names were read provisionally, without templates: extract again now the headers are confirmed
+                if self.row_cache is not None:
+                    self.row_cache.clear()
+                skip = False
+            if not skip:
+                payload = self.extract_scoreboard_state(image, frame_ctx, header_positions, tracker, stage_times,
+                                                        config=config if stable else self.speculative_config)
+                if gate is not None:
+                    gate.commit_rows("scoreboard_row", changed_rows)
+            if not stable:
+                if payload is not None:
+                    self.provisional = payload
+                return "scoreboard", None, frame_ctx.get_stats(), None
+            if self.provisional is not None:
+                # Headers confirmed: commit the speculative result unless this frame produced a newer one
+                payload = payload if payload is not None else self.provisional
+                self.provisional = None
+                self.speculative_commits += 1
+            opened_at, self.opened_at = self.opened_at, None
+            return "scoreboard", payload, frame_ctx.get_stats(), opened_at
+        if state in (OVERLAY_IN_COMBAT, OTHER) and not audit:
+            # Nothing worth reading on screen: the last overlay output stays
+            self.last_overlay_was_out_of_combat = False
+            return "overlay", None, frame_ctx.get_stats(), None
+        if gate is not None:
+            changed_rows = gate.changed_rows("overlay_row", frame_ctx.gray(), OVERLAY_ROW_ROIS)
+            gate.count("overlay", not changed_rows)
+            if not changed_rows:
+                return "overlay", None, frame_ctx.get_stats(), None
+        payload = self.extract_overlay_state(image, frame_ctx, tracker)
+        if gate is not None:
+            gate.commit_rows("overlay_row", changed_rows)
+        if classifier is not None:
+            label = overlay_state(payload)
+            classifier.learn_overlay(state, label)
+            self.last_overlay_was_out_of_combat = label != OVERLAY_IN_COMBAT and label != OTHER
+        return "overlay", payload, frame_ctx.get_stats(), None
+    
+    def update_stability(self, header_positions):
+        """Header stability check; True once the same headers were seen STABILITY_THRESHOLD frames in a row."""
+        if header_positions == self.last_header_positions:
+            self.header_stable_count += 1
+        else:
+            self.header_stable_count = 1
+            self.last_header_positions = header_positions
+        return bool(header_positions) and self.header_stable_count >= self.STABILITY_THRESHOLD
+    
+    def extract_scoreboard_state(self, image, frame_ctx, header_positions, tracker, stage_times, config=None):
+        config = config if config is not None else self.config
+        self.trace.log("Scoreboard detected, extracting scoreboard data...")
+        layout = get_layout_plan(header_positions, image.shape[1])
+        thresh = None
+        if hasattr(config, 'preprocess_for_thresh') and config.preprocess_for_thresh:
+            # If you have a custom thresholding function, use it
+            thresh = config.preprocess_for_thresh(image)
+        # Ensure thresh is always a valid binary image
+        if thresh is None:
+            thresh = frame_ctx.otsu()
+        players = extract_scoreboard(image, thresh, header_positions, config, tracker, overlay_name_binaries=self.overlay_name_binaries_buffer, layout=layout, frame_ctx=frame_ctx, row_cache=self.row_cache)
+        tracker.mark("Data Combination")
+        if config.show_timing:
+            if self.row_cache is not None:
+                row_stats = self.row_cache.get_frame_stats()
+                print(f"Rows moved: {row_stats['permuted_rows']}, fields reused: {row_stats['reused_fields']}, re-extracted: {row_stats['extracted_fields']}")
+            slot_stats = shared_slot_cache.get_frame_stats()
+            print(f"Crew/bench slots reused: {slot_stats['reused']}, re-identified: {slot_stats['identified']}")
+            print(f"Extraction stages: {tracker.parallel['busy']:.4f}s of work in {tracker.parallel['wall']:.4f}s wall ({tracker.parallel['overlap']:.4f}s overlapped)")
+        if not getattr(config, 'create_player_templates', True):
+            pass  # provisional extraction: keep the overlay binaries for the confirmed one
+        elif self.overlay_name_binaries_buffer is not None and self.last_overlay_was_out_of_combat:
+            from components.player_extraction import PlayerExtractor
+            player_extractor = PlayerExtractor(layout=layout)
+            row_boundaries = layout.row_boundaries
+            for row_num, player in enumerate(players):
+                if player.get('_should_create_template'):
+                    player_name = player['player_name']
+                    row_y = row_boundaries[row_num]
+                    scoreboard_crop = player_extractor.extract_player_name_region(image, row_y)
+                    overlay_bin = self.overlay_name_binaries_buffer[row_num]
+                    template_id = self.template_manager.add_new_player(scoreboard_crop, player_name, template_type="scoreboard")
+                    if overlay_bin is not None:
+                        self.template_manager.add_new_player(overlay_bin, player_name, template_type="overlay", player_id=template_id)
+            print("Created/updated player templates for scoreboard and overlay.")
+            self.overlay_name_binaries_buffer = None  # Clear after use
+        else:
+            self.trace.log("Skipping template creation: last overlay was not out of combat or no overlay_name_binaries_buffer.")
+        timing_breakdown = {"Screenshot Capture": stage_times.get("capture", 0), "Image Load/Preprocess": stage_times.get("preprocess", 0)}
+        timing_breakdown.update(tracker.times)
+        return {
+            "metadata": {
+                "total_players": len(players),
+                "headers_found": list(header_positions.keys()),
+                "extraction_time": tracker.get_total_time(),
+                "image_path": IMAGE_PATH,
+                "timing_breakdown": timing_breakdown,
+                "extraction_summary": {
+                    "players_with_names": sum(1 for p in players if p["player_name"]),
+                    "players_with_health": sum(1 for p in players if p["health"] is not None),
+                    "players_with_record": sum(1 for p in players if p["wins"] is not None and p["losses"] is not None),
+                    "players_with_networth": sum(1 for p in players if p["networth"] is not None),
+                    "total_crew_units": sum(len(p["crew"]) for p in players),
+                    "total_bench_units": sum(len(p["bench"]) for p in players)
+                }
+            },
+            "players": players
+        }
+    
+    def extract_overlay_state(self, image, frame_ctx, tracker):
+        config = self.config
+        self.trace.log("Overlay detected, extracting overlay data...")
+        overlay_values, overlay_name_binaries = extract_overlay_from_image(image, config, frame_ctx=frame_ctx)
+        if config.show_timing:
+            tracker.mark("Overlay Extraction")
+            print(f"Overlay Extraction: {tracker.times['Overlay Extraction']:.4f}")
+            if getattr(config, 'overlay_row_cache', True):
+                row_stats = shared_overlay_row_cache.get_frame_stats()
+                print(f"Overlay rows reused: {row_stats['reused']}, re-read: {row_stats['extracted']}")
+        return overlay_values
+
+class LivePublisher:
+    """Publish stage of the live loop: write the JSON output, print it, and report FPS/stats once a second."""
+    
+    def __init__(self, config, extractor):
+        self.config = config
+        self.extractor = extractor
+        self.pipeline = None
+        self.worker_pool = None
+        self.source = None
+        self.last_fps_time = time.time()
+        self.frame_count = 0
+        self.open_latencies = deque(maxlen=64)  # scoreboard opening -> its data written and printed, seconds
+    
+    def __call__(self, frame):
+        return self.publish(*frame.data)
+    
+    def publish(self, kind, payload, ctx_stats, opened_at=None):
+        config = self.config
+        if payload is None:
+            # Unchanged since the last extraction: the JSON on disk is still current.
+            # This relies on the publish queue never dropping a payload (FramePipeline only drops before extract)
+            pass
+        elif kind == "scoreboard":
+            with open("output/scoreboard_data_raw.json", "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2, ensure_ascii=False)
+            print_scoreboard_data(payload)
+        else:
+            with open("output/overlay_data.json", "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2, ensure_ascii=False)
+        if opened_at is not None:
+            self.open_latencies.append(time.perf_counter() - opened_at)
+        if config.show_timing:
+            print(f"Frame conversions: {ctx_stats['conversions']}, reused: {ctx_stats['reuses']}")
+            if self.source is not None:
+                # The worker pool adds one copy into its shared-memory slot
+                copies = self.source.copies_per_frame() + (1 if self.worker_pool is not None else 0)
+                print(f"Full-frame copies before extraction: {copies:g}")
+        # FPS logging
+        self.frame_count += 1
+        now = time.time()
+        if now - self.last_fps_time >= 1.0:
+            print(f"FPS: {self.frame_count / (now - self.last_fps_time):.2f}")
+            if config.show_timing:
+                self.print_stats()
+            self.frame_count = 0
+            self.last_fps_time = now
+        return kind
+    
+    def print_stats(self):
+        store_stats = get_shared_template_manager().get_template_store_stats()
+        header_stats = self.extractor.header_tracker.get_stats()
+        print(f"Header searches: {header_stats['narrow_searches']} narrow, {header_stats['full_searches']} full")
+        glyph_stats = shared_detector.get_glyph_stats()
+        print(f"Digit regions read by glyph hash: {glyph_stats['glyph_reads']}, template-matching fallbacks: {glyph_stats['glyph_fallbacks']}")
+        memo_stats = shared_detector.memo.get_stats()
+        print(f"Digit memo: {memo_stats['entries']}/{memo_stats['max_entries']} entries, hits: {memo_stats['hits']}, misses: {memo_stats['misses']}, evictions: {memo_stats['evictions']}")
+        print(f"Player templates: {store_stats['templates']} resident ({store_stats['memory_bytes'] / 1024:.1f} KiB), hits: {store_stats['hits']}, misses: {store_stats['misses']}, name hash hits: {store_stats['hash_hits']}/{store_stats['hash_hits'] + store_stats['hash_misses']}")
+        extractor = self.extractor
+        if self.open_latencies:
+            latencies = self.open_latencies
+            mode = "speculative" if extractor.speculative else "after stability"
+            print(f"Scoreboard open-to-publish ({mode}): last {latencies[-1] * 1000:.1f} ms, mean {sum(latencies) / len(latencies) * 1000:.1f} ms, "
+                  f"provisional results committed: {extractor.speculative_commits}, discarded: {extractor.speculative_discards}")
+        if extractor.settle is not None:
+            settle_stats = extractor.settle.get_stats()
+            print("Settle time: " + ", ".join(f"{kind} {s['transitions']}x mean {s['mean_seconds'] * 1000:.1f} ms / {s['mean_frames']:.1f} frames (max {s['max_seconds'] * 1000:.1f} ms)"
+                                              for kind, s in settle_stats.items()))
+        if extractor.classifier is not None:
+            classifier_stats = extractor.classifier.get_stats()
+            print(f"Frame states: {classifier_stats['states']}, audits: {classifier_stats['audits']}, mismatches: {classifier_stats['mismatches']}, "
+                  f"signatures: {classifier_stats['prototypes']}, mean classification: {classifier_stats['mean_time'] * 1000:.3f} ms")
+        if self.pipeline is not None:
+            pipeline_stats = self.pipeline.get_stats()
+            queues = ", ".join(f"{stage} {q['depth']} (max {q['max_depth']}, dropped {q['drops']})" for stage, q in pipeline_stats["queues"].items())
+            print(f"Pipeline queues: {queues}")
+            print(f"Capture-to-publish latency: mean {pipeline_stats['latency_mean'] * 1000:.1f} ms, max {pipeline_stats['latency_max'] * 1000:.1f} ms")
+        gate = self.extractor.gate
+        if gate is not None:
+            print("Unchanged, skipped: " + ", ".join(f"{name} {gate.skip_rate(name):.0%}" for name in ("header", "scoreboard", "overlay") if name in gate.checks))
+            for prefix in ("scoreboard_row", "overlay_row"):
+                rates = [gate.skip_rate(name) for name in gate.checks if name.startswith(prefix + "_")]
+                if rates:
+                    print(f"Unchanged {prefix.replace('_', ' ')}s: " + " ".join(f"{rate:.0%}" for rate in rates))
+        recorder = getattr(self.source, 'recorder', None)
+        if recorder is not None:
+            recorder_stats = recorder.get_stats()
+            print(f"Session recording: {recorder_stats['recorded']} frames in {recorder_stats['chunks']} chunks ({recorder_stats['bytes'] / 1024 ** 2:.1f} MiB), dropped: {recorder_stats['dropped']}, chunks deleted by size cap: {recorder_stats['deleted_chunks']}")
+        if self.worker_pool is not None:
+            pool_stats = self.worker_pool.get_stats()
+            print(f"Frame workers: {pool_stats['workers']}, in flight: {pool_stats['in_flight']}, mean extraction: {pool_stats['mean_worker_time'] * 1000:.1f} ms, frames per worker: {sorted(pool_stats['frames_by_worker'].values())}")
+
+def preprocess_frame(frame):
+    """Preprocess stage: unpack the source's (timestamp, BGR frame) and set up the frame's shared conversions."""
+    frame.timestamp, image = frame.data
+    # Gray/binary/Otsu conversions are computed lazily, once per frame; every state needs gray, so do it here
+    frame_ctx = FrameContext(image)
+    frame_ctx.gray()
+    return image, frame_ctx
+
+def run_live(config, source):
+    """Run capture, preprocess, extract and publish as concurrent stages until Ctrl+C or the source ends."""
+    extractor = LiveExtractor(config)
+    publisher = LivePublisher(config, extractor)
+    pipeline = FramePipeline(source.read, preprocess_frame, extractor, publisher,
+                             queue_size=config.pipeline_queue_size, policy=config.pipeline_drop_policy)
+    publisher.pipeline = pipeline
+    publisher.source = source
+    pipeline.start()
+    try:
+        while pipeline.is_alive():
+            pipeline.join(timeout=0.5)
+    except KeyboardInterrupt:
+        print("\nContinuous extraction stopped by user.")
+        pipeline.stop()
+        pipeline.join(timeout=5)
+
+# Per-process extractor used by the frame workers (see preload_worker)
+_worker_extractor = None
+
+def preload_worker(config):
+    """Frame worker initializer: load hero masks and header templates before the first frame arrives."""
+    global _worker_extractor
+    # Workers would race each other on the players database, so they only use the templates present at startup
+    config.create_player_templates = False
+    get_hero_template_bank("assets/templates/hero_templates/masks", debug=config.debug)
+    load_header_templates()
+    _worker_extractor = LiveExtractor(config)
+
+def extract_frame_in_worker(image, config):
+    """
+    Extract one frame in a worker process.
+    
+    Workers see frames out of order, so header stability is left to the parent: a frame with
+    headers is extracted as a scoreboard and the parent drops it if the headers are not yet stable.
+    Returns (kind, payload, frame conversion stats, header_positions).
+    """
+    frame_ctx = FrameContext(image)
+    tracker = PerformanceTracker()
+    tracker.start()
+    header_positions = get_header_positions(image, tracker=_worker_extractor.header_tracker, frame_ctx=frame_ctx)
+    tracker.mark("Header Detection")
+    if header_positions:
+        payload = _worker_extractor.extract_scoreboard_state(image, frame_ctx, header_positions, tracker, {})
+        return "scoreboard", payload, frame_ctx.get_stats(), header_positions
+    payload = _worker_extractor.extract_overlay_state(image, frame_ctx, tracker)
+    return "overlay", payload, frame_ctx.get_stats(), header_positions
+
+def run_live_workers(config, source):
+    """Run extraction in config.frame_workers processes, publishing results in capture order until Ctrl+C or the source ends."""
+    extractor = LiveExtractor(config)
+    publisher = LivePublisher(config, extractor)
+    pool = FrameWorkerPool(extract_frame_in_worker, config.frame_workers, config, initializer=preload_worker)
+    publisher.worker_pool = pool
+    publisher.source = source
+    try:
+        for _, (kind, payload, ctx_stats, header_positions) in pool.map(image for _, image in source):
+            if extractor.update_stability(header_positions) or kind == "overlay":
+                publisher.publish(kind, payload, ctx_stats)
+    except KeyboardInterrupt:
+        print("\nContinuous extraction stopped by user.")
+    finally:
+        pool.shutdown()
+
 IMAGE_PATH = "screenshots/SS_Latest.png"
 #IMAGE_PATH = "assets/templates/screenshots_for_templates/SS_18.png"
 if __name__ == "__main__":
-    config = AnalysisConfig(debug=False, show_timing=False, show_visualization=False)
-    screenshot_tool = UnderlordScreenshotTool(output_dir="screenshots")
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Continuous scoreboard extraction for Dota Underlords")
+    parser.add_argument('--source', '-s', choices=['gdi', 'directory', 'video', 'session'], default='gdi',
+                       help='Where frames come from (default: gdi, the live game window)')
+    parser.add_argument('--path', '-p', default=None,
+                       help='Directory, video file or recorded session to replay')
+    parser.add_argument('--realtime', action='store_true',
+                       help='Replay at the recorded pace instead of as fast as possible')
+    parser.add_argument('--fps', type=float, default=None,
+                       help='Frame rate of a directory source, used for its timestamps')
+    parser.add_argument('--workers', '-w', type=int, default=0,
+                       help='Extract in this many worker processes (default: thread pipeline in this process)')
+    parser.add_argument('--drop-policy', choices=['drop_oldest', 'block'], default=None,
+                       help='What a full pipeline queue does (default: drop_oldest live, block for as-fast-as-possible replay)')
+    parser.add_argument('--record', default=None,
+                       help='Also record the frames to this session directory (replay it with --source session)')
+    parser.add_argument('--record-max-mb', type=int, default=2048,
+                       help='Size cap of the recorded session; the oldest chunks are deleted beyond it (default: 2048)')
+    parser.add_argument('--no-speculative', action='store_true',
+                       help='Wait for the scoreboard headers to be stable before extracting it')
+    parser.add_argument('--no-settle', action='store_true',
+                       help='Confirm the scoreboard after a fixed number of stable frames instead of when its animation stops')
+    parser.add_argument('--no-classifier', action='store_true',
+                       help='Run header detection on every frame instead of classifying frames first')
+    parser.add_argument('--timing', '-t', action='store_true',
+                       help='Print timing and cache statistics')
+    args = parser.parse_args()
+    
+    drop_policy = args.drop_policy
+    if drop_policy is None:
+        # Live and paced sources drop stale frames; an unpaced replay should extract every frame
+        drop_policy = "drop_oldest" if args.source == "gdi" or args.realtime else "block"
+    config = AnalysisConfig(debug=False, show_timing=args.timing, show_visualization=False,
+                            pipeline_drop_policy=drop_policy, frame_workers=args.workers,
+                            speculative_extraction=not args.no_speculative, settle_detector=not args.no_settle,
+                            state_classifier=not args.no_classifier)
+    source = create_frame_source(args.source, args.path, realtime=args.realtime, fps=args.fps)
+    if args.record:
+        source = RecordingFrameSource(source, SessionRecorder(args.record, max_bytes=args.record_max_mb * 1024 ** 2))
+    try:
+        source.open()
+    except (RuntimeError, OSError, ImportError) as e:
+        print(f"ERROR: {e}")
+        exit(1)
     print("Starting continuous scoreboard extraction. Press Ctrl+C to stop.")
-    overlay_log_path = "output/overlay_changes_log.jsonl"
-    prev_overlay_values = None
-    iteration = 0
-    overlay_name_binaries_buffer = None
-    template_manager = PlayerTemplateManager()
-    # Add a flag to track overlay state
-    last_overlay_was_out_of_combat = False
-    last_header_positions = None
-    header_stable_count = 0
-    STABILITY_THRESHOLD = 12
     try:
-        # Try to find the window once at the start
-        if not screenshot_tool.find_underlords_window():
-            print("ERROR: Could not find Dota Underlords window! Make sure the game is running and visible.")
-            exit(1)
-        last_fps_time = time.time()
-        frame_count = 0
-        while True:
-            tracker = PerformanceTracker()
-            tracker.start()
-            tracker.mark("Start")
-            pil_img = screenshot_tool.take_single_screenshot()
-            tracker.mark("Screenshot Capture")
-            if pil_img is None:
-                print("Failed to capture screenshot. Retrying...")
-                continue
-            # Convert PIL image to OpenCV (NumPy) format
-            image = np.array(pil_img)
-            # Convert RGB (PIL) to BGR (OpenCV)
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-            # Thresholding or preprocessing as before
-            thresh = None
-            if hasattr(config, 'preprocess_for_thresh') and config.preprocess_for_thresh:
-                # If you have a custom thresholding function, use it
-                thresh = config.preprocess_for_thresh(image)
-            # Ensure thresh is always a valid binary image
-            if thresh is None:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-                _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            tracker.mark("Image Load/Preprocess")
-            if image is None:
-                print(f"Failed to load image from screenshot.")
-                continue
-            header_positions = get_header_positions(image)
-            tracker.mark("Header Detection")
-            # Header stability check
-            if header_positions == last_header_positions:
-                header_stable_count += 1
-            else:
-                header_stable_count = 1
-                last_header_positions = header_positions
-            if config.show_timing:
-                print(f"Header Detection: {tracker.times.get('Header Detection', 0):.4f} {tracker.times.get('Image Load/Preprocess', 0):.4f} {tracker.times.get('Screenshot Capture', 0):.4f}")
-            if header_positions and header_stable_count >= STABILITY_THRESHOLD:
-                # === SCOREBOARD STATE ===
-                print("Scoreboard detected, extracting scoreboard data...")
-                crew_results, bench_results = extract_crew_and_bench_from_scoreboard(image, thresh, header_positions, config)
-                players = extract_all_players(image, thresh, header_positions, crew_results, bench_results, config, tracker, overlay_name_binaries=overlay_name_binaries_buffer)
-                tracker.mark("Data Combination")
-                if overlay_name_binaries_buffer is not None and last_overlay_was_out_of_combat:
-                    from components.player_extraction import PlayerExtractor
-                    from components.utils import get_row_boundaries
-                    player_extractor = PlayerExtractor()
-                    row_boundaries = get_row_boundaries()
-                    for row_num, player in enumerate(players):
-                        if player.get('_should_create_template'):
-                            player_name = player['player_name']
-                            row_y = row_boundaries[row_num]
-                            scoreboard_crop = player_extractor.extract_player_name_region(image, row_y)
-                            overlay_bin = overlay_name_binaries_buffer[row_num]
-                            template_id = template_manager.add_new_player(scoreboard_crop, player_name, template_type="scoreboard")
-                            if overlay_bin is not None:
-                                template_manager.add_new_player(overlay_bin, player_name, template_type="overlay", player_id=template_id)
-                    print("Created/updated player templates for scoreboard and overlay.")
-                    overlay_name_binaries_buffer = None  # Clear after use
-                else:
-                    print("Skipping template creation: last overlay was not out of combat or no overlay_name_binaries_buffer.")
-                scoreboard_data = {
-                    "metadata": {
-                        "total_players": len(players),
-                        "headers_found": list(header_positions.keys()),
-                        "extraction_time": tracker.get_total_time(),
-                        "image_path": IMAGE_PATH,
-                        "timing_breakdown": dict(tracker.times),
-                        "extraction_summary": {
-                            "players_with_names": sum(1 for p in players if p["player_name"]),
-                            "players_with_health": sum(1 for p in players if p["health"] is not None),
-                            "players_with_record": sum(1 for p in players if p["wins"] is not None and p["losses"] is not None),
-                            "players_with_networth": sum(1 for p in players if p["networth"] is not None),
-                            "total_crew_units": sum(len(p["crew"]) for p in players),
-                            "total_bench_units": sum(len(p["bench"]) for p in players)
-                        }
-                    },
-                    "players": players
-                }
-                with open("output/scoreboard_data_raw.json", "w", encoding="utf-8") as f:
-                    json.dump(scoreboard_data, f, indent=2, ensure_ascii=False)
-                print_scoreboard_data(scoreboard_data)
-                iteration += 1
-            else:
-                # === OVERLAY STATE ===
-                if config.debug:
-                    print("Overlay detected, extracting overlay data...")
-                if config.show_timing:
-                    tracker.mark("OVERLAY STATE")
-                overlay_values, overlay_name_binaries = extract_overlay_from_image(image, config)
-                if config.show_timing:
-                    tracker.mark("Overlay Extraction")
-                with open("output/overlay_data.json", "w", encoding="utf-8") as f:
-                    json.dump(overlay_values, f, indent=2, ensure_ascii=False)
-                if config.show_timing:
-                    tracker.mark("Write overlay_data.json")
-                iteration += 1
-            # FPS logging
-            frame_count += 1
-            now = time.time()
-            if now - last_fps_time >= 1.0:
-                print(f"FPS: {frame_count / (now - last_fps_time):.2f}")
-                frame_count = 0
-                last_fps_time = now
-    except KeyboardInterrupt:
-        print("\nContinuous extraction stopped by user.")
+        if config.frame_workers > 1:
+            run_live_workers(config, source)
+        else:
+            run_live(config, source)
+    finally:
+        source.close()
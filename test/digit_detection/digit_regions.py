@@ -0,0 +1,19 @@
+import numpy as np
+
+TEMPLATE_TYPES = ("health", "record", "networth", "player", "overlay", "overlay_health")
+
+
+def make_digit_region(templates, rng, extra_height=4, noise=0.08):
+    """A binary region holding a few randomly chosen templates (possibly overlapping) with random pixel flips."""
+    height = max(template.shape[0] for template in templates.values()) + extra_height
+    width = sum(template.shape[1] for template in templates.values()) // 2 + 40
+    region = np.zeros((height, width), dtype=np.uint8)
+    keys = list(templates)
+    for _ in range(rng.integers(1, 5)):
+        template = templates[keys[rng.integers(len(keys))]]
+        y = rng.integers(0, height - template.shape[0] + 1)
+        x = rng.integers(0, width - template.shape[1] + 1)
+        region[y:y + template.shape[0], x:x + template.shape[1]] |= template
+    flips = rng.random(region.shape) < noise
+    region[flips] = 255 - region[flips]
+    return region
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from components.shared_digit_detector import SharedDigitDetector
+from components.layout_plan import COLUMN_REGION_HEIGHT
+from digit_regions import make_digit_region
+
+BAND_GAP = 6
+
+
+def make_strip(templates, rng, num_bands, last_band_height=COLUMN_REGION_HEIGHT):
+    """Stacked binary digit regions, one per band, with gap rows between them; the last band may be cut short."""
+    bands = [make_digit_region(templates, rng, extra_height=0) for _ in range(num_bands)]
+    width = max(band.shape[1] for band in bands)
+    band_starts = [band_idx * (COLUMN_REGION_HEIGHT + BAND_GAP) for band_idx in range(num_bands)]
+    strip = np.zeros((band_starts[-1] + last_band_height, width), dtype=np.uint8)
+    for band_start, band in zip(band_starts, bands):
+        rows = min(band.shape[0], strip.shape[0] - band_start)
+        strip[band_start:band_start + rows, :band.shape[1]] = band[:rows]
+    return strip, band_starts
+
+
+def assert_same_matches(strip_matches, row_matches):
+    assert [(m['digit'], m['x_position'], m['y_position']) for m in strip_matches] == \
+           [(m['digit'], m['x_position'], m['y_position']) for m in row_matches]
+    assert [m['confidence'] for m in strip_matches] == pytest.approx([m['confidence'] for m in row_matches], abs=1e-4)
+
+
+def read_rows(detector, strip, band_starts, template_type, threshold):
+    return [detector.recognize_digits(strip[band_start:band_start + COLUMN_REGION_HEIGHT], template_type, threshold, region_is_binary=True)
+            for band_start in band_starts]
+
+
+@pytest.mark.parametrize("template_type", ["health", "record", "networth"])
+def test_column_strip_matches_per_row_reads(template_type):
+    detector = SharedDigitDetector(memo_size=0)
+    templates = detector.get_digit_templates(template_type)
+    rng = np.random.default_rng(11)
+    for strip_idx in range(6):
+        # The last strip ends inside its final band, which no full-height template fits
+        last_band_height = COLUMN_REGION_HEIGHT if strip_idx < 5 else COLUMN_REGION_HEIGHT - 10
+        strip, band_starts = make_strip(templates, rng, 10, last_band_height)
+        for threshold in (0.5, 0.95):
+            strip_matches = detector.read_column_strip(strip, band_starts, COLUMN_REGION_HEIGHT, template_type, threshold, region_is_binary=True)
+            for band_strip_matches, band_row_matches in zip(strip_matches, read_rows(detector, strip, band_starts, template_type, threshold)):
+                assert_same_matches(band_strip_matches, band_row_matches)
+
+
+def test_column_strip_with_templates_not_as_tall_as_the_band():
+    """Shorter templates are matched per band and taller ones never match, exactly as in per-row reads."""
+    detector = SharedDigitDetector(memo_size=0)
+    templates = dict(detector.get_digit_templates('health'))
+    templates['3'] = np.ascontiguousarray(templates['3'][5:-5])
+    templates['5'] = np.pad(templates['5'], ((5, 5), (0, 0)))
+    detector._templates_cache['health'] = templates
+    detector._glyph_tables['health'] = None
+    rng = np.random.default_rng(12)
+    strip, band_starts = make_strip({key: templates[key] for key in ('1', '3', '7')}, rng, 8)
+    strip_matches = detector.read_column_strip(strip, band_starts, COLUMN_REGION_HEIGHT, 'health', 0.5, region_is_binary=True)
+    row_matches = read_rows(detector, strip, band_starts, 'health', 0.5)
+    for band_strip_matches, band_row_matches in zip(strip_matches, row_matches):
+        assert_same_matches(band_strip_matches, band_row_matches)
+    digits = [m['digit'] for matches in strip_matches for m in matches]
+    assert '3' in digits
+    assert '5' not in digits
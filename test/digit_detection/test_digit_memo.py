@@ -0,0 +1,50 @@
+import numpy as np
+
+from components.shared_digit_detector import SharedDigitDetector
+from digit_regions import make_digit_region
+
+
+def test_memo_hit_returns_the_digits_of_a_fresh_read():
+    detector = SharedDigitDetector(memo_size=8)
+    uncached = SharedDigitDetector(memo_size=0)
+    rng = np.random.default_rng(10)
+    for template_type in ("health", "record", "overlay"):
+        region = make_digit_region(detector.get_digit_templates(template_type), rng, noise=0.02)
+        first = detector.recognize_digits(region, template_type, 0.9, region_is_binary=True)
+        hits = detector.memo.get_stats()["hits"]
+        second = detector.recognize_digits(region.copy(), template_type, 0.9, region_is_binary=True)
+        assert detector.memo.get_stats()["hits"] == hits + 1
+        assert second == first == uncached.recognize_digits(region, template_type, 0.9, region_is_binary=True)
+        # Callers may sort or extend the returned list without touching the cached entry
+        second.append(None)
+        assert detector.recognize_digits(region, template_type, 0.9, region_is_binary=True) == first
+
+
+def test_glyph_hash_read_matches_template_matching():
+    """A clean rendering is read from the glyph tables with the digits and positions template matching finds."""
+    detector = SharedDigitDetector(memo_size=0)
+    templates = detector.get_digit_templates("networth")
+    region = np.zeros((84, 80), dtype=np.uint8)
+    x = 3
+    for digit in ("4", "0", "7"):
+        template = templates[digit]
+        region[2:2 + template.shape[0], x:x + template.shape[1]] |= template
+        x += template.shape[1] + 2
+    glyph_matches = detector.recognize_digits(region, "networth", 0.95, region_is_binary=True)
+    assert detector.get_glyph_stats()["glyph_reads"] == 1
+    template_matches = detector.find_all_digit_matches(region, "networth", 0.95, region_is_binary=True)
+    assert [(m['digit'], m['x_position'], m['y_position']) for m in glyph_matches] == \
+           [(m['digit'], m['x_position'], m['y_position']) for m in template_matches]
+    assert [m['digit'] for m in glyph_matches] == ["4", "0", "7"]
+
+
+def test_memo_eviction_stops_at_the_size_limit():
+    detector = SharedDigitDetector(memo_size=4)
+    rng = np.random.default_rng(11)
+    templates = detector.get_digit_templates("player")
+    for _ in range(10):
+        detector.recognize_digits(make_digit_region(templates, rng), "player", 0.9, region_is_binary=True)
+    stats = detector.memo.get_stats()
+    assert stats["entries"] == 4
+    assert stats["evictions"] == 6
+    assert stats["misses"] == 10
@@ -0,0 +1,64 @@
+import cv2
+import numpy as np
+import pytest
+
+from components.shared_digit_detector import shared_detector
+from digit_regions import TEMPLATE_TYPES, make_digit_region
+
+REGIONS_PER_TYPE = 40
+
+
+def _reference_matches(region_binary, templates, confidence_threshold):
+    """Every above-threshold pixel of every template, as the per-template loop collected them."""
+    matches = []
+    for digit_value, template in templates.items():
+        result = cv2.matchTemplate(region_binary, template, cv2.TM_CCOEFF_NORMED)
+        for y, x in zip(*np.where(result >= confidence_threshold)):
+            matches.append({'digit': digit_value, 'x_position': x, 'y_position': y, 'confidence': result[y, x],
+                            'width': template.shape[1], 'height': template.shape[0]})
+    return matches
+
+
+def _reference_suppress(matches):
+    """The pairwise greedy suppression the vectorized NMS replaced."""
+    matches.sort(key=lambda match: match['confidence'], reverse=True)
+    kept = []
+    for match in matches:
+        overlaps = False
+        for selected in kept:
+            overlap = max(0, min(match['x_position'] + match['width'], selected['x_position'] + selected['width']) - max(match['x_position'], selected['x_position']))
+            if overlap / min(match['width'], selected['width']) > 0.5:
+                overlaps = True
+                break
+        if not overlaps:
+            kept.append(match)
+    kept.sort(key=lambda match: match['x_position'])
+    return kept
+
+
+def _reference_read(region_binary, template_type, confidence_threshold):
+    matches = _reference_suppress(_reference_matches(region_binary, shared_detector.get_digit_templates(template_type), confidence_threshold))
+    if template_type != 'record':
+        return matches
+    separator = shared_detector.get_separator_template()
+    return _reference_suppress(matches + _reference_matches(region_binary, {'separator': separator}, confidence_threshold))
+
+
+def _as_tuples(matches):
+    return [(match['digit'], int(match['x_position']), int(match['y_position']), float(match['confidence']), match['width'], match['height']) for match in matches]
+
+
+@pytest.mark.parametrize("template_type", TEMPLATE_TYPES)
+def test_vectorized_nms_matches_the_per_template_loop(template_type):
+    rng = np.random.default_rng(sum(map(ord, template_type)))
+    templates = shared_detector.get_digit_templates(template_type)
+    assert templates
+    for _ in range(REGIONS_PER_TYPE):
+        region = make_digit_region(templates, rng)
+        # A low threshold keeps many overlapping candidates in play
+        confidence_threshold = rng.choice([0.5, 0.7, 0.95])
+        if template_type == 'record':
+            matches = shared_detector.find_digits_and_separator(region, confidence_threshold, region_is_binary=True)
+        else:
+            matches = shared_detector.find_all_digit_matches(region, template_type, confidence_threshold, region_is_binary=True)
+        assert _as_tuples(matches) == _as_tuples(_reference_read(region, template_type, confidence_threshold))
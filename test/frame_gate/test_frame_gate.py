@@ -0,0 +1,40 @@
+import numpy as np
+from components.frame_gate import FrameGate
+
+
+def test_region_stays_changed_until_its_extraction_is_committed():
+    """A frame whose extraction failed must not be recorded as extracted."""
+    gate = FrameGate()
+    before = np.zeros((80, 400), dtype=np.uint8)
+    after = before.copy()
+    after[20:60, 100:140] = 255
+    assert gate.changed("row", before)
+    gate.commit("row")
+    assert not gate.changed("row", before)
+    # Extraction of the changed region fails: nothing is committed
+    assert gate.changed("row", after)
+    assert gate.changed("row", after)
+    gate.commit("row")
+    assert not gate.changed("row", after)
+
+
+def test_stale_pending_thumbnail_is_not_committed():
+    gate = FrameGate()
+    before = np.zeros((80, 400), dtype=np.uint8)
+    after = np.full((80, 400), 255, dtype=np.uint8)
+    assert gate.changed("row", before)
+    gate.commit("row")
+    assert gate.changed("row", after)
+    # The region went back before the failed extraction was retried
+    assert not gate.changed("row", before)
+    gate.commit("row")
+    assert not gate.changed("row", before)
+
+
+def test_commit_rows_keeps_only_the_extracted_rows():
+    gate = FrameGate()
+    rois = [(slice(row * 80, row * 80 + 80), slice(None)) for row in range(3)]
+    gray = np.zeros((240, 400), dtype=np.uint8)
+    assert gate.changed_rows("row", gray, rois) == [0, 1, 2]
+    gate.commit_rows("row", [0, 2])
+    assert gate.changed_rows("row", gray, rois) == [1]
@@ -0,0 +1,45 @@
+import glob
+
+import cv2
+import numpy as np
+
+from components.utils import get_row_boundaries
+from components.hero_extraction import calculate_crew_slots, calculate_bench_slots
+
+FRAME_SHAPE = (733, 2100, 3)
+HEADER_X = {"PLAYER": 120, "HEALTH": 349, "RECORD": 450, "NETWORTH": 560, "ALLIANCES": 640,
+            "CREW": 700, "UNDERLORD": 1250, "CONTRAPTIONS": 1380, "BENCH": 1560}
+HEADER_Y = 70
+
+
+def _paste(image, y, x, template_names):
+    """Draw digit templates left to right as white pixels."""
+    for name in template_names:
+        template = cv2.imread(f"assets/templates/digits/{name}.png", cv2.IMREAD_GRAYSCALE)
+        height, width = template.shape
+        image[y:y + height, x:x + width][template > 0] = 255
+        x += width + 2
+
+
+def make_scoreboard_frame(seed):
+    """A scoreboard frame drawn from the repository's header, digit and hero templates."""
+    rng = np.random.default_rng(seed)
+    image = np.full(FRAME_SHAPE, (40, 30, 20), dtype=np.uint8)
+    heroes = sorted(glob.glob("assets/templates/hero_templates/originals/*.png"))
+    for row_y in get_row_boundaries():
+        _paste(image, row_y, HEADER_X["HEALTH"] + 5, [f"health_digit_{d}" for d in str(rng.integers(1, 100))])
+        _paste(image, row_y, HEADER_X["RECORD"] + 3, [f"record_digit_{d}" for d in str(rng.integers(0, 20))] + ["record_digit_separator"]
+               + [f"record_digit_{d}" for d in str(rng.integers(0, 20))])
+        _paste(image, row_y, HEADER_X["NETWORTH"] + 5, [f"NetWorth_digit_{d}" for d in str(rng.integers(0, 400))])
+        _paste(image, row_y + 39, 120, [str(rng.integers(1, 10))])
+        _paste(image, row_y + 39, 141, [str(rng.integers(0, 10))])
+        for slots in (calculate_crew_slots(HEADER_X["CREW"], HEADER_X["UNDERLORD"], row_y), calculate_bench_slots(HEADER_X["BENCH"], FRAME_SHAPE[1], row_y)):
+            for slot in slots[:rng.integers(0, len(slots))]:
+                image[slot['y_start']:slot['y_end'], slot['x_start']:slot['x_end']] = cv2.imread(heroes[rng.integers(len(heroes))])
+                # Star bar below the hero
+                image[slot['y_end'] + 2:min(slot['y_end'] + 10, FRAME_SHAPE[0]), slot['x_start'] + 10:slot['x_start'] + 10 + rng.integers(5, 40)] = 255
+    for header_name, x in HEADER_X.items():
+        template = cv2.imread(f"assets/templates/header_templates/{header_name.lower()}_template.png", cv2.IMREAD_GRAYSCALE)
+        height, width = template.shape
+        image[HEADER_Y:HEADER_Y + height, x:x + width][template > 0] = 255
+    return image
@@ -0,0 +1,29 @@
+import time
+from components.frame_pipeline import FramePipeline, DROP_OLDEST
+
+
+def test_gated_frames_never_push_a_payload_out_of_the_publish_queue():
+    """A slow publisher behind many 'unchanged' (None payload) frames must still publish every real payload."""
+    frames = iter(range(40))
+    extracted = []
+    published = []
+
+    def extract(frame):
+        # Every 10th frame carries a result; the rest were gated as unchanged
+        payload = frame.data if frame.data % 10 == 0 else None
+        if payload is not None:
+            extracted.append(payload)
+        return ("payload", payload)
+
+    def publish(frame):
+        time.sleep(0.005)
+        published.append(frame.data[1])
+
+    pipeline = FramePipeline(lambda: next(frames), lambda frame: frame.data, extract, publish, queue_size=2, policy=DROP_OLDEST)
+    pipeline.start()
+    pipeline.join(timeout=10)
+    assert not pipeline.is_alive()
+    assert pipeline.get_stats()["queues"]["publish"]["drops"] == 0
+    # Frames may be dropped before extraction, but no extracted payload is lost
+    assert extracted
+    assert [payload for payload in published if payload is not None] == extracted
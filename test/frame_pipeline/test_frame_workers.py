@@ -0,0 +1,20 @@
+import numpy as np
+
+from components.frame_workers import FrameWorkerPool
+
+
+def frame_checksum(image, config):
+    return image.shape, int(image.sum(dtype=np.int64))
+
+
+def test_frames_larger_than_the_first_grow_their_slot():
+    """The shared slots are sized from the first frame; a larger frame must still arrive intact."""
+    rng = np.random.default_rng(15)
+    shapes = [(40, 60, 3), (40, 60, 3), (90, 160, 3), (40, 60, 3), (120, 200, 3), (90, 160, 3)]
+    frames = [rng.integers(0, 256, shape, dtype=np.uint8) for shape in shapes]
+    pool = FrameWorkerPool(frame_checksum, 2, None, num_slots=2)
+    try:
+        results = [result for _, result in pool.map(frames)]
+    finally:
+        pool.shutdown()
+    assert results == [frame_checksum(frame, None) for frame in frames]
@@ -0,0 +1,39 @@
+import pytest
+
+# main imports the GDI screenshot tool, and player names are read with Tesseract
+pytest.importorskip("win32gui")
+pytesseract = pytest.importorskip("pytesseract")
+try:
+    pytesseract.get_tesseract_version()
+except pytesseract.TesseractNotFoundError:
+    pytest.skip("Tesseract is not installed", allow_module_level=True)
+
+import main
+from components.utils import AnalysisConfig, get_header_positions
+from components.frame_context import FrameContext
+from components.frame_workers import FrameWorkerPool
+from components.layout_plan import get_layout_plan
+from scoreboard_frames import make_scoreboard_frame
+
+
+def test_worker_results_match_in_process_extraction():
+    """Spawned workers must extract each frame exactly as extract_scoreboard does in this process."""
+    config = AnalysisConfig(show_timing=False)
+    # Neither side may add player templates, or the two would read names against different stores
+    config.create_player_templates = False
+    # A repeated frame goes through the workers' row caches
+    frames = [make_scoreboard_frame(seed) for seed in (0, 1, 1, 2, 0)]
+    pool = FrameWorkerPool(main.extract_frame_in_worker, 2, config, initializer=main.preload_worker)
+    try:
+        results = [result for _, result in pool.map(frames)]
+    finally:
+        pool.shutdown()
+    assert len(results) == len(frames)
+    for image, (kind, payload, _, header_positions) in zip(frames, results):
+        frame_ctx = FrameContext(image)
+        expected_headers = get_header_positions(image, frame_ctx=frame_ctx)
+        expected_players = main.extract_scoreboard(image, frame_ctx.otsu(), expected_headers, config,
+                                                   layout=get_layout_plan(expected_headers, image.shape[1]), frame_ctx=frame_ctx)
+        assert kind == "scoreboard"
+        assert header_positions == expected_headers
+        assert payload["players"] == expected_players
@@ -0,0 +1,48 @@
+import numpy as np
+from components.utils import HeaderTracker, get_header_positions, load_header_templates, HEADER_Y_START, HEADER_MISSING_SEARCH_INTERVAL
+
+HEADER_SPACING = 200
+
+
+def make_header_frame(header_names):
+    """A black 1920x400 frame with the given header templates drawn into the header strip."""
+    frame = np.zeros((400, 1920, 3), dtype=np.uint8)
+    for index, (header_name, template) in enumerate(load_header_templates()):
+        if header_name in header_names:
+            x = 20 + index * HEADER_SPACING
+            y = HEADER_Y_START + 10
+            frame[y:y + template.shape[0], x:x + template.shape[1]] = template[:, :, None]
+    return frame
+
+
+def test_headers_missing_from_first_frame_are_found_later():
+    """A scoreboard first caught mid-animation must not lock the tracker onto the partial set of headers."""
+    all_headers = [header_name for header_name, _ in load_header_templates()]
+    tracker = HeaderTracker()
+    partial = get_header_positions(make_header_frame(all_headers[:3]), tracker=tracker)
+    assert set(partial) == set(all_headers[:3])
+    full_frame = make_header_frame(all_headers)
+    expected = get_header_positions(full_frame)
+    assert set(expected) == set(all_headers)
+    # The locked headers still match, so the missing ones wait for the next full-strip search
+    for _ in range(HEADER_MISSING_SEARCH_INTERVAL - 1):
+        assert get_header_positions(full_frame, tracker=tracker) == partial
+    assert get_header_positions(full_frame, tracker=tracker) == expected
+    assert tracker.get_stats() == {"narrow_searches": HEADER_MISSING_SEARCH_INTERVAL, "full_searches": 2}
+    # Once every header is locked, the narrow search keeps finding them all without full searches
+    for _ in range(2 * HEADER_MISSING_SEARCH_INTERVAL):
+        assert get_header_positions(full_frame, tracker=tracker) == expected
+    assert tracker.full_searches == 2
+
+
+def test_absent_header_is_searched_once_per_interval():
+    """A column that is not on screen costs one full-strip search every interval, not one per frame."""
+    all_headers = [header_name for header_name, _ in load_header_templates()]
+    frame = make_header_frame(all_headers[1:])
+    tracker = HeaderTracker()
+    expected = get_header_positions(frame, tracker=tracker)
+    assert all_headers[0] not in expected
+    frames = 3 * HEADER_MISSING_SEARCH_INTERVAL
+    for _ in range(frames):
+        assert get_header_positions(frame, tracker=tracker) == expected
+    assert tracker.get_stats() == {"narrow_searches": frames, "full_searches": 1 + 3}
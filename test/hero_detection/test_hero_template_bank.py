@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+import pytest
+
+from components.image_processing import HeroTemplateBank, load_template_masks, analyze_all_masks, compare_mask_to_templates
+
+TEMPLATE_MASKS = load_template_masks("assets/templates/hero_masks")
+
+
+def make_slot_masks(rng, count, noise=0.1):
+    """Hero masks with random pixel flips, plus a few pure-noise masks."""
+    names = list(TEMPLATE_MASKS)
+    masks = []
+    for mask_idx in range(count):
+        if mask_idx % 5 == 4:
+            mask = np.where(rng.random((28, 28)) < 0.5, 255, 0).astype(np.uint8)
+        else:
+            mask = TEMPLATE_MASKS[names[rng.integers(len(names))]].copy()
+            flips = rng.random(mask.shape) < noise
+            mask[flips] = 255 - mask[flips]
+        masks.append(mask)
+    return masks
+
+
+def test_bank_scores_equal_tm_ccoeff_normed():
+    bank = HeroTemplateBank(TEMPLATE_MASKS)
+    masks = make_slot_masks(np.random.default_rng(4), 40)
+    scores = bank.score(masks)
+    for mask_idx, mask in enumerate(masks):
+        expected = [cv2.matchTemplate(mask, TEMPLATE_MASKS[hero_name], cv2.TM_CCOEFF_NORMED)[0, 0] for hero_name in bank.hero_names]
+        assert scores[mask_idx] == pytest.approx(expected, abs=1e-5)
+
+
+def test_analyze_all_masks_matches_per_slot_comparison():
+    rng = np.random.default_rng(5)
+    crew = {row_num: make_slot_masks(rng, 6, noise=0.05 * row_num) for row_num in range(1, 5)}
+    bench = {row_num: make_slot_masks(rng, 3) for row_num in range(1, 5)}
+    # Rows stop at the first empty slot
+    crew[2][3] = np.zeros((28, 28), dtype=np.uint8)
+    crew_results, bench_results = analyze_all_masks(crew, bench, HeroTemplateBank(TEMPLATE_MASKS))
+    for masks_by_row, results in ((crew, crew_results), (bench, bench_results)):
+        for row_num, masks in masks_by_row.items():
+            for slot_idx, (mask, result) in enumerate(zip(masks, results[row_num])):
+                if row_num == 2 and slot_idx >= 3 and masks is crew[2]:
+                    assert result == {"hero_name": None, "confidence": 0.0}
+                    continue
+                hero_name, confidence = compare_mask_to_templates(mask, TEMPLATE_MASKS)
+                assert result["hero_name"] == hero_name
+                assert result["confidence"] == pytest.approx(confidence, abs=1e-5)
+
+
+def test_constant_mask_against_constant_template_scores_zero():
+    """matchTemplate scores a constant crop against an all-black template 1.0; the bank scores it 0 (no match)."""
+    constant_masks = {"blank": np.zeros((28, 28), dtype=np.uint8)}
+    crop = np.full((28, 28), 255, dtype=np.uint8)
+    assert cv2.matchTemplate(crop, constant_masks["blank"], cv2.TM_CCOEFF_NORMED)[0, 0] == pytest.approx(1.0)
+    assert compare_mask_to_templates(crop, constant_masks)[0] == "blank"
+    bank = HeroTemplateBank(constant_masks)
+    assert bank.score([crop])[0, 0] == 0.0
+    assert bank.identify([crop]) == [(None, 0.0)]
@@ -0,0 +1,66 @@
+import os
+import time
+
+from components.utils import AnalysisConfig
+from components.frame_workers import FrameWorkerPool
+from components.frame_sources import DirectoryFrameSource
+from main import extract_frame_in_worker, preload_worker
+
+def load_frames(frames_dir):
+    """Load every PNG in a directory as a BGR frame, in name order."""
+    with DirectoryFrameSource(frames_dir) as source:
+        return [image for _, image in source]
+
+def run_in_process(frames, config):
+    """Baseline: extract every frame in this process, one after the other."""
+    preload_worker(config)
+    start = time.perf_counter()
+    for image in frames:
+        extract_frame_in_worker(image, config)
+    return time.perf_counter() - start
+
+def run_with_workers(frames, config, num_workers):
+    """Extract every frame through a worker pool; the pool is warmed up before timing starts."""
+    pool = FrameWorkerPool(extract_frame_in_worker, num_workers, config, initializer=preload_worker)
+    try:
+        # Start the workers and let each load its templates outside the timed run
+        list(pool.map(frames[:1] * num_workers))
+        start = time.perf_counter()
+        for _ in pool.map(frames):
+            pass
+        return time.perf_counter() - start, pool.get_stats()
+    finally:
+        pool.shutdown()
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure extraction throughput against the number of worker processes")
+    parser.add_argument('--frames', '-f', default='screenshots',
+                       help='Directory of PNG frames to extract (default: screenshots)')
+    parser.add_argument('--workers', '-w', type=int, nargs='+', default=[1, 2, 4],
+                       help='Worker counts to measure (default: 1 2 4)')
+    parser.add_argument('--repeat', '-r', type=int, default=5,
+                       help='Times the frame set is fed through per run (default: 5)')
+
+    args = parser.parse_args()
+
+    try:
+        frames = load_frames(args.frames) * args.repeat
+    except (RuntimeError, OSError) as e:
+        print(e)
+        return
+    config = AnalysisConfig(debug=False, show_timing=False)
+    print(f"{len(frames)} frames, {os.cpu_count()} CPUs")
+
+    elapsed = run_in_process(frames, config)
+    baseline_fps = len(frames) / elapsed
+    print(f"{'in-process':>12}: {baseline_fps:7.2f} FPS ({elapsed:.2f}s)")
+    for num_workers in args.workers:
+        elapsed, stats = run_with_workers(frames, config, num_workers)
+        fps = len(frames) / elapsed
+        print(f"{num_workers:>4} workers: {fps:7.2f} FPS ({elapsed:.2f}s), x{fps / baseline_fps:.2f}, "
+              f"mean extraction {stats['mean_worker_time'] * 1000:.1f} ms, frames per worker {sorted(stats['frames_by_worker'].values())}")
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,24 @@ import time
 import os
 from datetime import datetime
 from PIL import Image
+import numpy as np
+import cv2
 import threading
 import mss
 import win32gui
 import win32con
 import win32ui
 
+# Full-frame copies made by capture_window_bgr: GetBitmapBits into Python bytes, then BGRA -> BGR
+FRAME_COPIES = 2
+
 class UnderlordScreenshotTool:
     def __init__(self, output_dir="screenshots"):
         self.output_dir = output_dir
         self.window = None
         self.running = False
         self.screenshot_count = 0
+        self.short_capture_height = None  # client height of the last capture that had to be padded
         
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
@@ -66,8 +72,8 @@ class UnderlordScreenshotTool:
             return self.window._hWnd
         return None
 
-    def capture_window_gdi(self, hwnd, y_start=37, y_end=770):
-        """Capture the window content using GDI BitBlt, crop to scoreboard area."""
+    def _bitblt_window_bits(self, hwnd):
+        """Copy the window content with GDI BitBlt; returns (BGRX bytes, bitmap info, client width)."""
         # Get window client area size
         left, top, right, bottom = win32gui.GetClientRect(hwnd)
         width = right - left
@@ -86,9 +92,22 @@ class UnderlordScreenshotTool:
         # BitBlt (copy window content to bitmap)
         saveDC.BitBlt((0, 0), (width, height), mfcDC, (0, 0), win32con.SRCCOPY)
 
-        # Convert to PIL Image
         bmpinfo = saveBitMap.GetInfo()
         bmpstr = saveBitMap.GetBitmapBits(True)
+
+        # Cleanup
+        win32gui.DeleteObject(saveBitMap.GetHandle())
+        saveDC.DeleteDC()
+        mfcDC.DeleteDC()
+        win32gui.ReleaseDC(hwnd, hwndDC)
+
+        return bmpstr, bmpinfo, width
+
+    def capture_window_gdi(self, hwnd, y_start=37, y_end=770):
+        """Capture the window content using GDI BitBlt, crop to scoreboard area."""
+        bmpstr, bmpinfo, width = self._bitblt_window_bits(hwnd)
+
+        # Convert to PIL Image
         img = Image.frombuffer(
             'RGB',
             (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
@@ -100,14 +119,32 @@ class UnderlordScreenshotTool:
         # Remove 2px left border
         img = img.crop((2, 0, img.width, img.height))
 
-        # Cleanup
-        win32gui.DeleteObject(saveBitMap.GetHandle())
-        saveDC.DeleteDC()
-        mfcDC.DeleteDC()
-        win32gui.ReleaseDC(hwnd, hwndDC)
-
         return img
 
+    def capture_window_bgr(self, hwnd, y_start=37, y_end=770):
+        """
+        Capture the window content using GDI BitBlt as a BGR numpy array cropped to the scoreboard area.
+
+        The bitmap bits are viewed in place as BGRA and cropped by slicing, so the only full-frame
+        copy after GetBitmapBits is the BGRA -> BGR conversion (see FRAME_COPIES).
+        A client area shorter than y_end is padded with black rows to the full y_end - y_start
+        height (logged once per window height), so the scoreboard ROIs still fit the frame.
+        """
+        bmpstr, bmpinfo, width = self._bitblt_window_bits(hwnd)
+        bgra = np.frombuffer(bmpstr, dtype=np.uint8).reshape(bmpinfo['bmHeight'], bmpinfo['bmWidth'], 4)
+        # Crop to scoreboard area and remove 2px left border
+        bgra = bgra[y_start:y_end, 2:width]
+        expected_height = y_end - y_start
+        if bgra.shape[0] >= expected_height:
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+        if self.short_capture_height != bmpinfo['bmHeight']:
+            print(f"Warning: window client area is {bmpinfo['bmHeight']}px tall, expected at least {y_end}px; padding the bottom {expected_height - bgra.shape[0]} rows with black")
+            self.short_capture_height = bmpinfo['bmHeight']
+        frame = np.zeros((expected_height, bgra.shape[1], 3), dtype=np.uint8)
+        if bgra.shape[0] > 0:
+            frame[:bgra.shape[0]] = cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+        return frame
+
     def take_scoreboard_screenshot(self, save_to_disk=False):
         """Take a screenshot of only the scoreboard area (y=0 to y=733 in window content) using GDI BitBlt. Returns PIL image."""
         hwnd = self.get_hwnd()
@@ -193,6 +230,23 @@ class UnderlordScreenshotTool:
                 print(f"Error in monitoring loop: {e}")
                 time.sleep(1)
     
+    def take_single_frame(self):
+        """Capture the scoreboard area as a BGR numpy array (None on failure). Only search for window if lost."""
+        if self.window is None or not self.refresh_window_info():
+            if not self.find_underlords_window():
+                return None
+        hwnd = self.get_hwnd()
+        if not hwnd:
+            print("No Underlords window found!")
+            return None
+        try:
+            frame = self.capture_window_bgr(hwnd, y_start=37, y_end=770)
+            self.screenshot_count += 1
+            return frame
+        except Exception as e:
+            print(f"Error taking screenshot: {e}")
+            return None
+
     def take_single_screenshot(self, save_to_disk=False):
         """Take a single screenshot and return the PIL image (in memory). Only search for window if lost."""
         if self.window is None or not self.refresh_window_info():